@@ -1,3 +1,5 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import matplotlib.gridspec as gridspec
 import numpy as np
@@ -5,6 +7,13 @@ from pyH2A.Analysis.Monte_Carlo_Analysis import Monte_Carlo_Analysis
 from pyH2A.Utilities.input_modification import convert_input_to_dictionary
 from pyH2A.Utilities.output_utilities import insert_image, Figure_Lean
 
+def monte_carlo_state(input_file):
+	'''Performing Monte Carlo analysis for `input_file` and returning its
+	results in compact form (used as worker function by `Comparative_MC_Analysis`).
+	'''
+
+	return Monte_Carlo_Analysis(input_file).export_state()
+
 class Comparative_MC_Analysis:
 	'''Comparison of Monte Carlo analysis results for different models.
 
@@ -19,22 +28,51 @@ class Comparative_MC_Analysis:
 	-----
 	First column of `Comparative_MC_Analysis` table can include arbitrary 
 	name for model.
+	Monte Carlo analyses of the different models are performed concurrently
+	in separate processes (number of processes is controlled by `processes`). 
+	Only the Monte Carlo results (see 
+	:func:`~pyH2A.Analysis.Monte_Carlo_Analysis.Monte_Carlo_Analysis.export_state`)
+	are transferred back from the worker processes. When the start method of 
+	multiprocessing is 'spawn' (Windows, macOS), scripts using this class need 
+	to be guarded by `if __name__ == '__main__':`.
 	'''
 
-	def __init__(self, input_file):
+	def __init__(self, input_file, processes = None):
 		self.inp = convert_input_to_dictionary(input_file)
+		self.processes = processes
 		self.models = self.get_models()
 		self.check_target_price_range_consistency()
 
 	def get_models(self):
 		'''Get models which are to be compared from `Comparative_MC_Analysis` 
 		table in input file and perform Monte Carlo analysis for them.
+
+		Notes
+		-----
+		If more than one process is used, the Monte Carlo analyses are performed
+		in a process pool and the instances of `Monte_Carlo_Analysis` are restored
+		from the returned results, without repeating the simulation or distance 
+		calculations.
 		'''
 
+		entries = self.inp['Comparative_MC_Analysis']
+		input_files = [input_file['Value'] for input_file in entries.values()]
+
+		if self.processes is None:
+			processes = min(len(input_files), os.cpu_count() or 1)
+		else:
+			processes = min(len(input_files), self.processes)
+
+		if processes > 1:
+			with ProcessPoolExecutor(max_workers = processes) as executor:
+				states = list(executor.map(monte_carlo_state, input_files))
+		else:
+			states = [None] * len(input_files)
+
 		models = {}
 
-		for key, input_file in self.inp['Comparative_MC_Analysis'].items():
-			model = Monte_Carlo_Analysis(input_file['Value'])
+		for (key, input_file), state in zip(entries.items(), states):
+			model = Monte_Carlo_Analysis(input_file['Value'], state = state)
 
 			models[key] = {}
 			models[key]['Model'] = model
@@ -0,0 +1,274 @@
+import numbers
+from pathlib import Path
+from timeit import default_timer as timer
+import numpy as np
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_batch
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, parse_parameter, reverse_parameter_to_string, check_for_meta_module
+from pyH2A.Utilities.output_utilities import Figure_Lean
+
+EXCLUDED_TABLES = ('Workflow', 'Display Parameters', 'Parameters - ', 'Methods - ', 'Arguments - ')
+DISCRETE_ROWS = {'Financial Input Values': ('year', 'life', 'length', 'time'),
+				 'Fixed Operating Costs': ('shifts', 'supervisor')}
+
+def numeric_leaves(inp, excluded_tables = (), discrete_rows = DISCRETE_ROWS):
+	'''Paths and values of all non-zero numeric entries of `inp`.
+
+	Parameters
+	----------
+	inp : dict
+		Input dictionary.
+	excluded_tables : tuple of str, optional
+		Tables whose names start with one of the strings are skipped, in addition to
+		`EXCLUDED_TABLES` and analysis tables.
+	discrete_rows : dict, optional
+		Dictionary with table names as keys and tuples of strings as values. Rows of
+		these tables whose names contain one of the strings (case insensitive) are
+		skipped. Defaults to `DISCRETE_ROWS`.
+
+	Returns
+	-------
+	paths : list
+		Paths (top key, middle key, bottom key) of entries.
+	values : ndarray
+		Values of entries.
+
+	Notes
+	-----
+	Integer entries are included (e.g. costs or capacities without decimals). Only
+	entries which are discrete by definition are skipped: plugin positions in the
+	`Workflow` table, years, plant life, depreciation length and startup time in
+	`Financial Input Values` as well as number of shifts and supervisors in
+	`Fixed Operating Costs` (see `DISCRETE_ROWS`).
+	'''
+
+	paths = []
+	values = []
+
+	for top_key, table in inp.items():
+		if top_key.startswith(EXCLUDED_TABLES + tuple(excluded_tables)) or check_for_meta_module(top_key):
+			continue
+
+		discrete = tuple(keyword.lower() for keyword in discrete_rows.get(top_key, ()))
+
+		for middle_key, row in table.items():
+			if not isinstance(row, dict) or any(keyword in middle_key.lower() for keyword in discrete):
+				continue
+
+			for bottom_key, value in row.items():
+				if isinstance(value, numbers.Real) and not isinstance(value, bool) and value != 0:
+					paths.append([top_key, middle_key, bottom_key])
+					values.append(value)
+
+	return paths, np.array(values, dtype = float)
+
+def perturbation_matrix(values, step = 0.01, scheme = 'forward'):
+	'''Perturbed value sets for finite difference elasticities.
+
+	Parameters
+	----------
+	values : ndarray
+		Base values of n parameters.
+	step : float, optional
+		Relative step size.
+	scheme : str, optional
+		'forward' (n value sets, each parameter increased by `step`) or 'central'
+		(2n value sets, each parameter increased and decreased by `step`).
+
+	Returns
+	-------
+	matrix : ndarray
+		2D array of value sets with one parameter changed per row.
+	'''
+
+	if scheme == 'forward':
+		factors = [1. + step]
+	elif scheme == 'central':
+		factors = [1. + step, 1. - step]
+	else:
+		raise ValueError(f"Elasticity scheme has to be 'forward' or 'central', not {scheme}.")
+
+	matrices = []
+
+	for factor in factors:
+		matrix = np.tile(values, (len(values), 1))
+		np.fill_diagonal(matrix, values * factor)
+		matrices.append(matrix)
+
+	return np.concatenate(matrices)
+
+def elasticities(base, results, step = 0.01, scheme = 'forward'):
+	'''Elasticities (relative change of result per relative change of parameter) from the
+	results of :func:`perturbation_matrix` value sets.
+	'''
+
+	results = np.asarray(results, dtype = float)
+
+	if scheme == 'forward':
+		return (results - base) / (base * step)
+	else:
+		upper, lower = np.split(results, 2)
+		return (upper - lower) / (2. * base * step)
+
+class Elasticity_Analysis:
+	'''Elasticities of H2 cost with respect to all numeric inputs.
+
+	Parameters
+	----------
+	Elasticity_Analysis > Step > Value : float, optional
+		Relative step size of finite differences. Defaults to 0.01.
+	Elasticity_Analysis > Scheme > Value : str, optional
+		'forward' (default, one evaluation per input) or 'central' (two evaluations
+		per input).
+	Elasticity_Analysis > Processes > Value : int, optional
+		Number of processes used for evaluation. Defaults to 1.
+	Elasticity_Analysis > Backend > Value : str, optional
+		'process' (default) or 'thread', see
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`.
+	Elasticity_Analysis > Exclude > Value : str, optional
+		Tables which are skipped, separated by ';' (e.g. 'Financial Input Values').
+	Elasticity_Analysis > Output File > Value : str, optional
+		Path to tab separated file to which the ranked elasticity table is written.
+
+	Notes
+	-----
+	The elasticity of an input x is (dh2_cost / h2_cost) / (dx / x). All non-zero
+	numeric entries of the input file, except discrete ones, are included (see 
+	:func:`numeric_leaves`), so that no parameter table needs to be specified. Each 
+	input is changed in one value set of a matrix which is evaluated in a single call of
+	:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_batch`.
+
+	Derivatives are approximated by finite differences. Propagation of dual numbers
+	or complex steps is not possible, since the cash flow model and plugins contain
+	table lookups, thresholds and string processing of input values.
+	'''
+
+	def __init__(self, input_file):
+		self.inp = convert_input_to_dictionary(input_file)
+
+		settings = self.inp.get('Elasticity_Analysis', {})
+
+		self.step = settings.get('Step', {}).get('Value', 0.01)
+		self.scheme = settings.get('Scheme', {}).get('Value', 'forward')
+		self.processes = int(settings.get('Processes', {}).get('Value', 1))
+		self.backend = settings.get('Backend', {}).get('Value', 'process')
+		self.output_file = settings.get('Output File', {}).get('Value', None)
+
+		if 'Exclude' in settings:
+			self.excluded_tables = tuple(parse_parameter(settings['Exclude']['Value'], delimiter = ';'))
+		else:
+			self.excluded_tables = ()
+
+		self.perform_elasticity_analysis()
+
+		if self.output_file is not None:
+			self.save_results(self.output_file)
+
+	def perform_elasticity_analysis(self):
+		'''Evaluation of perturbed inputs and calculation of elasticities.
+
+		The unchanged values are evaluated as first value set of the same batch.
+
+		Returns
+		-------
+		self.paths : list
+			Paths of all included inputs.
+		self.h2_cost : float
+			H2 cost of unchanged input.
+		self.elasticities : ndarray
+			Elasticity of H2 cost for each input.
+		'''
+
+		start = timer()
+
+		self.paths, self.values = numeric_leaves(self.inp, self.excluded_tables)
+
+		matrix = np.concatenate([self.values[None], 
+								 perturbation_matrix(self.values, self.step, self.scheme)])
+		results = np.asarray(discounted_cash_flow_batch(self.inp, matrix, self.paths,
+														processes = self.processes,
+														backend = self.backend))
+
+		self.h2_cost, self.results = results[0], results[1:]
+		self.elasticities = elasticities(self.h2_cost, self.results, self.step, self.scheme)
+
+		end = timer()
+		print(f'Time Elasticity Analysis ({len(matrix)} evaluations):', end - start)
+
+	def results_table(self, number = None):
+		'''Inputs sorted by descending absolute elasticity.
+
+		Parameters
+		----------
+		number : int or None, optional
+			Number of inputs which are returned, all inputs if None.
+
+		Returns
+		-------
+		table : dict
+			Dictionary with input paths (top key > middle key > bottom key) as keys
+			and dictionaries with `Value` and `Elasticity` as values.
+		'''
+
+		order = np.argsort(-np.abs(self.elasticities), kind = 'stable')[:number]
+
+		return {reverse_parameter_to_string(self.paths[idx]): {'Value': self.values[idx],
+															  'Elasticity': self.elasticities[idx]}
+				for idx in order}
+
+	def save_results(self, file_name):
+		'''Writing ranked elasticity table to `file_name` (tab separated).'''
+
+		with open(Path(file_name), 'w') as file_write:
+			file_write.write('Parameter	Value	Elasticity\n')
+
+			for path, entry in self.results_table().items():
+				file_write.write(f"{path}	{entry['Value']}	{entry['Elasticity']}\n")
+
+	def elasticity_plot(self, number = 15, ax = None, figure_lean = True,
+						plot_kwargs = {}, **kwargs):
+		'''Bar chart of the inputs with the largest absolute elasticities.
+
+		Parameters
+		----------
+		number : int, optional
+			Number of inputs shown.
+		ax : matplotlib.axes, optional
+			Axes object in which plot is drawn. Default is None, creating new plot.
+		figure_lean : bool, optional
+			If figure_lean is True, matplotlib.fig object is returned.
+		plot_kwargs: dict, optional
+			Dictionary containing optional keyword arguments for
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`, has priority over `**kwargs`.
+		**kwargs:
+			Additional `kwargs` passed to
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`
+
+		Returns
+		-------
+		figure : matplotlib.fig or None
+			matplotlib.fig is returned if `figure_lean` is True.
+		'''
+
+		kwargs = {**{'left': 0.55, 'right': 0.97, 'bottom': 0.12, 'top': 0.97,
+					 'fig_width': 7.5, 'fig_height': 5, 'name': 'Elasticity_Plot'},
+				  **kwargs, **plot_kwargs}
+
+		if ax is None:
+			figure = Figure_Lean(**kwargs)
+			ax = figure.ax
+
+		table = self.results_table(number)
+		labels = list(table)[::-1]
+		values = np.array([table[label]['Elasticity'] for label in labels])
+
+		ax.barh(np.arange(len(labels)), values,
+				color = np.where(values > 0, 'darkred', 'darkgreen'))
+		ax.set_yticks(np.arange(len(labels)))
+		ax.set_yticklabels(labels)
+		ax.set_xlabel(r'Elasticity of H$_{2}$ cost')
+		ax.axvline(0, color = 'black', linewidth = 0.8)
+		ax.grid(color = 'grey', linestyle = '--', linewidth = 0.2)
+
+		if figure_lean is True:
+			figure.execute()
+			return figure.fig
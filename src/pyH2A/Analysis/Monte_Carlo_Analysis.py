@@ -1,18 +1,22 @@
 import multiprocessing
 import copy
+import hashlib
+import json
 from pathlib import Path
 from timeit import default_timer as timer
 import numpy as np
-from scipy.signal import savgol_filter
+from scipy.signal import savgol_filter, fftconvolve
 from scipy.spatial import distance as scipy_distance
+from scipy.spatial import cKDTree
 from scipy.stats import norm as normal_distribution
+from scipy.stats import truncnorm
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 from matplotlib.transforms import Bbox
 
 import pyH2A.Utilities.find_nearest as fn
 from pyH2A.Utilities.input_modification import convert_input_to_dictionary,parse_parameter, parse_parameter_to_array, get_by_path, set_by_path, read_textfile, file_import, reverse_parameter_to_string
-from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow, discounted_cash_flow_function, discounted_cash_flow_batch
 from pyH2A.Utilities.output_utilities import make_bold, format_scientific, dynamic_value_formatting, insert_image, Figure_Lean
 
 def select_non_reference_value(reference, values):
@@ -54,8 +58,69 @@ def normalize_parameter(parameter, base, limit, log_normalize = False):
 
 	return scaled
 
+def normalize_data(data, parameters, selection, log_normalize = False, 
+				   dtype = np.float64, chunk_size = 65536, rows = None, out = None):
+	'''Normalization of the parameters in `selection` for datapoints in `data`.
+
+	Parameters
+	----------
+	data : ndarray
+		2D array of datapoints containing parameter values for each model.
+	parameters : dict
+		Dictionary specifying ranges for each parameter.
+	selection : list
+		List of parameters names which are normalized.
+	log_normalize : bool, optional
+		Flag to control if log normalization is used instead of linear normalization.
+	dtype : numpy.dtype, optional
+		Data type of normalized array (e.g. `np.float32` to halve memory use).
+	chunk_size : int, optional
+		Number of rows which are normalized at once.
+	rows : slice or None, optional
+		Rows of `data` which are normalized. If None, all rows are normalized.
+	out : ndarray or None, optional
+		Array of shape (number of rows, len(selection)) in which normalized values
+		are stored. If None, a new array is created.
+
+	Returns
+	-------
+	out : ndarray
+		Normalized parameter values, the reference values are located at the origin.
+
+	Notes
+	-----
+	Normalization is performed in place on `out`, column by column and in chunks 
+	of `chunk_size` rows, so that only chunk sized temporary arrays are created.
+	'''
+
+	if rows is not None:
+		data = data[rows]
+
+	if out is None:
+		out = np.empty((len(data), len(selection)), dtype = dtype)
+
+	for start in range(0, len(data), chunk_size):
+		stop = min(start + chunk_size, len(data))
+
+		for counter, key in enumerate(selection):
+			column = out[start:stop, counter]
+			column[:] = data[start:stop, parameters[key]['Index']]
+
+			base = parameters[key]['Reference']
+			limit = parameters[key]['Limit']
+
+			if log_normalize:
+				column /= base
+				np.log10(column, out = column)
+				column /= np.log10(limit / base)
+			else:
+				column -= base
+				column /= limit - base
+
+	return out
+
 def calculate_distance(data, parameters, selection, metric = 'cityblock', log_normalize = False,
-					   sum_distance = False):
+					   sum_distance = False, dtype = np.float64, chunk_size = 65536):
 	'''
 	Distance of datapoints to reference is calculated using the specified metric.
 
@@ -76,6 +141,11 @@ def calculate_distance(data, parameters, selection, metric = 'cityblock', log_no
 		Flag to control if distance is calculated by simply summing individual 
 		normalized values (equal to cityblock distance but without using absolute values,
 		hence distance can be negative).
+	dtype : numpy.dtype, optional
+		Data type used for normalization and distances. `np.float32` halves the 
+		memory required for large Monte Carlo results.
+	chunk_size : int, optional
+		Number of datapoints processed at once.
 
 	Returns
 	-------
@@ -88,36 +158,206 @@ def calculate_distance(data, parameters, selection, metric = 'cityblock', log_no
 	a n-dimensional unit cube.
 	Distances are normalized by the number of dimensions, so that the maximum 
 	distance is always 1.
+	Datapoints are processed in chunks using a single buffer of `chunk_size` rows,
+	so that no full size temporary arrays are created. 'cityblock' and 'euclidean'
+	distances are computed directly, other metrics are passed to ``scipy.spatial.distance.cdist``.
 	'''
 
 	number_of_parameters = len(selection)
 
-	reference = []
-	data_scaled = np.empty((len(data), number_of_parameters))
-
-	for counter, key in enumerate(selection):
-		idx = parameters[key]['Index']
-		data_scaled[:,counter] = normalize_parameter(data[:,idx], parameters[key]['Reference'],
-													 parameters[key]['Limit'], 
-													 log_normalize = log_normalize)
-		reference.append(normalize_parameter(parameters[key]['Reference'], parameters[key]['Reference'],
-											 parameters[key]['Limit'],
-											 log_normalize = log_normalize))
-										
-	reference_scaled = np.array([reference])
-
 	if sum_distance:
-		distances = np.sum(data_scaled, axis = 1)
+		distances = np.empty(len(data), dtype = dtype)
+		distances_flat = distances
 	else:
-		distances = scipy_distance.cdist(data_scaled, reference_scaled, metric = metric)
+		distances = np.empty((len(data), 1), dtype = dtype)
+		distances_flat = distances[:,0]
 
-	if metric is 'cityblock':
-		distances = distances / number_of_parameters
+	if metric == 'cityblock':
+		scaling = number_of_parameters
 	else:
-		distances = distances / np.sqrt(number_of_parameters)
+		scaling = np.sqrt(number_of_parameters)
+
+	buffer = np.empty((min(chunk_size, len(data)), number_of_parameters), dtype = dtype)
+	reference_scaled = np.zeros((1, number_of_parameters))
+
+	for start in range(0, len(data), chunk_size):
+		stop = min(start + chunk_size, len(data))
+		chunk = normalize_data(data, parameters, selection, log_normalize = log_normalize, 
+							   chunk_size = chunk_size, rows = slice(start, stop), 
+							   out = buffer[:stop - start])
+		chunk_distances = distances_flat[start:stop]
+
+		if sum_distance:
+			np.sum(chunk, axis = 1, out = chunk_distances)
+		elif metric == 'cityblock':
+			np.abs(chunk, out = chunk)
+			np.sum(chunk, axis = 1, out = chunk_distances)
+		elif metric == 'euclidean':
+			np.square(chunk, out = chunk)
+			np.sum(chunk, axis = 1, out = chunk_distances)
+			np.sqrt(chunk_distances, out = chunk_distances)
+		else:
+			chunk_distances[:] = scipy_distance.cdist(chunk, reference_scaled, metric = metric)[:,0]
+
+	distances /= scaling
 
 	return distances
 
+def nearest_indices(distances, k = 1):
+	'''Indices of the `k` smallest `distances` in ascending order of distance.
+
+	Notes
+	-----
+	Uses ``numpy.argpartition`` so that only the `k` selected entries are sorted 
+	instead of performing a full argsort.
+	'''
+
+	distances = np.ravel(distances)
+	k = min(k, len(distances))
+
+	if k < len(distances):
+		idx = np.argpartition(distances, k - 1)[:k]
+	else:
+		idx = np.arange(len(distances))
+
+	return idx[np.argsort(distances[idx], kind = 'stable')]
+
+class Distance_Tree:
+	'''KD-tree of normalized datapoints for nearest neighbour queries 
+	with respect to the reference or arbitrary parameter combinations.
+
+	Parameters
+	----------
+	data : ndarray
+		2D array of datapoints containing parameter values for each model.
+	parameters : dict
+		Dictionary specifying ranges for each parameter.
+	selection : list
+		List of parameters names used for distance calculation.
+	metric : str, optional
+		Either 'cityblock' or 'euclidean'.
+	log_normalize : bool, optional
+		Flag to control if log normalization is used instead of linear normalization.
+	dtype : numpy.dtype, optional
+		Data type of normalized datapoints.
+
+	Notes
+	-----
+	Distances returned by queries are normalized in the same way as in
+	:func:`calculate_distance`.
+	'''
+
+	def __init__(self, data, parameters, selection, metric = 'cityblock', 
+				 log_normalize = False, dtype = np.float64):
+
+		if metric == 'cityblock':
+			self.p = 1
+			self.scaling = len(selection)
+		elif metric == 'euclidean':
+			self.p = 2
+			self.scaling = np.sqrt(len(selection))
+		else:
+			raise ValueError(f'Metric {metric} is not supported by Distance_Tree, use cityblock or euclidean.')
+
+		self.parameters = parameters
+		self.selection = selection
+		self.log_normalize = log_normalize
+		self.tree = cKDTree(normalize_data(data, parameters, selection, 
+										   log_normalize = log_normalize, dtype = dtype))
+
+	def query(self, k = 1, point = None):
+		'''Query `k` datapoints closest to `point`.
+
+		Parameters
+		----------
+		k : int, optional
+			Number of datapoints which are returned.
+		point : dict or None, optional
+			Dictionary with parameter values (keys are parameter names from
+			`selection`). If None, the reference is used.
+
+		Returns
+		-------
+		distances : ndarray
+			Normalized distances of the `k` closest datapoints in ascending order.
+		idx : ndarray
+			Indices of the `k` closest datapoints in `data`.
+		'''
+
+		if point is None:
+			point_scaled = np.zeros(len(self.selection))
+		else:
+			point_array = np.zeros((1, max(parameter['Index'] for parameter in self.parameters.values()) + 1))
+			for key in self.selection:
+				point_array[0, self.parameters[key]['Index']] = point[key]
+			point_scaled = normalize_data(point_array, self.parameters, self.selection,
+										  log_normalize = self.log_normalize)[0]
+
+		k = min(k, self.tree.n)
+		distances, idx = self.tree.query(point_scaled, k = [i + 1 for i in range(k)], p = self.p)
+
+		return distances / self.scaling, idx
+
+def hash_input(inp):
+	'''SHA-256 hash of input dictionary, used to identify the model and Monte Carlo
+	settings with which results were generated.
+
+	Notes
+	-----
+	`Methods - ` and `Arguments - ` tables as well as `Display Parameters`, 
+	`Input File`, `Output File`, `Distance Precision`, `Processes` and `Backend` 
+	entries of the `Monte_Carlo_Analysis` table are excluded, since they do not affect 
+	the Monte Carlo results. `Target Price Range ($)`, `Elite Fraction` and 
+	`Importance Batches` are only included for importance sampling, which draws 
+	samples based on them. Files referenced in the input (e.g. lookup tables) are 
+	only included by their path, not by their content.
+	'''
+
+	excluded_tables = ('Methods - ', 'Arguments - ', 'Display Parameters')
+	excluded_entries = ('Input File', 'Output File', 'Distance Precision', 'Processes', 'Backend')
+	importance_entries = ('Target Price Range ($)', 'Elite Fraction', 'Importance Batches')
+
+	relevant = {key: value for key, value in inp.items() if not key.startswith(excluded_tables)}
+
+	if 'Monte_Carlo_Analysis' in relevant:
+		if relevant['Monte_Carlo_Analysis'].get('Sampling', {}).get('Value', 'uniform') != 'importance':
+			excluded_entries = excluded_entries + importance_entries
+
+		relevant['Monte_Carlo_Analysis'] = {key: value for key, value in relevant['Monte_Carlo_Analysis'].items()
+											if key not in excluded_entries}
+
+	string = json.dumps(relevant, sort_keys = True, default = str)
+
+	return hashlib.sha256(string.encode('utf-8')).hexdigest()
+
+def read_header_entry(file_name, key):
+	'''Reading entry `key` (e.g. `Input Hash` or `Seed`) from header of Monte Carlo 
+	results file. Returns None if file does not exist or does not contain the entry.
+	'''
+
+	path = Path(file_name)
+
+	if not path.is_file():
+		return None
+
+	with open(path, 'r') as file_read:
+		for line in file_read:
+			if line[0] != '#':
+				break
+
+			line_split = line.strip(' #\n').split('	')
+			if line_split[0] == key and len(line_split) > 1:
+				return line_split[1]
+
+	return None
+
+def read_input_hash(file_name):
+	'''Reading input hash from header of Monte Carlo results file. Returns None
+	if file does not exist or does not contain a hash.
+	'''
+
+	return read_header_entry(file_name, 'Input Hash')
+
 def extend_limits(limits_original, extension):
 	'''Extend limits_original in both directions by muliplying with extensions'''
 
@@ -146,6 +386,431 @@ def coordinate_position(x_reference, x_values, y_reference, y_values):
 
 	return xtext, ytext
 
+SAMPLE_CHUNK_SIZE = 4096
+DEFENSIVE_FRACTION = 0.1
+
+def process_parameter_ranges(inp, table = 'Parameters - Monte_Carlo_Analysis'):
+	'''Processing of parameter ranges in `table` of `inp`.
+
+	Parameters
+	----------
+	inp : dict
+		Input dictionary.
+	table : str, optional
+		Name of table with one row per parameter (path to parameter as row name) 
+		and `Name`, `Type` and `Values` columns, see :class:`Monte_Carlo_Analysis`.
+
+	Returns
+	-------
+	parameters : dict
+		Dictionary with parameter names as keys. Each entry contains the path to the
+		parameter (`Parameter`), its `Type`, the sorted value range (`Values`), its base 
+		value in `inp` (`Reference`), its column position (`Index` and `Input Index`) 
+		and the value of the range which is not the reference value (`Limit`).
+	'''
+
+	monte = inp[table]
+	parameters = {}
+
+	for counter, key in enumerate(monte):
+		values_range = parse_parameter_to_array(monte[key]['Values'], delimiter = ';', 
+												dictionary = inp, 
+												top_key = table, 
+												middle_key = key, bottom_key = 'Values', 
+												special_values = ['Base', 'Reference'], 
+												path = key)
+
+		values_range = values_range[np.argsort(values_range)]
+
+		path = parse_parameter(key)
+		reference = get_by_path(inp, path)
+		limit = select_non_reference_value(reference, values_range)
+	
+		parameters[monte[key]['Name']] = {'Parameter': path, 'Type': monte[key]['Type'], 
+										  'Values': values_range, 'Reference': reference, 
+										  'Index': counter, 'Input Index': counter,
+										  'Limit': limit}
+
+	return parameters
+
+def read_results_header(file_name):
+	'''Reading parameter information from header of Monte Carlo results file (format
+	of :meth:`Monte_Carlo_Analysis.save_results`).
+
+	Parameters
+	----------
+	file_name : str
+		Path to file containing Monte Carlo simulation results.
+
+	Returns
+	-------
+	parameters : dict
+		Dictionary with column names as keys. Each entry contains the column position
+		(`Index`) and, for parameter columns, the path to the parameter (`Parameter`),
+		its `Type` and value range (`Values`).
+	'''
+
+	parameters = {}
+	column_dict = {}
+	row_dict = {0: 'Key', 1: 'Parameter', 2: 'Type', 3: 'Values'}
+
+	file_read = file_import(file_name, mode = 'r')
+
+	for row_counter, line in enumerate(file_read):
+
+		if line[0] != '#':
+			break
+		elif row_counter not in row_dict:
+			continue
+		else:
+			line_clean = line.strip(' #\n')
+			line_split = parse_parameter(line_clean, delimiter = '	')
+
+			for column_counter, element in enumerate(line_split):
+
+				if row_dict[row_counter] == 'Key':
+					parameters[element] = {}
+					parameters[element]['Index'] = column_counter
+					column_dict[column_counter] = element
+
+				else:
+					row_key = row_dict[row_counter]
+					column_key = column_dict[column_counter]
+					element = element.strip('[]')
+
+					if row_key == 'Parameter':
+						arr = []
+						split = element.split(',')
+						for i in split:
+							arr.append(i.strip("' "))
+						element = arr
+			
+					if row_key == 'Values':
+						element = np.fromstring(element, sep = ' ', dtype = float)
+
+					parameters[column_key][row_key] = element
+
+	file_read.close()
+
+	return parameters
+
+def chunk_generator(entropy, chunk):
+	'''Random number generator for chunk number `chunk` of Monte Carlo samples.
+
+	Parameters
+	----------
+	entropy : int
+		Seed (entropy of ``numpy.random.SeedSequence``) of Monte Carlo analysis.
+	chunk : int
+		Chunk number.
+
+	Returns
+	-------
+	generator : numpy.random.Generator
+		Generator seeded with the `chunk` child of the seed sequence of `entropy`
+		(identical to ``SeedSequence(entropy).spawn(chunk + 1)[chunk]``), so that
+		streams of different chunks are independent and each chunk can be generated
+		on its own.
+	'''
+
+	return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key = (chunk,)))
+
+def uniform_samples(lower, upper, samples, entropy, chunk_size = SAMPLE_CHUNK_SIZE):
+	'''Uniformly distributed samples generated chunk by chunk with independent streams.
+
+	Parameters
+	----------
+	lower : ndarray
+		Lower limits of parameters.
+	upper : ndarray
+		Upper limits of parameters.
+	samples : int
+		Number of samples.
+	entropy : int
+		Seed of Monte Carlo analysis, see :func:`chunk_generator`.
+	chunk_size : int, optional
+		Number of samples generated with the stream of one chunk.
+
+	Returns
+	-------
+	values : ndarray
+		2D array of shape (samples, parameters).
+
+	Notes
+	-----
+	Samples only depend on `entropy` and `chunk_size`, not on how the evaluation of 
+	the samples is distributed. Since the streams of chunks are consumed row by row, 
+	the first n samples of a run with more samples are identical to the samples 
+	of a run with n samples.
+	'''
+
+	lower = np.asarray(lower, dtype = float)
+	upper = np.asarray(upper, dtype = float)
+
+	values = np.empty((samples, len(lower)))
+
+	for chunk, start in enumerate(range(0, samples, chunk_size)):
+		stop = min(start + chunk_size, samples)
+		values[start:stop] = chunk_generator(entropy, chunk).uniform(lower, upper, 
+																	  (stop - start, len(lower)))
+
+	return values
+
+def target_price_score(h2_cost, target_price_range):
+	'''Difference between H2 cost and target price range (zero within range).'''
+
+	return np.maximum(target_price_range[0] - h2_cost, 0) + np.maximum(h2_cost - target_price_range[1], 0)
+
+def proposal_samples(proposal, samples, number_of_parameters, generator, 
+					 defensive = DEFENSIVE_FRACTION):
+	'''Samples of importance sampling proposal in the unit hypercube.
+
+	Parameters
+	----------
+	proposal : tuple or None
+		Location and scale (ndarrays) of independent normal distributions truncated
+		to [0, 1]. If None, samples are uniformly distributed.
+	samples : int
+		Number of samples.
+	number_of_parameters : int
+		Number of parameters.
+	generator : numpy.random.Generator
+		Random number generator.
+	defensive : float, optional
+		Fraction of samples drawn from the uniform distribution (defensive mixture).
+
+	Returns
+	-------
+	values : ndarray
+		2D array of shape (samples, number_of_parameters).
+	'''
+
+	if proposal is None:
+		return generator.random((samples, number_of_parameters))
+
+	location, scale = proposal
+	values = truncnorm.rvs(-location / scale, (1. - location) / scale, loc = location, 
+						   scale = scale, size = (samples, number_of_parameters), 
+						   random_state = generator)
+
+	uniform = generator.random(samples) < defensive
+	values[uniform] = generator.random((np.count_nonzero(uniform), number_of_parameters))
+
+	return values
+
+def proposal_density(values, proposal, defensive = DEFENSIVE_FRACTION):
+	'''Density of proposal (see :func:`proposal_samples`) at `values` in the unit 
+	hypercube.'''
+
+	if proposal is None:
+		return np.ones(len(values))
+
+	location, scale = proposal
+	normal = np.prod(truncnorm.pdf(values, -location / scale, (1. - location) / scale, 
+								   loc = location, scale = scale), axis = 1)
+
+	return defensive + (1. - defensive) * normal
+
+def importance_weights(values, proposals, batch_sizes, defensive = DEFENSIVE_FRACTION):
+	'''Importance weights of samples drawn in batches from different proposals.
+
+	Parameters
+	----------
+	values : ndarray
+		Samples of all batches in the unit hypercube, 2D array.
+	proposals : list
+		Proposal of each batch, see :func:`proposal_samples`.
+	batch_sizes : list
+		Number of samples in each batch.
+	defensive : float, optional
+		Fraction of uniform distribution in proposals.
+
+	Returns
+	-------
+	weights : ndarray
+		Weight of each sample, normalized to a mean of 1.
+
+	Notes
+	-----
+	Samples are weighted by the ratio of the uniform density and the mixture of all
+	proposals (weighted by batch sizes, "balance heuristic"), so that weighted 
+	averages are unbiased estimates for uniformly distributed parameters. Since each
+	proposal contains the uniform distribution with fraction `defensive`, weights 
+	are bounded.
+	'''
+
+	mixture = np.zeros(len(values))
+
+	for proposal, batch_size in zip(proposals, batch_sizes):
+		mixture += batch_size * proposal_density(values, proposal, defensive)
+
+	weights = 1. / mixture
+
+	return weights / np.mean(weights)
+
+def cross_entropy_update(values, scores, weights, elite_fraction = 0.1, previous = None,
+						 smoothing = 0.7, minimum_scale = 0.02):
+	'''Cross-entropy update of proposal towards samples with low `scores`.
+
+	Parameters
+	----------
+	values : ndarray
+		Samples in the unit hypercube, 2D array.
+	scores : ndarray
+		Score of each sample, see :func:`target_price_score`.
+	weights : ndarray
+		Importance weight of each sample.
+	elite_fraction : float, optional
+		Fraction of samples with lowest scores used for update. All samples with a 
+		score of zero are used if their fraction is larger.
+	previous : tuple or None, optional
+		Previous proposal, see :func:`proposal_samples`.
+	smoothing : float, optional
+		Weight of update compared to previous proposal.
+	minimum_scale : float, optional
+		Minimum scale of truncated normal distributions.
+
+	Returns
+	-------
+	proposal : tuple
+		Location and scale of truncated normal distributions.
+	'''
+
+	threshold = max(np.quantile(scores, elite_fraction), 0.)
+	elite = scores <= threshold
+
+	location = np.average(values[elite], axis = 0, weights = weights[elite])
+	scale = np.sqrt(np.average((values[elite] - location)**2, axis = 0, weights = weights[elite]))
+
+	if previous is None:
+		previous = (np.full(values.shape[1], 0.5), np.full(values.shape[1], np.sqrt(1. / 12.)))
+
+	location = smoothing * location + (1. - smoothing) * previous[0]
+	scale = smoothing * scale + (1. - smoothing) * previous[1]
+
+	return location, np.maximum(scale, minimum_scale)
+
+def adaptive_importance_sampling(evaluate, score, samples, number_of_parameters, entropy,
+								 batches = 5, elite_fraction = 0.1):
+	'''Adaptive importance sampling in the unit hypercube with the cross-entropy method.
+
+	Parameters
+	----------
+	evaluate : callable
+		Function returning model results for a 2D array of samples in the unit hypercube.
+	score : callable
+		Function returning a score for model results, which is zero within the target
+		region (see :func:`target_price_score`).
+	samples : int
+		Total number of samples.
+	number_of_parameters : int
+		Number of parameters.
+	entropy : int
+		Seed, batch n uses the stream of :func:`chunk_generator` for chunk n.
+	batches : int, optional
+		Number of batches in which samples are generated.
+	elite_fraction : float, optional
+		See :func:`cross_entropy_update`.
+
+	Returns
+	-------
+	values : ndarray
+		Samples of all batches in the unit hypercube.
+	results : ndarray
+		Model results.
+	weights : ndarray
+		Importance weights (see :func:`importance_weights`).
+
+	Notes
+	-----
+	The first batch is uniformly distributed. After each batch, the proposal is updated 
+	with :func:`cross_entropy_update` using all samples so far, so that increasing 
+	fractions of samples are located within the target region.
+	'''
+
+	batch_sizes = [len(batch) for batch in np.array_split(np.arange(samples), batches)]
+	proposals = [None]
+	values = np.empty((0, number_of_parameters))
+	results = np.empty(0)
+
+	for batch, batch_size in enumerate(batch_sizes):
+		batch_values = proposal_samples(proposals[-1], batch_size, number_of_parameters,
+										chunk_generator(entropy, batch))
+
+		values = np.concatenate([values, batch_values])
+		results = np.concatenate([results, evaluate(batch_values)])
+		weights = importance_weights(values, proposals, batch_sizes[:batch + 1])
+
+		if batch < len(batch_sizes) - 1:
+			proposals.append(cross_entropy_update(values, score(results), weights, 
+												  elite_fraction, proposals[-1]))
+
+	return values, results, weights
+
+def weighted_savgol_filter(values, weights, window_length, poly_order):
+	'''Savitzky-Golay filter with weighted least squares fits.
+
+	Parameters
+	----------
+	values : ndarray
+		1D array of values which are smoothed.
+	weights : ndarray or None
+		Weight of each value. If None, ``scipy.signal.savgol_filter`` is used.
+	window_length : int
+		Length of filter window (odd number).
+	poly_order : int
+		Order of polynomial fitted within each window.
+
+	Returns
+	-------
+	smoothed : ndarray
+		Smoothed values.
+
+	Notes
+	-----
+	Within each window, a polynomial is fitted to the values by weighted least 
+	squares and evaluated at the center of the window. Edges are treated like the 
+	'interp' mode of ``scipy.signal.savgol_filter``: the polynomials of the first and
+	last window are evaluated at the remaining positions. The sums of the normal 
+	equations are computed for all windows at once by convolution.
+	'''
+
+	if weights is None:
+		return savgol_filter(values, window_length, poly_order)
+
+	values = np.asarray(values, dtype = float)
+	weights = np.asarray(weights, dtype = float)
+
+	half = window_length // 2
+	positions = np.arange(-half, half + 1) / max(half, 1)
+	powers = positions[None,:] ** np.arange(2 * poly_order + 1)[:,None]
+
+	moments = np.array([fftconvolve(weights, power[::-1], mode = 'valid') for power in powers])
+	sums = np.array([fftconvolve(weights * values, power[::-1], mode = 'valid') 
+					 for power in powers[:poly_order + 1]])
+
+	order = np.arange(poly_order + 1)
+	matrices = np.moveaxis(moments[order[:,None] + order[None,:]], -1, 0)
+	coefficients = np.linalg.solve(matrices, sums.T[...,None])[...,0]
+
+	smoothed = np.empty(len(values))
+	smoothed[half:len(values) - half] = coefficients[:,0]
+	smoothed[:half] = powers[:poly_order + 1, :half].T @ coefficients[0]
+	smoothed[len(values) - half:] = powers[:poly_order + 1, half + 1:].T @ coefficients[-1]
+
+	return smoothed
+
+def weighted_normal_fit(values, weights = None):
+	'''Mean and standard deviation of `values` (weighted by `weights`).'''
+
+	if weights is None:
+		return normal_distribution.fit(values)
+
+	values = np.ravel(values)
+	mean = np.average(values, weights = weights)
+
+	return mean, np.sqrt(np.average((values - mean)**2, weights = weights))
+
 class Monte_Carlo_Analysis:
 	'''Monte Carlo analysis of a techno-economic model.
 
@@ -162,6 +827,32 @@ class Monte_Carlo_Analysis:
 	Monte_Carlo_Analysis > Input File > Value : str, optional
 		Path to location of file containing Monte Carlo analysis results that
 		should be read.
+	Monte_Carlo_Analysis > Processes > Value : int, optional
+		Number of processes used to evaluate Monte Carlo samples and
+		target price region grid points. Defaults to 1.
+	Monte_Carlo_Analysis > Backend > Value : str, optional
+		'process' (default) to evaluate Monte Carlo samples in worker processes or
+		'thread' to evaluate them in threads (see 
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`).
+	Monte_Carlo_Analysis > Seed > Value : int, optional
+		Seed for the generation of Monte Carlo samples. Runs with the same seed
+		produce identical samples and results, independent of the number of 
+		processes. If no seed is provided, a random seed is drawn and printed. The 
+		seed is stored in `self.seed` and in the header of the results file.
+	Monte_Carlo_Analysis > Sampling > Value : str, optional
+		'uniform' (default) to sample parameters uniformly within their ranges or
+		'importance' for adaptive importance sampling of the target price range 
+		(see :meth:`perform_importance_sampling`).
+	Monte_Carlo_Analysis > Importance Batches > Value : int, optional
+		Number of batches in which samples are generated for importance sampling.
+		Defaults to 5.
+	Monte_Carlo_Analysis > Elite Fraction > Value : float, optional
+		Fraction of samples closest to the target price range which is used to 
+		update the sampling density for importance sampling. Defaults to 0.1.
+	Monte_Carlo_Analysis > Distance Precision > Value : str, optional
+		Floating point type used for development distance calculations, 
+		either 'float64' (default) or 'float32' (halves memory use for large 
+		Monte Carlo results).
 	Parameters - Monte_Carlo_Analysis > [...] > Name : str
 		Display name for parameter, e.g. used for axis labels.
 	Parameters - Monte_Carlo_Analysis > [...] > Type : str
@@ -189,9 +880,18 @@ class Monte_Carlo_Analysis:
 	axis in `plot_colored_scatter` (first parameter is on x axis, second on y axis, etc.).
 	'''
 
-	def __init__(self, input_file):
+	def __init__(self, input_file, state = None):
 		'''Initialization of Monte Carlo analysis.
 
+		Parameters
+		----------
+		input_file : str or dict
+			Path to input file or input dictionary.
+		state : dict or None, optional
+			Monte Carlo results exported from another instance using `export_state()`
+			(e.g. computed in a separate process). If provided, Monte Carlo results
+			are neither read from file nor computed.
+
 		Notes 
 		-----
 		`self.inp` is generated from provided `input_file`. 
@@ -202,6 +902,8 @@ class Monte_Carlo_Analysis:
 		If 'Input File' is not specified, the parameters specified in `input_file` are processed 
 		and used to generate Monte Carlo simulation data (using `perform_monte_carlo_multiprocessing()`), 
 		which are stored in the specified 'Output File'.
+		If the 'Output File' already exists and its input hash (see :func:`hash_input`) matches the 
+		current input, the stored results are read instead of repeating the simulation.
 		Subsequently, Monte Carlo datapoints are selected based on the specified target price range, 
 		development distances are calculated and plots can be generated.
 		'''
@@ -215,18 +917,86 @@ class Monte_Carlo_Analysis:
 			self.color = 'darkgreen'
 			self.display_name = 'Model'
 
-		if 'Input File' in self.inp['Monte_Carlo_Analysis']:
+		if 'Distance Precision' in self.inp['Monte_Carlo_Analysis']:
+			self.distance_dtype = np.dtype(self.inp['Monte_Carlo_Analysis']['Distance Precision']['Value'])
+		else:
+			self.distance_dtype = np.dtype(np.float64)
+
+		if 'Processes' in self.inp['Monte_Carlo_Analysis']:
+			self.processes = int(self.inp['Monte_Carlo_Analysis']['Processes']['Value'])
+		else:
+			self.processes = 1
+
+		if 'Backend' in self.inp['Monte_Carlo_Analysis']:
+			self.backend = self.inp['Monte_Carlo_Analysis']['Backend']['Value']
+		else:
+			self.backend = 'process'
+
+		if 'Sampling' in self.inp['Monte_Carlo_Analysis']:
+			self.sampling = self.inp['Monte_Carlo_Analysis']['Sampling']['Value']
+		else:
+			self.sampling = 'uniform'
+
+		if self.sampling not in ('uniform', 'importance'):
+			raise ValueError(f"Sampling has to be 'uniform' or 'importance', not {self.sampling}.")
+
+		self.input_hash = hash_input(self.inp)
+		self.weights = None
+		self.seed = None
+		distances = None
+
+		if state is not None:
+			self.restore_state(state)
+			distances = state['Distances']
+		elif 'Input File' in self.inp['Monte_Carlo_Analysis']:
 			self.read_results(self.inp['Monte_Carlo_Analysis']['Input File']['Value'])
+		elif read_input_hash(self.inp['Monte_Carlo_Analysis']['Output File']['Value']) == self.input_hash:
+			self.read_results(self.inp['Monte_Carlo_Analysis']['Output File']['Value'])
 		else:
 			self.process_parameters()
-			self.perform_full_monte_carlo()
+
+			if self.sampling == 'importance':
+				self.perform_importance_sampling()
+			else:
+				self.perform_full_monte_carlo()
+
 			self.save_results(self.inp['Monte_Carlo_Analysis']['Output File']['Value'])
 
 		self.check_parameter_integrity(self.results)
 		self.target_price_components()
 		self.determine_principal_components()
 		self.development_distance()
-		self.full_distance_cost_relationship()
+		self.full_distance_cost_relationship(distances = distances)
+
+	def export_state(self):
+		'''Exporting Monte Carlo results in compact form, so that they can be
+		transferred between processes and used to initialize a new instance 
+		(`state` argument of `Monte_Carlo_Analysis`).
+
+		Returns
+		-------
+		state : dict
+			Dictionary containing Monte Carlo results (`Results`), parameter 
+			information (`Parameters`), target price range (`Target Price Range`),
+			development distances of all results (`Distances`), importance
+			sampling weights (`Weights`, None for uniform sampling) and the seed
+			with which samples were generated (`Seed`).
+		'''
+
+		return {'Results': self.results, 'Parameters': self.parameters,
+				'Target Price Range': self.target_price_range,
+				'Distances': self.results_distances, 'Weights': self.weights,
+				'Seed': self.seed}
+
+	def restore_state(self, state):
+		'''Restoring Monte Carlo results from `state` generated by `export_state()`.
+		'''
+
+		self.results = state['Results']
+		self.parameters = state['Parameters']
+		self.target_price_range = state['Target Price Range']
+		self.weights = state.get('Weights')
+		self.seed = state.get('Seed')
 
 	def process_parameters(self):
 		'''
@@ -240,46 +1010,42 @@ class Monte_Carlo_Analysis:
 		is specified, the base value of that parameter is retrieved from `self.inp`.
 		Parameter information is stored in `self.parameters` attribute.
 		Based on the ranges for each parameter, random values (uniform distribution) are generated and stored
-		in the `self.values` attribute.
+		in the `self.values` attribute, using independent streams for chunks of samples (see 
+		:func:`uniform_samples`) seeded with `Monte_Carlo_Analysis > Seed > Value`. For importance 
+		sampling, values are generated batch by batch in :meth:`perform_importance_sampling`.
 		The target price range is read from `self.inp` file and stored in `self.target_price_range` attribute.
 		'''
 
-		monte = self.inp['Parameters - Monte_Carlo_Analysis']
 		samples = self.inp['Monte_Carlo_Analysis']['Samples']['Value']
+		parameters = process_parameter_ranges(self.inp)
+		limits = np.array([parameter['Values'][:2] for parameter in parameters.values()]).T
 
-		number_parameters = len(monte)
-
-		values = np.empty((samples, number_parameters))
-		parameters = {}
-
-		for counter, key in enumerate(monte):
-			values_range = parse_parameter_to_array(monte[key]['Values'], delimiter = ';', 
-													dictionary = self.inp, 
-													top_key = 'Parameters - Monte_Carlo_Analysis', 
-													middle_key = key, bottom_key = 'Values', 
-													special_values = ['Base', 'Reference'], 
-													path = key)
+		if 'Seed' in self.inp['Monte_Carlo_Analysis']:
+			self.seed = int(self.inp['Monte_Carlo_Analysis']['Seed']['Value'])
+		else:
+			self.seed = np.random.SeedSequence().entropy
+			print(f'Monte Carlo seed: {self.seed}')
 
-			values_range = values_range[np.argsort(values_range)]
-			values[:,counter] = np.random.uniform(values_range[0], 
-												  values_range[1], 
-												  samples)
+		if self.sampling == 'uniform':
+			self.values = uniform_samples(limits[0], limits[1], samples, self.seed)
 
-			path = parse_parameter(key)
-			reference = get_by_path(self.inp, path)
-			limit = select_non_reference_value(reference, values_range)
-		
-			parameters[monte[key]['Name']] = {'Parameter': path, 'Type': monte[key]['Type'], 
-											  'Values': values_range, 'Reference': reference, 
-											  'Index': counter, 'Input Index': counter,
-											  'Limit': limit}
-	
-		self.values = values
 		self.parameters = parameters
 		self.target_price_range = parse_parameter_to_array(self.inp['Monte_Carlo_Analysis']['Target Price Range ($)']['Value'], 
 														   delimiter = ';', 
 														   dictionary = self.inp)
 
+	def parameter_specification(self):
+		'''Paths and value types of parameters, ordered by their column index
+		in `self.values`/`self.results`.
+		'''
+
+		ordered = sorted(self.parameters.values(), key = lambda parameter: parameter['Index'])
+
+		paths = [parameter['Parameter'] for parameter in ordered]
+		value_types = [parameter['Type'] for parameter in ordered]
+
+		return paths, value_types
+
 	def perform_h2_cost_calculation(self, values):
 		'''H2 cost calculation for provided parameter values is performed.
 
@@ -303,24 +1069,14 @@ class Monte_Carlo_Analysis:
 		by the existing value.
 		'''
 
-		parameters = self.parameters
-		h2_cost = []
+		paths, value_types = self.parameter_specification()
 
-		for value_set in values:
-			input_dict = copy.deepcopy(self.inp)
-
-			for key, parameter in parameters.items():
-				set_by_path(input_dict, parameter['Parameter'], value_set[parameter['Index']], 
-							value_type = parameter['Type'])
-
-			dcf = Discounted_Cash_Flow(input_dict, print_info = False)
-			h2_cost.append(dcf.h2_cost)
-
-		return np.asarray(h2_cost)
+		return np.asarray(discounted_cash_flow_function(self.inp, values, paths, 
+														value_types = value_types))
 
 	def perform_monte_carlo_multiprocessing(self, values, return_full_array = True):
-		'''Monte Carlo analysis is performed with multiprocessing parallelization across
-		all available CPUs.
+		'''Monte Carlo analysis is performed with multiprocessing parallelization
+		using `self.processes` worker processes.
 
 		Parameters
 		----------
@@ -337,17 +1093,22 @@ class Monte_Carlo_Analysis:
 			2D array containing parameter variations and H2 cost values.
 		h2_cost : ndarray
 			1D array containing H2 costvalues.
-		'''
 
-		# num_cpus = multiprocessing.cpu_count()
-		# pool = multiprocessing.Pool(num_cpus)
+		Notes
+		-----
+		Values are evaluated in chunks using 
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_batch`. The number
+		of processes is set by `Monte_Carlo_Analysis > Processes > Value` (default 
+		is 1, evaluating all values in the calling process), worker processes or 
+		threads are used depending on `Monte_Carlo_Analysis > Backend > Value`.
+		'''
 
-		# value_batches = divide_into_batches(values, np.ceil(len(values)/num_cpus))
-		
-		# h2_cost = pool.map(self.perform_h2_cost_calculation, value_batches)
-		# h2_cost = np.concatenate(h2_cost)
+		paths, value_types = self.parameter_specification()
 
-		h2_cost = self.perform_h2_cost_calculation(values)
+		h2_cost = np.asarray(discounted_cash_flow_batch(self.inp, values, paths, 
+														value_types = value_types,
+														processes = self.processes,
+														backend = self.backend))
 
 		if return_full_array is True:
 			return np.c_[self.values, h2_cost]
@@ -366,10 +1127,70 @@ class Monte_Carlo_Analysis:
 		end = timer()
 		print('Time Monte Carlo Multi:', end - start)
 
+	def perform_importance_sampling(self):
+		'''Monte Carlo analysis with adaptive importance sampling of the target price range.
+
+		Returns
+		-------
+		self.values : ndarray
+			Parameter values of all batches.
+		self.results : ndarray
+			2D array containing parameter values and H2 cost.
+		self.weights : ndarray
+			Importance weight of each sample (mean of 1).
+
+		Notes
+		-----
+		Samples are generated in `Monte_Carlo_Analysis > Importance Batches > Value` 
+		batches (see :func:`adaptive_importance_sampling`). The first batch is uniformly 
+		distributed. After each batch, the sampling density is updated using the cross-entropy
+		method (see :func:`cross_entropy_update`): independent truncated normal distributions (mixed with a uniform distribution, see
+		:func:`proposal_samples`) are fitted to the samples with H2 costs closest to the 
+		target price range, so that increasing fractions of samples are located within it.
+		Each sample is weighted by the ratio of the uniform density and the density of all
+		batches combined (see :func:`importance_weights`). Weighted statistics (e.g. 
+		development distance histogram and its mean and standard deviation) are therefore
+		unbiased estimates of those of uniform sampling, weighted counts correspond to 
+		uniform sampling with the same total number of samples.
+		'''
+
+		start = timer()
+
+		settings = self.inp['Monte_Carlo_Analysis']
+		samples = int(settings['Samples']['Value'])
+		batches = int(settings.get('Importance Batches', {}).get('Value', 5))
+		elite_fraction = settings.get('Elite Fraction', {}).get('Value', 0.1)
+
+		paths, value_types = self.parameter_specification()
+		limits = np.array([parameter['Values'][:2] for parameter in self.parameters.values()]).T
+
+		def evaluate(unit_values):
+			return discounted_cash_flow_batch(self.inp, limits[0] + unit_values * (limits[1] - limits[0]), 
+											  paths, value_types = value_types,
+											  processes = self.processes, backend = self.backend)
+
+		def score(h2_cost):
+			return target_price_score(h2_cost, self.target_price_range)
+
+		unit_values, h2_cost, self.weights = adaptive_importance_sampling(evaluate, score, samples, 
+																		  len(paths), self.seed,
+																		  batches, elite_fraction)
+
+		self.values = limits[0] + unit_values * (limits[1] - limits[0])
+		self.results = np.c_[self.values, h2_cost]
+
+		end = timer()
+		in_range = np.count_nonzero(score(h2_cost) == 0)
+		effective = np.sum(self.weights)**2 / np.sum(self.weights**2)
+		print('Time Monte Carlo Importance Sampling:', end - start)
+		print(f'Samples within target price range: {in_range} of {samples}, effective sample size: {effective:.0f}')
+
 	def save_results(self, file_name):
 		'''Results of Monte Carlo simulation are saved in `file_name` and a 
 		formatted header is added. Contains name, parameter path, type and values range 
-		from `self.parameters`.
+		from `self.parameters` as well as the input hash (`self.input_hash`) and the 
+		seed (`self.seed`).
+		Importance sampling weights are stored as additional `Weight` column.
 		'''
 
 		header_string = ''
@@ -384,9 +1205,18 @@ class Monte_Carlo_Analysis:
 			values_string += str(self.parameters[key]['Values']) + '	'
 
 		header_string += 'H2 Cost'
+		results = self.results
+
+		if self.weights is not None:
+			header_string += '	Weight'
+			results = np.c_[self.results, self.weights]
+
 		complete_string = header_string + '\n' + path_string + '\n' + type_string + '\n' + values_string
+		complete_string += '\n' + 'Input Hash	' + self.input_hash
+		complete_string += '\n' + 'Seed	' + str(self.seed)
 
-		np.savetxt(Path(file_name), self.results, header = complete_string, delimiter = '	')
+		np.savetxt(Path(file_name), results, header = complete_string, delimiter = '	')
+		read_textfile.cache_clear()
 
 	def read_results(self, file_name):
 		'''Reads Monte Carlo simulation results from `file_name`.
@@ -400,6 +1230,10 @@ class Monte_Carlo_Analysis:
 		-------
 		self.results : ndarray
 			Array containing parameters and H2 cost for each model.
+		self.weights : ndarray or None
+			Importance sampling weights, if `Weight` column is present.
+		self.seed : int or None
+			Seed with which samples were generated, if stored in header.
 		self.parameters : dict
 			Dictionary containing information on varied parameters.
 		self.target_price_range : ndarray
@@ -422,47 +1256,17 @@ class Monte_Carlo_Analysis:
 
 		self.results = read_textfile(file_name, delimiter = '	', mode = 'r')
 
-		parameters = {}
-		column_dict = {}
-		row_dict = {0: 'Key', 1: 'Parameter', 2: 'Type', 3: 'Values'}
-
-		file_read = file_import(file_name, mode = 'r')
-
-		for row_counter, line in enumerate(file_read):
-
-			if line[0] != '#':
-				break
-			else:
-				line_clean = line.strip(' #\n')
-				line_split = parse_parameter(line_clean, delimiter = '	')
-
-				for column_counter, element in enumerate(line_split):
-
-					if row_dict[row_counter] == 'Key':
-						parameters[element] = {}
-						parameters[element]['Index'] = column_counter
-						column_dict[column_counter] = element
+		parameters = read_results_header(file_name)
 
-					else:
-						row_key = row_dict[row_counter]
-						column_key = column_dict[column_counter]
-						element = element.strip('[]')
-
-						if row_key == 'Parameter':
-							arr = []
-							split = element.split(',')
-							for i in split:
-								arr.append(i.strip("' "))
-							element = arr
-				
-						if row_key == 'Values':
-							element = np.fromstring(element, sep = ' ', dtype = float)
+		del parameters['H2 Cost']
 
-						parameters[column_key][row_key] = element
+		if 'Weight' in parameters:
+			del parameters['Weight']
+			self.weights = np.array(self.results[:,-1])
+			self.results = self.results[:,:-1]
 
-		file_read.close()
-
-		del parameters['H2 Cost']
+		seed = read_header_entry(file_name, 'Seed')
+		self.seed = None if seed in (None, 'None') else int(seed)
 
 		for key in parameters:
 			parameters[key]['Reference'] = get_by_path(self.inp, parameters[key]['Parameter'])
@@ -637,15 +1441,22 @@ class Monte_Carlo_Analysis:
 	def target_price_components(self):
 		'''Monte Carlo simulation results are sorted by H2 cost and the entries of 
 		`self.results` with a H2 cost within the specified target price range are stored 
-		in `self.target_price_data`.
+		in `self.target_price_data` (and their importance sampling weights in 
+		`self.target_price_weights`).
 		'''
 
-		results_sorted = self.results[np.argsort(self.results[:,-1])]
+		order = np.argsort(self.results[:,-1])
+		results_sorted = self.results[order]
 		idx = fn.find_nearest(results_sorted[:,-1], self.target_price_range)
 		data = results_sorted[idx[0]:idx[1]]
 
 		self.target_price_data = data
 
+		if self.weights is None:
+			self.target_price_weights = None
+		else:
+			self.target_price_weights = self.weights[order][idx[0]:idx[1]]
+
 	def determine_principal_components(self):
 		'''Converting parameters to list sorted by input index.
 		'''
@@ -661,14 +1472,18 @@ class Monte_Carlo_Analysis:
 			self.principal[parameter['Input Index']] = key
 			self.base_case[parameter['Index']] = parameter['Reference']
 
-	def target_price_2D_region(self, grid_points = 15):
+	def target_price_2D_region(self, grid_points = 15, refinement_levels = 0):
 		'''Determining largest region spanned by first two parameters within which
 		target prices can be achieved.
 
 		Parameters
 		----------
 		grid_points : int, optional
-			Number of grid points to determine density of grid evaluation.
+			Number of grid points to determine density of initial grid evaluation.
+		refinement_levels : int, optional
+			Number of adaptive refinement steps. Each step halves the grid spacing
+			in cells whose corners lie on different sides of the target price range 
+			boundaries.
 
 		Returns
 		-------
@@ -679,43 +1494,98 @@ class Monte_Carlo_Analysis:
 		-----		
 		Model is evaluated on grid spanned by first two parameters (density of grid is controlled by 
 		grid_points), other parameters are set to limit (non-reference) values.
+		With `refinement_levels` > 0, the final grid has `(grid_points - 1) * 2**refinement_levels + 1`
+		points per axis. Only cells straddling a boundary of the target price range are subdivided
+		and evaluated, all other points are filled by bilinear interpolation of the enclosing cell,
+		which stays on the same side of the boundaries. The points of each refinement step are 
+		evaluated as one batch using `perform_monte_carlo_multiprocessing()`.
 		Output is a dictionary (`self.target_price_2D_region`), which can be used to overlay 
-		target price region onto scatter ploting using plt.contourf
+		target price region onto scatter ploting using plt.contourf. `Evaluations` contains the
+		number of H2 cost evaluations.
 		'''
 
-		grid_axes = np.empty((2, grid_points))
-		grid_idx = []
+		size = (grid_points - 1) * 2**refinement_levels + 1
 
-		values = np.empty((grid_points**2, len(self.parameters)))
+		grid_axes = np.empty((2, size))
+		grid_idx = {}
+
+		base_values = np.empty(len(self.parameters))
 
 		for key, parameter in self.parameters.items():
 			if parameter['Input Index'] < 2:
 				value_range = parameter['Values']
 
-				grid_axis = np.linspace(value_range[0], value_range[1], grid_points)
-				grid_axes[parameter['Input Index']] = grid_axis
-				grid_idx.append([parameter['Index'], parameter['Input Index']])
+				grid_axes[parameter['Input Index']] = np.linspace(value_range[0], value_range[1], size)
+				grid_idx[parameter['Input Index']] = parameter['Index']
 
 			else:
 				used_value = select_non_reference_value(parameter['Reference'], parameter['Values'])
-				values[:,parameter['Index']] = np.ones(len(values)) * used_value
+				base_values[parameter['Index']] = used_value
 
 				parameter['Target Price Range'] = {}
 				parameter['Target Price Range']['Range'] = self.target_price_range
 				parameter['Target Price Range']['Used Value'] = used_value
 
-		grid_values = np.meshgrid(*grid_axes)
-		grid_values_ravel = np.c_[[np.ravel(i) for i in grid_values]].T
+		h2_cost_2D = np.full((size, size), np.nan)
+		evaluations = 0
 
-		for idx, idx_input in grid_idx:
-			values[:,idx] = grid_values_ravel[:,idx_input]
+		def evaluate(rows, columns):
+			values = np.tile(base_values, (len(rows), 1))
+			values[:,grid_idx[0]] = grid_axes[0][columns]
+			values[:,grid_idx[1]] = grid_axes[1][rows]
 
-		self.check_parameter_integrity(values)	
+			self.check_parameter_integrity(values)
 
-		h2_cost = self.perform_monte_carlo_multiprocessing(values, return_full_array = False)
-		h2_cost_2D = np.reshape(h2_cost, (grid_points, grid_points))
+			h2_cost_2D[rows, columns] = self.perform_monte_carlo_multiprocessing(values, 
+																				 return_full_array = False)
+			return len(rows)
 
-		self.target_price_2D_region = {'Grid Values': grid_values, 'H2 Cost 2D': h2_cost_2D}
+		stride = 2**refinement_levels
+		rows, columns = np.meshgrid(np.arange(0, size, stride), np.arange(0, size, stride), indexing = 'ij')
+		evaluations += evaluate(rows.ravel(), columns.ravel())
+
+		boundaries = np.sort(self.target_price_range)
+
+		for level in range(refinement_levels):
+			half = stride // 2
+
+			category = np.digitize(h2_cost_2D[::stride, ::stride], boundaries)
+			straddling = ((category[:-1,:-1] != category[1:,:-1]) | 
+						  (category[:-1,:-1] != category[:-1,1:]) |
+						  (category[:-1,:-1] != category[1:,1:]))
+
+			cell_rows, cell_columns = np.nonzero(straddling)
+			cell_rows = cell_rows * stride
+			cell_columns = cell_columns * stride
+
+			rows = np.concatenate([cell_rows + half, cell_rows, cell_rows + half, 
+								   cell_rows + stride, cell_rows + half])
+			columns = np.concatenate([cell_columns, cell_columns + half, cell_columns + half,
+									  cell_columns + half, cell_columns + stride])
+
+			points = np.unique(np.c_[rows, columns], axis = 0)
+			points = points[np.isnan(h2_cost_2D[points[:,0], points[:,1]])]
+
+			if len(points) > 0:
+				evaluations += evaluate(points[:,0], points[:,1])
+
+			refined = h2_cost_2D[::half, ::half]
+			corners = refined[::2, ::2]
+
+			np.copyto(refined[1::2, ::2], 0.5 * (corners[:-1] + corners[1:]), 
+					  where = np.isnan(refined[1::2, ::2]))
+			np.copyto(refined[::2, 1::2], 0.5 * (corners[:,:-1] + corners[:,1:]), 
+					  where = np.isnan(refined[::2, 1::2]))
+			np.copyto(refined[1::2, 1::2], 0.25 * (corners[:-1,:-1] + corners[1:,:-1] + 
+												   corners[:-1,1:] + corners[1:,1:]),
+					  where = np.isnan(refined[1::2, 1::2]))
+
+			stride = half
+
+		grid_values = np.meshgrid(*grid_axes)
+
+		self.target_price_2D_region = {'Grid Values': grid_values, 'H2 Cost 2D': h2_cost_2D,
+									   'Evaluations': evaluations}
 
 	def development_distance(self, metric = 'cityblock', log_normalize = False, sum_distance = False):
 		'''Calculation of development distance for models within target price range.
@@ -735,26 +1605,92 @@ class Monte_Carlo_Analysis:
 		The euclidean or cityblock distance in n-dimensional space of each Monte Carlo simulation datapoint within 
 		the target price range to the reference point is calculated and stored in self.distances.
 		Parameter ranges and the reference parameters are scaled to be within a n-dimensional unit cube.
-		Distances are normalized by the number of dimensions, so that the maximum distance is always 1.'''
+		Distances are normalized by the number of dimensions, so that the maximum distance is always 1.
+		The closest datapoint is determined without sorting all distances, `self.target_distances_sorted`
+		is only sorted when it is accessed.'''
 
 		self.distances = calculate_distance(self.target_price_data, self.parameters, 
 											self.principal, metric = metric,
 											log_normalize = log_normalize,
-											sum_distance = sum_distance)
+											sum_distance = sum_distance,
+											dtype = self.distance_dtype)
+
+		self.distance_settings = {'metric': metric, 'log_normalize': log_normalize, 
+								  'sum_distance': sum_distance}
+		self._target_distances_sorted = None
+		self._distance_tree = None
 
-		target_distances = np.c_[self.target_price_data, self.distances]
-		self.target_distances_sorted = target_distances[np.argsort(target_distances[:,-1])]
+		closest = nearest_indices(self.distances)[0]
 
 		self.shortest_target_distance = {}
 
 		for key, item in self.parameters.items():
-			self.shortest_target_distance[key] = self.target_distances_sorted[0][item['Index']]
+			self.shortest_target_distance[key] = self.target_price_data[closest][item['Index']]
+
+		self.shortest_target_distance['H2 Cost ($/kg)'] = self.target_price_data[closest][-1]
+		self.shortest_target_distance['Distance'] = np.ravel(self.distances)[closest]
+
+	@property
+	def target_distances_sorted(self):
+		'''Datapoints within target price range with distances as last column,
+		sorted by distance (sorted on first access).
+		'''
+
+		if self._target_distances_sorted is None:
+			order = np.argsort(np.ravel(self.distances), kind = 'stable')
+			self._target_distances_sorted = np.c_[self.target_price_data[order], 
+												  np.ravel(self.distances)[order]]
 
-		self.shortest_target_distance['H2 Cost ($/kg)'] = self.target_distances_sorted[0][-2]
-		self.shortest_target_distance['Distance'] = self.target_distances_sorted[0][-1]
+		return self._target_distances_sorted
+
+	def nearest_target_models(self, k = 1, point = None):
+		'''Datapoints within target price range which are closest to the reference
+		or to the provided parameter combination.
+
+		Parameters
+		----------
+		k : int, optional
+			Number of datapoints which are returned.
+		point : dict or None, optional
+			Dictionary with parameter values (keys are parameter names). If None,
+			datapoints closest to the reference are returned.
+
+		Returns
+		-------
+		models : ndarray
+			Array containing the `k` closest datapoints (parameters and H2 cost) with 
+			their distance as last column, in ascending order of distance.
+
+		Notes
+		-----
+		Queries with respect to the reference use the distances calculated by 
+		`development_distance()` and partial sorting. Queries for other points are
+		answered by a KD-tree (:class:`Distance_Tree`), which is built once 
+		and reused for subsequent queries. Queries for other points require the
+		'cityblock' or 'euclidean' metric and `sum_distance` to be False.
+		'''
+
+		if point is None:
+			idx = nearest_indices(self.distances, k = k)
+			distances = np.ravel(self.distances)[idx]
+		else:
+			if self.distance_settings['sum_distance'] is True:
+				raise ValueError('Queries for arbitrary points are not available with sum_distance.')
+
+			if self._distance_tree is None:
+				self._distance_tree = Distance_Tree(self.target_price_data, self.parameters, 
+													self.principal, 
+													metric = self.distance_settings['metric'],
+													log_normalize = self.distance_settings['log_normalize'],
+													dtype = self.distance_dtype)
+
+			distances, idx = self._distance_tree.query(k = k, point = point)
+
+		return np.c_[self.target_price_data[idx], distances]
 
 	def full_distance_cost_relationship(self, metric = 'cityblock', reduction_factor = 25, 
-										poly_order = 4, log_normalize = False, sum_distance = False):
+										poly_order = 4, log_normalize = False, sum_distance = False,
+										distances = None):
 		'''Calculation of development distance for all datapoints from Monte Carlo Analysis and
 		calculation of Savitzky-Golay filter.
 
@@ -767,13 +1703,26 @@ class Monte_Carlo_Analysis:
 			Determines window size for Savitzky-Golay filter.
 		poly_order : int, optional
 			Order of polynomial for Savitzky-Golay filter
+		distances : ndarray or None, optional
+			Precomputed distances for all datapoints (e.g. restored using 
+			`restore_state()`). If None, distances are calculated.
 
 		Returns
 		-------
+		self.results_distances : ndarray
+			Distances for all datapoints, in the order of `self.results`.
 		self.results_distances_sorted : ndarray
-			Sorted array of distances for all datapoints from Monte Carlo Analysis.
+			Sorted array of distances for all datapoints from Monte Carlo Analysis
+			(sorted on first access).
 		self.distances_cost_savgol : ndarray
 			Savitzky-Golay filter results.
+
+		Notes
+		-----
+		Only the distances are argsorted, the H2 cost is gathered in that order for the
+		Savitzky-Golay filter. The full sorted array (`self.results_distances_sorted`)
+		is only created if it is accessed (e.g. for plotting). For importance sampling,
+		the filter uses weighted fits (see :func:`weighted_savgol_filter`).
 		'''
 
 		window_length = int(len(self.results)/reduction_factor)
@@ -781,17 +1730,41 @@ class Monte_Carlo_Analysis:
 		if window_length % 2 == 0:
 			window_length += 1
 
-		distances = calculate_distance(self.results, self.parameters, 
-									   self.principal, metric = metric,
-									   log_normalize = log_normalize,
-									   sum_distance = sum_distance)
+		if distances is None:
+			distances = calculate_distance(self.results, self.parameters, 
+										   self.principal, metric = metric,
+										   log_normalize = log_normalize,
+										   sum_distance = sum_distance,
+										   dtype = self.distance_dtype)
+
+		self.results_distances = distances
+		self._results_order = np.argsort(np.ravel(distances), kind = 'stable')
+		self._results_distances_sorted = None
+
+		distances_sorted = np.ravel(distances)[self._results_order]
+		weights = None if self.weights is None else self.weights[self._results_order]
+		smoothed = weighted_savgol_filter(self.results[self._results_order, -1], weights, 
+										  window_length, poly_order)
+	
+		self.distances_cost_savgol = np.c_[distances_sorted, smoothed]
 
-		results_distances = np.c_[self.results, distances]
-		self.results_distances_sorted = results_distances[np.argsort(results_distances[:,-1])]
+	@property
+	def results_distances_sorted(self):
+		'''All Monte Carlo datapoints with distances as last column, sorted by 
+		distance (created on first access).
+		'''
 
-		smoothed = savgol_filter(self.results_distances_sorted[:,-2], window_length, poly_order)
-	
-		self.distances_cost_savgol = np.c_[self.results_distances_sorted[:,-1], smoothed]
+		if self._results_distances_sorted is None:
+			order = self._results_order
+			sorted_array = np.empty((len(self.results), self.results.shape[1] + 1))
+
+			for column in range(self.results.shape[1]):
+				sorted_array[:,column] = self.results[order, column]
+			sorted_array[:,-1] = np.ravel(self.results_distances)[order]
+
+			self._results_distances_sorted = sorted_array
+
+		return self._results_distances_sorted
 
 	def plot_complete_histogram(self, bins = None, xlim_low = None, xlim_high = None,
 								xlabel_string = 'Levelized $H_{2}$ Cost / \$/kg', 
@@ -799,6 +1772,7 @@ class Monte_Carlo_Analysis:
 								image_kwargs = {}, plot_kwargs = {},
 								**kwargs):
 		'''Complete histogram of price distribution from Monte Carlo analysis
+		(weighted by importance sampling weights, if available).
 
 		Parameters 
 		----------
@@ -843,7 +1817,8 @@ class Monte_Carlo_Analysis:
 		if bins is None:
 			bins = int(len(self.results) / 20)
 
-		ax.hist(self.results[:,-1], bins = bins, density=True, color=self.color, edgecolor = 'black')
+		ax.hist(self.results[:,-1], bins = bins, density=True, color=self.color, edgecolor = 'black',
+				weights = self.weights)
 
 		ax.set_xlabel(xlabel_string)
 		ax.set_ylabel(ylabel_string)
@@ -862,7 +1837,7 @@ class Monte_Carlo_Analysis:
 							 title_string = 'Target cost range: ', 
 							 base_string = 'Base',
 							 image_kwargs = {}, plot_kwargs = {},  
-							 **kwargs):
+							 region_kwargs = {}, **kwargs):
 		'''Plotting colored scatter plot showing all models within target price range.
 
 		Parameters
@@ -879,6 +1854,10 @@ class Monte_Carlo_Analysis:
 		plot_kwargs: dict, optional
 			Dictionary containing optional keyword arguments for
 			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`, has priority over `**kwargs`.
+		region_kwargs: dict, optional
+			Dictionary containing optional keyword arguments for
+			:func:`~pyH2A.Analysis.Monte_Carlo_Analysis.Monte_Carlo_Analysis.target_price_2D_region`,
+			e.g. `{'refinement_levels': 3}` for sharper region contours.
 		**kwargs: 
 			Additional `kwargs` passed to 
 			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`
@@ -913,7 +1892,7 @@ class Monte_Carlo_Analysis:
 
 		cm = plt.get_cmap('plasma')
 
-		self.target_price_2D_region()
+		self.target_price_2D_region(**region_kwargs)
 
 		contour_fill = ax.contourf(*self.target_price_2D_region['Grid Values'], 
 							        self.target_price_2D_region['H2 Cost 2D'],
@@ -1023,7 +2002,8 @@ class Monte_Carlo_Analysis:
 								table_kwargs = {}, image_kwargs = {}, plot_kwargs = {},
 								 **kwargs):
 
-		'''Plotting development distances as histogram.
+		'''Plotting development distances as histogram (weighted by importance sampling weights,
+		if available).
 
 		Parameters
 		----------
@@ -1089,11 +2069,13 @@ class Monte_Carlo_Analysis:
 		if title is True:
 			ax.title.set_text(title_string + f' {self.target_price_range[0]} - {self.target_price_range[1]} \$/kg($H_{2}$)')
 
+		weights = None if self.target_price_weights is None else self.target_price_weights.reshape(self.distances.shape)
+
 		yhist, xhist, rectangle = ax.hist(self.distances, bins = bins, density=False, 
-										  color=self.color, edgecolor = 'black')
+										  color=self.color, edgecolor = 'black', weights = weights)
 		density = np.sum(np.diff(xhist) * yhist)
 	
-		mu, std = normal_distribution.fit(self.distances)
+		mu, std = weighted_normal_fit(self.distances, self.target_price_weights)
 
 		ax.set_xlim(0, 1)
 		xmin, xmax = plt.xlim()
@@ -0,0 +1,286 @@
+from timeit import default_timer as timer
+import numpy as np
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_batch
+from pyH2A.Analysis.Monte_Carlo_Analysis import process_parameter_ranges
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+from pyH2A.Utilities.plugin_input_output_processing import Template_File
+from pyH2A.Utilities.output_utilities import Figure_Lean
+
+def morris_trajectories(trajectories, number_of_parameters, levels = 4, seed = None):
+	'''Generation of Morris trajectories in the unit hypercube.
+
+	Parameters
+	----------
+	trajectories : int
+		Number of trajectories r.
+	number_of_parameters : int
+		Number of parameters d.
+	levels : int, optional
+		Number of grid levels p (even number).
+	seed : int or None, optional
+		Seed for random number generator.
+
+	Returns
+	-------
+	points : ndarray
+		Array of shape (r, d + 1, d) with the points of each trajectory.
+	order : ndarray
+		Array of shape (r, d), parameter which is changed in each step.
+	signs : ndarray
+		Array of shape (r, d), direction of step (+1 or -1) for each parameter.
+	delta : float
+		Step size, p / (2 (p - 1)).
+
+	Notes
+	-----
+	Each trajectory starts at a random grid point and changes one parameter at a time
+	by +delta or -delta, in random order, so that each parameter is changed exactly once
+	and all points stay within the unit hypercube (Morris 1991,
+	https://doi.org/10.1080/00401706.1991.10484804). All trajectories are generated at once.
+	'''
+
+	rng = np.random.default_rng(seed)
+	delta = levels / (2. * (levels - 1.))
+
+	base = rng.integers(0, levels // 2, size = (trajectories, number_of_parameters)) / (levels - 1.)
+	signs = rng.choice([-1, 1], size = (trajectories, number_of_parameters))
+	order = np.argsort(rng.random((trajectories, number_of_parameters)), axis = 1)
+
+	start = base + delta * (signs == -1)
+
+	steps = np.zeros((trajectories, number_of_parameters, number_of_parameters))
+	rows = np.arange(trajectories)[:,None]
+	step_idx = np.arange(number_of_parameters)[None,:]
+	steps[rows, step_idx, order] = signs[rows, order] * delta
+
+	points = start[:,None,:] + np.concatenate([np.zeros((trajectories, 1, number_of_parameters)),
+												np.cumsum(steps, axis = 1)], axis = 1)
+
+	return points, order, signs, delta
+
+def elementary_effects(results, order, signs, delta):
+	'''Elementary effects from model results along Morris trajectories.
+
+	Parameters
+	----------
+	results : ndarray
+		Model results of shape (r, d + 1) for points of :func:`morris_trajectories`.
+	order, signs, delta :
+		See :func:`morris_trajectories`.
+
+	Returns
+	-------
+	effects : ndarray
+		Array of shape (r, d) with elementary effects of each parameter (change of result
+		per change of parameter by its full range).
+	'''
+
+	rows = np.arange(len(results))[:,None]
+
+	effects = np.empty(order.shape)
+	effects[rows, order] = np.diff(results, axis = 1) / (signs[rows, order] * delta)
+
+	return effects
+
+class Morris_Analysis:
+	'''Morris elementary effects screening of parameters.
+
+	Parameters
+	----------
+	Morris_Analysis > Trajectories > Value : int, optional
+		Number of trajectories r. The model is evaluated r * (d + 1) times for d parameters.
+		Defaults to 10.
+	Morris_Analysis > Levels > Value : int, optional
+		Number of grid levels (even number). Defaults to 4.
+	Morris_Analysis > Seed > Value : int, optional
+		Seed for generation of trajectories.
+	Morris_Analysis > Processes > Value : int, optional
+		Number of processes used for evaluation. Defaults to 1.
+	Morris_Analysis > Backend > Value : str, optional
+		'process' (default) or 'thread', see
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`.
+	Morris_Analysis > Threshold > Value : float, optional
+		Parameters with mu* below `Threshold` times the largest mu* are negligible.
+		Defaults to 0.05.
+	Morris_Analysis > Output File > Value : str, optional
+		Path to which a `Parameters - Monte_Carlo_Analysis` table is written that only
+		contains the non-negligible parameters.
+	Parameters - Monte_Carlo_Analysis > [...] > Name : str
+		Display name for parameter, has to be unique.
+	Parameters - Monte_Carlo_Analysis > [...] > Type : str
+		Type of parameter values ('value' or 'factor').
+	Parameters - Monte_Carlo_Analysis > [...] > Values : str
+		Value range for parameter (see
+		:class:`~pyH2A.Analysis.Monte_Carlo_Analysis.Monte_Carlo_Analysis`).
+
+	Notes
+	-----
+	Trajectories are scaled from the unit hypercube to the parameter ranges and all
+	points are evaluated in one call of
+	:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_batch`. For each parameter, the
+	mean of absolute elementary effects (mu*, overall influence) and their standard
+	deviation (sigma, non-linearity and interactions) are calculated. Elementary effects
+	are changes of the H2 cost per change of a parameter by its full range, so that
+	parameters with different units can be ranked.
+	'''
+
+	def __init__(self, input_file):
+		self.inp = convert_input_to_dictionary(input_file)
+
+		settings = self.inp['Morris_Analysis']
+
+		self.trajectories = int(settings.get('Trajectories', {}).get('Value', 10))
+		self.levels = int(settings.get('Levels', {}).get('Value', 4))
+		self.processes = int(settings.get('Processes', {}).get('Value', 1))
+		self.backend = settings.get('Backend', {}).get('Value', 'process')
+		self.threshold = settings.get('Threshold', {}).get('Value', 0.05)
+		self.output_file = settings.get('Output File', {}).get('Value', None)
+
+		if 'Seed' in settings:
+			self.seed = int(settings['Seed']['Value'])
+		else:
+			self.seed = np.random.SeedSequence().entropy
+
+		self.check_parameter_names()
+		self.parameters = process_parameter_ranges(self.inp)
+		self.perform_morris_analysis()
+
+		if self.output_file is not None:
+			self.write_reduced_parameters(self.output_file)
+
+	def check_parameter_names(self):
+		'''Checking that names in `Parameters - Monte_Carlo_Analysis` are unique, since
+		parameters are identified by their names.
+		'''
+
+		names = [row['Name'] for row in self.inp['Parameters - Monte_Carlo_Analysis'].values()]
+		duplicates = sorted(set(name for name in names if names.count(name) > 1))
+
+		if len(duplicates) > 0:
+			raise ValueError(f'Parameter names in Parameters - Monte_Carlo_Analysis have to be unique, duplicate names: {duplicates}.')
+
+	def perform_morris_analysis(self):
+		'''Generation and evaluation of trajectories and calculation of elementary effects.
+
+		Returns
+		-------
+		self.effects : ndarray
+			Elementary effects of shape (r, d).
+		self.mu : ndarray
+			Mean elementary effects.
+		self.mu_star : ndarray
+			Mean absolute elementary effects.
+		self.sigma : ndarray
+			Standard deviation of elementary effects.
+		self.negligible : ndarray
+			Boolean array, True for negligible parameters.
+		'''
+
+		start = timer()
+
+		paths = [parameter['Parameter'] for parameter in self.parameters.values()]
+		value_types = [parameter['Type'] for parameter in self.parameters.values()]
+		limits = np.array([parameter['Values'][:2] for parameter in self.parameters.values()])
+
+		points, order, signs, delta = morris_trajectories(self.trajectories, len(paths),
+														  self.levels, self.seed)
+
+		self.values = (limits[:,0] + points * (limits[:,1] - limits[:,0])).reshape(-1, len(paths))
+		self.results = np.asarray(discounted_cash_flow_batch(self.inp, self.values, paths,
+															 value_types = value_types,
+															 processes = self.processes,
+															 backend = self.backend))
+
+		self.effects = elementary_effects(self.results.reshape(self.trajectories, len(paths) + 1),
+										  order, signs, delta)
+
+		self.mu = np.mean(self.effects, axis = 0)
+		self.mu_star = np.mean(np.abs(self.effects), axis = 0)
+
+		if self.trajectories > 1:
+			self.sigma = np.std(self.effects, axis = 0, ddof = 1)
+		else:
+			self.sigma = np.zeros(len(paths))
+
+		self.negligible = self.mu_star < self.threshold * np.max(self.mu_star)
+
+		end = timer()
+		print(f'Time Morris Analysis ({len(self.values)} evaluations):', end - start)
+
+	def results_table(self):
+		'''mu*, mu and sigma for each parameter, sorted by descending mu*.
+		'''
+
+		names = list(self.parameters)
+		table = {}
+
+		for counter in np.argsort(-self.mu_star):
+			table[names[counter]] = {'mu*': self.mu_star[counter], 'mu': self.mu[counter],
+									 'sigma': self.sigma[counter],
+									 'Negligible': bool(self.negligible[counter])}
+
+		return table
+
+	def reduced_parameters(self):
+		'''Rows of `Parameters - Monte_Carlo_Analysis` for non-negligible parameters.
+		Rows are identified by the `Input Index` of each parameter.
+		'''
+
+		rows = list(self.inp['Parameters - Monte_Carlo_Analysis'].items())
+		selected = sorted(parameter['Input Index'] for parameter, negligible 
+						  in zip(self.parameters.values(), self.negligible) if not negligible)
+
+		return dict(rows[index] for index in selected)
+
+	def write_reduced_parameters(self, file_name):
+		'''Writing `Parameters - Monte_Carlo_Analysis` table with non-negligible
+		parameters to `file_name` (markdown format, can be pasted into input file).
+		'''
+
+		template = Template_File({'Parameters - Monte_Carlo_Analysis': self.reduced_parameters()})
+		template.write_template_file(file_name)
+
+	def morris_plot(self, ax = None, figure_lean = True, plot_kwargs = {}, **kwargs):
+		'''Scatter plot of sigma versus mu* for all parameters.
+
+		Parameters
+		----------
+		ax : matplotlib.axes, optional
+			Axes object in which plot is drawn. Default is None, creating new plot.
+		figure_lean : bool, optional
+			If figure_lean is True, matplotlib.fig object is returned.
+		plot_kwargs: dict, optional
+			Dictionary containing optional keyword arguments for
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`, has priority over `**kwargs`.
+		**kwargs:
+			Additional `kwargs` passed to
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`
+
+		Returns
+		-------
+		figure : matplotlib.fig or None
+			matplotlib.fig is returned if `figure_lean` is True.
+		'''
+
+		kwargs = {**{'left': 0.15, 'right': 0.95, 'bottom': 0.15, 'top': 0.95,
+					 'fig_width': 5, 'fig_height': 4, 'name': 'Morris_Plot'},
+				  **kwargs, **plot_kwargs}
+
+		if ax is None:
+			figure = Figure_Lean(**kwargs)
+			ax = figure.ax
+
+		colors = np.where(self.negligible, 'grey', 'darkgreen')
+		ax.scatter(self.mu_star, self.sigma, c = colors)
+
+		for name, mu_star, sigma in zip(self.parameters, self.mu_star, self.sigma):
+			ax.annotate(name, xy = (mu_star, sigma), xytext = (3, 3),
+						textcoords = 'offset points')
+
+		ax.set_xlabel(r'$\mu^{*}$ / USD per kg $H_{2}$')
+		ax.set_ylabel(r'$\sigma$ / USD per kg $H_{2}$')
+		ax.grid(color = 'grey', linestyle = '--', linewidth = 0.2)
+
+		if figure_lean is True:
+			figure.execute()
+			return figure.fig
@@ -7,15 +7,99 @@ from timeit import default_timer as timer
 import pyH2A.Utilities.find_nearest as fn
 from pyH2A.Utilities.input_modification import convert_input_to_dictionary,parse_parameter, parse_parameter_to_array, get_by_path, set_by_path, read_textfile, file_import, reverse_parameter_to_string
 from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow, discounted_cash_flow_function, discounted_cash_flow_function_1D
+from pyH2A.Analysis.Monte_Carlo_Analysis import read_results_header
 from pyH2A.Utilities.output_utilities import make_bold, format_scientific, dynamic_value_formatting, insert_image, Figure_Lean
 
-class Optimization_Analysis:
-	'''Optimization of pyH2A models.
+def warm_start_values(file_name, parameters, bounds, inp, number = None):
+	'''Parameter values of the samples with the lowest H2 cost in a Monte Carlo
+	results file.
 
 	Parameters
 	----------
+	file_name : str
+		Path to Monte Carlo results file (format of
+		:meth:`~pyH2A.Analysis.Monte_Carlo_Analysis.Monte_Carlo_Analysis.save_results`).
+	parameters : list
+		Paths to parameters, [top_key, middle_key, bottom_key].
+	bounds : ndarray
+		Array of shape (len(parameters), 2) with lower and upper bounds.
+	inp : dict
+		Input dictionary, used to convert values of parameters of type 'factor'.
+	number : int or None, optional
+		Number of samples which are returned. If None, all samples are returned.
+
+	Returns
+	-------
+	values : ndarray
+		2D array with values of `parameters` for the samples, sorted by ascending
+		H2 cost and clipped to `bounds`. Values of parameters which are not
+		contained in `file_name` are NaN.
+	matched : ndarray
+		Boolean array, True for parameters which were found in `file_name`.
+
+	Notes
+	-----
+	Columns of the results file are matched to `parameters` by their path, so that
+	names and order of parameters can differ from those of the Monte Carlo analysis.
+	'''
+
+	results = read_textfile(file_name, delimiter = '	', mode = 'r')
+	header = read_results_header(file_name)
+	columns = {tuple(column['Parameter']): column for column in header.values()
+			   if 'Parameter' in column}
+
+	order = np.argsort(results[:,header['H2 Cost']['Index']], kind = 'stable')
+	best = results[order[:number]]
+
+	values = np.full((len(best), len(parameters)), np.nan)
+	matched = np.zeros(len(parameters), dtype = bool)
+
+	for counter, parameter in enumerate(parameters):
+		column = columns.get(tuple(parameter))
+
+		if column is None:
+			continue
+
+		values[:,counter] = best[:,column['Index']]
+		matched[counter] = True
 
+		if column['Type'] == 'factor':
+			values[:,counter] *= get_by_path(inp, parameter)
 
+	return np.clip(values, bounds[:,0], bounds[:,1]), matched
+
+class Optimization_Analysis:
+	'''Optimization of pyH2A models.
+
+	Parameters
+	----------
+	Optimization_Analysis > Method > Value : str, optional
+		'differential_evolution' (default) for global optimization or 'minimize' for
+		local optimization (Nelder-Mead) starting from the best Monte Carlo sample or
+		from the base values.
+	Optimization_Analysis > Monte Carlo File > Value : str, optional
+		Path to Monte Carlo results file whose samples with the lowest H2 cost are used
+		as initial population (differential evolution) or starting point (minimize).
+	Optimization_Analysis > Population Size > Value : int, optional
+		Population of differential evolution contains `Population Size` times the number
+		of parameters members. Defaults to 15.
+	Optimization_Analysis > Maximum Iterations > Value : int, optional
+		Maximum number of generations (differential evolution) or iterations (minimize).
+		Defaults to 1000.
+	Optimization_Analysis > Seed > Value : int, optional
+		Seed for random numbers of differential evolution.
+	Parameters - Optimization_Analysis > [...] > Bounds : str
+		Lower and upper bound of parameter, separated by ';'. 'Base' or 'Reference'
+		refer to the value of the parameter in the input file.
+
+	Notes
+	-----
+	`Parameters - Optimization_Analysis` contains the paths of parameters which are
+	optimized as row names (top key > middle key > bottom key). Monte Carlo results
+	are matched to these parameters by path (see :func:`warm_start_values`). Members of
+	the initial population for parameters which are not contained in the Monte Carlo
+	file, or if the file contains fewer samples than the population, are drawn
+	uniformly within the bounds.
 	'''
 
 	def __init__(self, input_file):
@@ -24,12 +108,20 @@ class Optimization_Analysis:
 
 		self.inp = convert_input_to_dictionary(input_file)
 
-		# start = timer()
+		settings = self.inp.get('Optimization_Analysis', {})
 
-		# Discounted_Cash_Flow(self.inp, print_info = False)
+		self.method = settings.get('Method', {}).get('Value', 'differential_evolution')
+		self.monte_carlo_file = settings.get('Monte Carlo File', {}).get('Value', None)
+		self.population_size = int(settings.get('Population Size', {}).get('Value', 15))
+		self.max_iterations = int(settings.get('Maximum Iterations', {}).get('Value', 1000))
 
-		# end = timer()
-		# print(end - start)
+		if 'Seed' in settings:
+			self.seed = int(settings['Seed']['Value'])
+		else:
+			self.seed = None
+
+		if self.method not in ('differential_evolution', 'minimize'):
+			raise ValueError(f"Method has to be 'differential_evolution' or 'minimize', not {self.method}.")
 
 		self.process_parameters()
 		self.perform_optimization()
@@ -48,11 +140,11 @@ class Optimization_Analysis:
 		for counter, key in enumerate(parameters):
 
 			parameter = parse_parameter(key)
-			bounds = parse_parameter_to_array(parameters[key]['Bounds'], delimiter = ';', 
-											  dictionary = self.inp, 
-											  top_key = 'Parameters - Optimization_Analysis', 
-											  middle_key = key, bottom_key = 'Bounds', 
-											  special_values = ['Base', 'Reference'], 
+			bounds = parse_parameter_to_array(parameters[key]['Bounds'], delimiter = ';',
+											  dictionary = self.inp,
+											  top_key = 'Parameters - Optimization_Analysis',
+											  middle_key = key, bottom_key = 'Bounds',
+											  special_values = ['Base', 'Reference'],
 											  path = key)
 
 			self.parameters.append(parameter)
@@ -61,14 +153,73 @@ class Optimization_Analysis:
 		self.bounds = np.asarray(self.bounds)
 		self.bounds = np.sort(self.bounds, axis = 1)
 
+	def initial_population(self):
+		'''Initial population of differential evolution from best Monte Carlo samples,
+		completed with uniformly distributed members.
+
+		Returns
+		-------
+		population : ndarray
+			Array of shape (`Population Size` * number of parameters, number of parameters).
+		'''
+
+		size = self.population_size * len(self.parameters)
+		generator = np.random.default_rng(self.seed)
+
+		population = generator.uniform(self.bounds[:,0], self.bounds[:,1],
+									   (size, len(self.parameters)))
+
+		values, matched = warm_start_values(self.monte_carlo_file, self.parameters,
+											self.bounds, self.inp, size)
+		population[:len(values), matched] = values[:,matched]
+
+		return population
+
+	def starting_point(self):
+		'''Starting point of local optimization: best Monte Carlo sample (if available)
+		with base values for parameters which are not contained in it.
+		'''
+
+		x0 = np.clip([get_by_path(self.inp, parameter) for parameter in self.parameters],
+					 self.bounds[:,0], self.bounds[:,1])
+
+		if self.monte_carlo_file is not None:
+			values, matched = warm_start_values(self.monte_carlo_file, self.parameters,
+												self.bounds, self.inp, 1)
+			x0[matched] = values[0, matched]
+
+		return x0
+
 	def perform_optimization(self):
-		'''Performing optimization using differential evolution algorithm and 
-		printing results.
+		'''Performing optimization using differential evolution algorithm (or local
+		optimization) and printing results.
+
+		Returns
+		-------
+		self.optimization_result : scipy.optimize.OptimizeResult
+			Result of optimization, including optimal values (`x`), H2 cost (`fun`)
+			and number of model evaluations (`nfev`).
 		'''
 
-		p = differential_evolution(func = discounted_cash_flow_function_1D, 
-								   bounds = self.bounds,
-								   args = (self.parameters, self.inp))
+		if self.method == 'minimize':
+			p = minimize(discounted_cash_flow_function_1D, x0 = self.starting_point(),
+						 args = (self.parameters, self.inp), method = 'Nelder-Mead',
+						 bounds = self.bounds, options = {'maxiter': self.max_iterations})
+
+		else:
+			if self.monte_carlo_file is not None:
+				init = self.initial_population()
+			else:
+				init = 'latinhypercube'
+
+			p = differential_evolution(func = discounted_cash_flow_function_1D,
+									   bounds = self.bounds,
+									   args = (self.parameters, self.inp),
+									   popsize = self.population_size,
+									   maxiter = self.max_iterations,
+									   init = init, seed = self.seed)
+
+		self.optimization_result = p
 
 		print('Optimization results:')
 		print('--------------------------------------------------------------------------------')
@@ -80,5 +231,3 @@ class Optimization_Analysis:
 
 		print(f'Optimal levelized cost of hydrogen: {p.fun} $/kg')
 		print('--------------------------------------------------------------------------------')
-
-
@@ -0,0 +1,230 @@
+import itertools
+from collections import deque
+import numbers
+from pathlib import Path
+from timeit import default_timer as timer
+import numpy as np
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_chunks
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, parse_parameter, parse_parameter_to_array
+
+def expand_scenarios(axes, mode = 'product'):
+	'''Lazy expansion of parameter axes into scenarios.
+
+	Parameters
+	----------
+	axes : list of ndarray
+		Values for each parameter axis.
+	mode : str, optional
+		'product' for the Cartesian product of all axes, 'zip' to combine the
+		n-th values of all axes (all axes need to have the same length).
+
+	Returns
+	-------
+	scenarios : iterator
+		Iterator yielding one tuple of parameter values per scenario.
+	number_of_scenarios : int
+		Number of scenarios.
+	'''
+
+	if mode == 'product':
+		return itertools.product(*axes), int(np.prod([len(axis) for axis in axes]))
+
+	elif mode == 'zip':
+		lengths = set(len(axis) for axis in axes)
+		if len(lengths) != 1:
+			raise ValueError(f'All parameter axes need to have the same length for zip mode, lengths are {[len(axis) for axis in axes]}.')
+		return zip(*axes), lengths.pop()
+
+	else:
+		raise ValueError(f"Scenario mode has to be 'product' or 'zip', not {mode}.")
+
+def chunk_scenarios(scenarios, chunk_size):
+	'''Grouping scenarios from iterator into 2D arrays with up to `chunk_size` rows.'''
+
+	while True:
+		chunk = list(itertools.islice(scenarios, chunk_size))
+
+		if len(chunk) == 0:
+			return
+
+		yield np.array(chunk, dtype = float)
+
+class Scenario_Analysis:
+	'''Evaluation of scenario matrices spanned by parameter axes.
+
+	Parameters
+	----------
+	Scenario_Analysis > Mode > Value : str, optional
+		'product' (default) to evaluate the Cartesian product of all parameter axes,
+		'zip' to combine the n-th values of all axes.
+	Scenario_Analysis > Output File > Value : str, optional
+		Path to tab separated file to which results are streamed. One column per
+		parameter and a final `H2 Cost` column.
+	Scenario_Analysis > Keep Results > Value : bool, optional
+		If True, results of all scenarios are kept in memory. If False, results are
+		only written to `Output File` and read back from it when `results` is 
+		accessed. Defaults to False if `Output File` is specified and is always
+		True otherwise.
+	Scenario_Analysis > Chunk Size > Value : int, optional
+		Number of scenarios evaluated and written at once. Defaults to 256.
+	Scenario_Analysis > Processes > Value : int, optional
+		Number of processes used for evaluation. Defaults to 1.
+	Parameters - Scenario_Analysis > [...] > Name : str
+		Display name for parameter, used as column name.
+	Parameters - Scenario_Analysis > [...] > Type : str
+		Type of parameter values. If `Type` is 'value', provided values are
+		used as is. If `Type` is 'factor', provided values are multiplied
+		with base value of parameter in input file.
+	Parameters - Scenario_Analysis > [...] > Values : str, optional
+		List of values for parameter, separated by ';' (e.g. '350; 700; 900').
+		'Base' or 'Reference' can be used to include base value of parameter.
+	Parameters - Scenario_Analysis > [...] > Range : str, optional
+		Evenly spaced values specified as start; stop; number of values
+		(e.g. '0.5; 1.5; 11'). Used if `Values` is not specified.
+
+	Notes
+	-----
+	First column of `Parameters - Scenario_Analysis` specifies path to parameter in input file
+	(top key > middle key > bottom key format, e.g. Catalyst > Cost per kg ($) > Value).
+	Scenarios are generated lazily and evaluated in chunks using
+	:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`, modified inputs
+	are only created in memory. Results of each chunk are appended to `Output File`
+	as soon as they are available.
+	'''
+
+	def __init__(self, input_file):
+		self.inp = convert_input_to_dictionary(input_file)
+
+		settings = self.inp.get('Scenario_Analysis', {})
+
+		self.mode = settings.get('Mode', {}).get('Value', 'product')
+		self.chunk_size = int(settings.get('Chunk Size', {}).get('Value', 256))
+		self.processes = int(settings.get('Processes', {}).get('Value', 1))
+		self.output_file = settings.get('Output File', {}).get('Value', None)
+		self.keep_results = (self.output_file is None or 
+							 str(settings.get('Keep Results', {}).get('Value', False)).lower() == 'true')
+
+		self.process_parameters()
+		self.perform_scenario_analysis()
+
+	def process_parameters(self):
+		'''Reading parameter axes from `Parameters - Scenario_Analysis` table.
+		'''
+
+		table = self.inp['Parameters - Scenario_Analysis']
+
+		self.names = []
+		self.paths = []
+		self.value_types = []
+		self.axes = []
+
+		for key, parameter in table.items():
+			if 'Values' in parameter and parameter['Values'] != 'n/a':
+				values = parameter['Values']
+
+				if isinstance(values, numbers.Number):
+					axis = np.array([values], dtype = float)
+				else:
+					axis = parse_parameter_to_array(values, delimiter = ';',
+													dictionary = self.inp,
+													top_key = 'Parameters - Scenario_Analysis',
+													middle_key = key, bottom_key = 'Values',
+													special_values = ['Base', 'Reference'],
+													path = key)
+
+			elif 'Range' in parameter and parameter['Range'] != 'n/a':
+				start, stop, number = parse_parameter_to_array(parameter['Range'], delimiter = ';')
+				axis = np.linspace(start, stop, int(number))
+
+			else:
+				raise KeyError(f'Neither Values nor Range are specified for {key} in Parameters - Scenario_Analysis.')
+
+			self.names.append(parameter['Name'])
+			self.paths.append(parse_parameter(key))
+			self.value_types.append(parameter['Type'])
+			self.axes.append(np.asarray(axis, dtype = float))
+
+	def perform_scenario_analysis(self):
+		'''Evaluating all scenarios and streaming results to `self.output_file`.
+
+		Returns
+		-------
+		self.results : ndarray
+			2D array with parameter values of each scenario and H2 cost
+			as last column (see :attr:`results`).
+		self.number_of_scenarios : int
+			Number of evaluated scenarios.
+		'''
+
+		start = timer()
+
+		scenarios, self.number_of_scenarios = expand_scenarios(self.axes, mode = self.mode)
+		chunks = chunk_scenarios(scenarios, self.chunk_size)
+
+		evaluation = discounted_cash_flow_chunks(self.inp, self._record_chunks(chunks), self.paths,
+												 value_types = self.value_types,
+												 processes = self.processes)
+
+		if self.output_file is not None:
+			file_write = open(Path(self.output_file), 'w')
+			file_write.write('# ' + '	'.join(self.names + ['H2 Cost']) + '\n')
+		else:
+			file_write = None
+
+		results = []
+
+		try:
+			for h2_cost in evaluation:
+				values = self._submitted.popleft()
+				chunk_results = np.c_[values, h2_cost]
+
+				if self.keep_results is True:
+					results.append(chunk_results)
+
+				if file_write is not None:
+					np.savetxt(file_write, chunk_results, delimiter = '	')
+					file_write.flush()
+		finally:
+			if file_write is not None:
+				file_write.close()
+
+		if self.keep_results is False:
+			self._results = None
+		elif len(results) > 0:
+			self._results = np.concatenate(results)
+		else:
+			self._results = np.empty((0, len(self.names) + 1))
+
+		end = timer()
+		print(f'Time Scenario Analysis ({self.number_of_scenarios} scenarios):', end - start)
+
+	def _record_chunks(self, chunks):
+		'''Keeping submitted chunks, so that their values can be combined with
+		the corresponding results.
+		'''
+
+		self._submitted = deque()
+
+		for chunk in chunks:
+			self._submitted.append(chunk)
+			yield chunk
+
+	@property
+	def results(self):
+		'''Parameter values of each scenario with H2 cost as last column. If results
+		are not kept in memory, they are read from `Output File`.
+		'''
+
+		if self._results is not None:
+			return self._results
+
+		return np.loadtxt(self.output_file, delimiter = '	', ndmin = 2).reshape(-1, len(self.names) + 1)
+
+	def results_table(self):
+		'''Scenario results as dictionary of columns (parameter names and `H2 Cost`).
+		'''
+
+		columns = self.names + ['H2 Cost']
+		results = self.results
+
+		return {name: results[:,counter] for counter, name in enumerate(columns)}
@@ -0,0 +1,293 @@
+from timeit import default_timer as timer
+import numpy as np
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_batch
+from pyH2A.Analysis.Monte_Carlo_Analysis import process_parameter_ranges, uniform_samples
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+from pyH2A.Utilities.output_utilities import Figure_Lean
+
+BOOTSTRAP_BLOCK_ELEMENTS = 2**22
+
+def saltelli_matrices(A, B):
+	'''Stacking of sample matrices for Saltelli evaluation.
+
+	Parameters
+	----------
+	A : ndarray
+		First sample matrix of shape (N, d).
+	B : ndarray
+		Second sample matrix of shape (N, d).
+
+	Returns
+	-------
+	values : ndarray
+		Array of shape ((d + 2) * N, d) containing `A`, `B` and the d matrices
+		A_B^(i), which are equal to `A` except for column i, which is taken from `B`.
+	'''
+
+	samples, number_of_parameters = A.shape
+
+	AB = np.repeat(A[None], number_of_parameters, axis = 0)
+	columns = np.arange(number_of_parameters)
+	AB[columns, :, columns] = B.T
+
+	return np.concatenate([A, B, AB.reshape(-1, number_of_parameters)])
+
+def split_saltelli_results(results, samples, number_of_parameters):
+	'''Splitting results of :func:`saltelli_matrices` evaluation into `f_A` (N,),
+	`f_B` (N,) and `f_AB` (N, d).'''
+
+	results = np.asarray(results, dtype = float)
+
+	f_A = results[:samples]
+	f_B = results[samples:2 * samples]
+	f_AB = results[2 * samples:].reshape(number_of_parameters, samples).T
+
+	return f_A, f_B, f_AB
+
+def sobol_indices(f_A, f_B, f_AB):
+	'''First-order and total Sobol indices.
+
+	Parameters
+	----------
+	f_A : ndarray
+		Model results for sample matrix A, shape (..., N).
+	f_B : ndarray
+		Model results for sample matrix B, shape (..., N).
+	f_AB : ndarray
+		Model results for matrices A_B^(i), shape (..., N, d).
+
+	Returns
+	-------
+	first_order : ndarray
+		First-order indices, shape (..., d).
+	total : ndarray
+		Total indices, shape (..., d).
+
+	Notes
+	-----
+	Estimators of Saltelli et al. 2010 (first-order) and Jansen 1999 (total),
+	https://doi.org/10.1016/j.cpc.2009.09.018. Leading dimensions are evaluated
+	independently (e.g. bootstrap resamples).
+	'''
+
+	variance = np.var(np.concatenate([f_A, f_B], axis = -1), axis = -1)[..., None]
+
+	first_order = np.mean(f_B[..., None] * (f_AB - f_A[..., None]), axis = -2) / variance
+	total = 0.5 * np.mean((f_A[..., None] - f_AB)**2, axis = -2) / variance
+
+	return first_order, total
+
+def bootstrap_sobol_indices(f_A, f_B, f_AB, resamples = 1000, confidence_level = 0.95,
+							seed = None):
+	'''Bootstrap confidence intervals of Sobol indices.
+
+	Parameters
+	----------
+	f_A, f_B, f_AB : ndarray
+		Model results, see :func:`sobol_indices`.
+	resamples : int, optional
+		Number of bootstrap resamples.
+	confidence_level : float, optional
+		Confidence level of intervals.
+	seed : int or None, optional
+		Seed for selection of resamples.
+
+	Returns
+	-------
+	first_order_interval : ndarray
+		Array of shape (2, d) with lower and upper limits of first-order indices.
+	total_interval : ndarray
+		Array of shape (2, d) with lower and upper limits of total indices.
+
+	Notes
+	-----
+	All resamples are drawn as one (resamples, N) index array and the indices of
+	all resamples are computed with :func:`sobol_indices` without Python loops over
+	resamples, in blocks of at most `BOOTSTRAP_BLOCK_ELEMENTS` resampled values to
+	bound memory use. Percentile intervals are returned.
+	'''
+
+	samples, number_of_parameters = f_AB.shape
+	idx = np.random.default_rng(seed).integers(0, samples, size = (resamples, samples))
+
+	block = max(1, BOOTSTRAP_BLOCK_ELEMENTS // (samples * (number_of_parameters + 2)))
+	first_order = np.empty((resamples, number_of_parameters))
+	total = np.empty((resamples, number_of_parameters))
+
+	for start in range(0, resamples, block):
+		block_idx = idx[start:start + block]
+		first_order[start:start + block], total[start:start + block] = sobol_indices(f_A[block_idx], 
+																					 f_B[block_idx], 
+																					 f_AB[block_idx])
+
+	quantiles = [(1. - confidence_level) / 2., 1. - (1. - confidence_level) / 2.]
+
+	return np.quantile(first_order, quantiles, axis = 0), np.quantile(total, quantiles, axis = 0)
+
+class Sobol_Analysis:
+	'''Global sensitivity analysis using first-order and total Sobol indices.
+
+	Parameters
+	----------
+	Sobol_Analysis > Samples > Value : int
+		Number of base samples N. The model is evaluated N * (d + 2) times for d parameters.
+	Sobol_Analysis > Seed > Value : int, optional
+		Seed for generation of samples and bootstrap resamples.
+	Sobol_Analysis > Processes > Value : int, optional
+		Number of processes used for evaluation. Defaults to 1.
+	Sobol_Analysis > Backend > Value : str, optional
+		'process' (default) or 'thread', see
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`.
+	Sobol_Analysis > Bootstrap Resamples > Value : int, optional
+		Number of bootstrap resamples for confidence intervals. Defaults to 1000.
+	Sobol_Analysis > Confidence Level > Value : float, optional
+		Confidence level of intervals. Defaults to 0.95.
+	Parameters - Monte_Carlo_Analysis > [...] > Name : str
+		Display name for parameter.
+	Parameters - Monte_Carlo_Analysis > [...] > Type : str
+		Type of parameter values ('value' or 'factor').
+	Parameters - Monte_Carlo_Analysis > [...] > Values : str
+		Value range for parameter (see
+		:class:`~pyH2A.Analysis.Monte_Carlo_Analysis.Monte_Carlo_Analysis`).
+
+	Notes
+	-----
+	Parameters are sampled uniformly within their ranges using the seeded streams of
+	:func:`~pyH2A.Analysis.Monte_Carlo_Analysis.uniform_samples`. Sample matrices A and B
+	and the Saltelli matrices A_B^(i) (see :func:`saltelli_matrices`) are stacked and
+	evaluated in one call of :func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_batch`.
+	First-order indices quantify the variance contribution of a parameter on its own,
+	total indices include all its interactions with other parameters.
+	'''
+
+	def __init__(self, input_file):
+		self.inp = convert_input_to_dictionary(input_file)
+
+		settings = self.inp['Sobol_Analysis']
+
+		self.samples = int(settings['Samples']['Value'])
+		self.processes = int(settings.get('Processes', {}).get('Value', 1))
+		self.backend = settings.get('Backend', {}).get('Value', 'process')
+		self.resamples = int(settings.get('Bootstrap Resamples', {}).get('Value', 1000))
+		self.confidence_level = settings.get('Confidence Level', {}).get('Value', 0.95)
+
+		if 'Seed' in settings:
+			self.seed = int(settings['Seed']['Value'])
+		else:
+			self.seed = np.random.SeedSequence().entropy
+
+		self.parameters = process_parameter_ranges(self.inp)
+		self.perform_sobol_analysis()
+
+	def perform_sobol_analysis(self):
+		'''Generation and evaluation of Saltelli matrices and calculation of indices.
+
+		Returns
+		-------
+		self.first_order : ndarray
+			First-order indices in order of `self.parameters`.
+		self.total : ndarray
+			Total indices.
+		self.first_order_interval : ndarray
+			Lower and upper limits of first-order indices, shape (2, d).
+		self.total_interval : ndarray
+			Lower and upper limits of total indices, shape (2, d).
+		'''
+
+		start = timer()
+
+		paths = [parameter['Parameter'] for parameter in self.parameters.values()]
+		value_types = [parameter['Type'] for parameter in self.parameters.values()]
+		limits = np.array([parameter['Values'][:2] for parameter in self.parameters.values()])
+
+		number_of_parameters = len(paths)
+
+		samples = uniform_samples(np.tile(limits[:,0], 2), np.tile(limits[:,1], 2),
+								  self.samples, self.seed)
+		A, B = samples[:,:number_of_parameters], samples[:,number_of_parameters:]
+
+		self.values = saltelli_matrices(A, B)
+		self.results = np.asarray(discounted_cash_flow_batch(self.inp, self.values, paths,
+															 value_types = value_types,
+															 processes = self.processes,
+															 backend = self.backend))
+
+		f_A, f_B, f_AB = split_saltelli_results(self.results, self.samples, number_of_parameters)
+
+		self.first_order, self.total = sobol_indices(f_A, f_B, f_AB)
+		self.first_order_interval, self.total_interval = bootstrap_sobol_indices(f_A, f_B, f_AB,
+																			   self.resamples,
+																			   self.confidence_level,
+																			   self.seed)
+
+		end = timer()
+		print(f'Time Sobol Analysis ({len(self.values)} evaluations):', end - start)
+
+	def results_table(self):
+		'''Sobol indices and confidence intervals for each parameter, sorted by
+		descending total index.
+		'''
+
+		table = {}
+
+		for counter in np.argsort(-self.total):
+			name = list(self.parameters)[counter]
+			table[name] = {'First Order': self.first_order[counter],
+						   'First Order Interval': self.first_order_interval[:,counter],
+						   'Total': self.total[counter],
+						   'Total Interval': self.total_interval[:,counter]}
+
+		return table
+
+	def sobol_plot(self, ax = None, figure_lean = True, width = 0.38,
+				   plot_kwargs = {}, **kwargs):
+		'''Bar chart of first-order and total Sobol indices with confidence intervals.
+
+		Parameters
+		----------
+		ax : matplotlib.axes, optional
+			Axes object in which plot is drawn. Default is None, creating new plot.
+		figure_lean : bool, optional
+			If figure_lean is True, matplotlib.fig object is returned.
+		width : float, optional
+			Width of bars.
+		plot_kwargs: dict, optional
+			Dictionary containing optional keyword arguments for
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`, has priority over `**kwargs`.
+		**kwargs:
+			Additional `kwargs` passed to
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`
+
+		Returns
+		-------
+		figure : matplotlib.fig or None
+			matplotlib.fig is returned if `figure_lean` is True.
+		'''
+
+		kwargs = {**{'left': 0.3, 'right': 0.97, 'bottom': 0.15, 'top': 0.95,
+					 'fig_width': 6.5, 'fig_height': 4, 'name': 'Sobol_Plot'},
+				  **kwargs, **plot_kwargs}
+
+		if ax is None:
+			figure = Figure_Lean(**kwargs)
+			ax = figure.ax
+
+		order = np.argsort(self.total)
+		names = np.array(list(self.parameters))[order]
+		positions = np.arange(len(order))
+
+		for offset, indices, interval, color, label in [(-width / 2, self.first_order, self.first_order_interval, 'darkgreen', 'First order'),
+														(width / 2, self.total, self.total_interval, 'darkred', 'Total')]:
+			error = np.abs(interval[:,order] - indices[order])
+			ax.barh(positions + offset, indices[order], height = width, xerr = error,
+					color = color, label = label, capsize = 2)
+
+		ax.set_yticks(positions)
+		ax.set_yticklabels(names)
+		ax.set_xlabel('Sobol index')
+		ax.legend(loc = 'lower right')
+		ax.grid(color = 'grey', linestyle = '--', linewidth = 0.2)
+
+		if figure_lean is True:
+			figure.execute()
+			return figure.fig
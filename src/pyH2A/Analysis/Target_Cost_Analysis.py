@@ -0,0 +1,307 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from timeit import default_timer as timer
+import numpy as np
+from scipy.optimize import brentq
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_function
+from pyH2A.Analysis.Monte_Carlo_Analysis import process_parameter_ranges
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, reverse_parameter_to_string
+from pyH2A.Utilities.output_utilities import Figure_Lean
+import pyH2A.Utilities.lookup_tables as lookup_tables
+import pyH2A.Utilities.shared_arrays as shared_arrays
+
+def expand_bracket(function, lower, upper, f_lower, f_upper, max_expansions = 10, factor = 1.6):
+	'''Expansion of interval until `function` changes sign within it.
+
+	Parameters
+	----------
+	function : callable
+		Function of one variable.
+	lower, upper : float
+		Initial interval.
+	f_lower, f_upper : float
+		Function values at `lower` and `upper`.
+	max_expansions : int, optional
+		Maximum number of additional function evaluations.
+	factor : float, optional
+		Expansion relative to the width of the interval if no secant estimate is available.
+
+	Returns
+	-------
+	lower, upper, f_lower, f_upper : float
+		Final interval and function values.
+	bracketed : bool
+		True if `function` changes sign within the final interval.
+
+	Notes
+	-----
+	The interval is extended beyond the end with the smaller absolute function value,
+	towards the secant estimate of the root (overshooting it by 20 %, by at least a
+	tenth and at most ten times the interval width). If the function value at the new
+	point is closer to zero or has a different sign, the new interval spans the new
+	point and the previous end, so that it stays narrow. Otherwise (e.g. beyond a
+	minimum of the function), the interval is extended. Ends do not change their sign:
+	an end approaching zero is reduced to a tenth of its value instead.
+	'''
+
+	for expansion in range(max_expansions):
+		if np.sign(f_lower) != np.sign(f_upper):
+			return lower, upper, f_lower, f_upper, True
+
+		width = upper - lower
+		step = factor * width
+
+		if f_upper != f_lower:
+			secant = upper - f_upper * width / (f_upper - f_lower)
+			distance = (lower - secant) if abs(f_lower) < abs(f_upper) else (secant - upper)
+
+			if distance > 0:
+				step = np.clip(1.2 * distance, 0.1 * width, 10 * width)
+
+		if abs(f_lower) < abs(f_upper):
+			new = lower - step
+			if lower > 0 and new <= 0:
+				new = 0.1 * lower
+			f_new = function(new)
+			if abs(f_new) < abs(f_lower) or np.sign(f_new) != np.sign(f_lower):
+				upper, f_upper = lower, f_lower
+			lower, f_lower = new, f_new
+		else:
+			new = upper + step
+			if upper < 0 and new >= 0:
+				new = 0.1 * upper
+			f_new = function(new)
+			if abs(f_new) < abs(f_upper) or np.sign(f_new) != np.sign(f_upper):
+				lower, f_lower = upper, f_upper
+			upper, f_upper = new, f_new
+
+	return lower, upper, f_lower, f_upper, np.sign(f_lower) != np.sign(f_upper)
+
+def solve_target_cost(inp, parameter, value_type, bracket, target, tolerance = 1e-6,
+					  max_expansions = 10):
+	'''Value of one parameter at which H2 cost equals `target`.
+
+	Parameters
+	----------
+	inp : dict
+		Input dictionary. Large arrays can be references to shared memory (see
+		:mod:`~pyH2A.Utilities.shared_arrays`).
+	parameter : list
+		Path to parameter, [top_key, middle_key, bottom_key].
+	value_type : str
+		'value' or 'factor', see :func:`~pyH2A.Utilities.input_modification.set_by_path`.
+	bracket : ndarray
+		Initial interval for parameter value.
+	target : float
+		Target H2 cost.
+	tolerance : float, optional
+		Tolerance of parameter value, relative to the size of the initial interval ends.
+	max_expansions : int, optional
+		Maximum number of interval expansions, see :func:`expand_bracket`.
+
+	Returns
+	-------
+	result : dict
+		`Value` of the parameter (NaN if no interval containing the target was found),
+		`H2 Cost` at this value, number of model `Evaluations`, `Bracketed` (True if an
+		interval containing the target was found) and `Converged` (True if Brent's
+		method converged within this interval).
+
+	Notes
+	-----
+	The root is found with Brent's method (``scipy.optimize.brentq``) once a
+	bracketing interval is found. Model results are cached, so that the ends of the
+	interval are not evaluated again.
+	'''
+
+	inp = shared_arrays.attach_arrays(inp)
+	cache = {}
+
+	def difference(value):
+		if value not in cache:
+			cache[value] = discounted_cash_flow_function(inp, [value], parameter,
+														 value_types = value_type)[0] - target
+		return cache[value]
+
+	lower, upper = float(bracket[0]), float(bracket[-1])
+	lower, upper, f_lower, f_upper, bracketed = expand_bracket(difference, lower, upper,
+															   difference(lower), difference(upper),
+															   max_expansions)
+
+	if not bracketed:
+		return {'Value': np.nan, 'H2 Cost': np.nan, 'Evaluations': len(cache),
+				'Bracketed': False, 'Converged': False}
+
+	xtol = tolerance * max(abs(float(bracket[0])), abs(float(bracket[-1])))
+	value, info = brentq(difference, lower, upper, xtol = xtol, full_output = True,
+						 disp = False)
+
+	return {'Value': value, 'H2 Cost': difference(value) + target, 'Evaluations': len(cache),
+			'Bracketed': True, 'Converged': info.converged}
+
+class Target_Cost_Analysis:
+	'''Parameter values at which the H2 cost equals a target cost.
+
+	Parameters
+	----------
+	Target_Cost_Analysis > Target Price ($) > Value : float
+		Target H2 cost.
+	Target_Cost_Analysis > Processes > Value : int, optional
+		Number of parameters which are solved concurrently. Defaults to the number of
+		available CPUs.
+	Target_Cost_Analysis > Backend > Value : str, optional
+		'process' (default) or 'thread', see
+		:func:`~pyH2A.Discounted_Cash_Flow.discounted_cash_flow_chunks`.
+	Target_Cost_Analysis > Tolerance > Value : float, optional
+		Tolerance of parameter values relative to the initial interval. Defaults to 1e-6.
+	Target_Cost_Analysis > Maximum Expansions > Value : int, optional
+		Maximum number of evaluations for expansion of initial interval. Defaults to 10.
+	Parameters - Target_Cost_Analysis > [...] > Name : str
+		Display name for parameter.
+	Parameters - Target_Cost_Analysis > [...] > Type : str
+		Type of parameter values ('value' or 'factor').
+	Parameters - Target_Cost_Analysis > [...] > Values : str
+		Initial interval for parameter values, separated by ';'. `Base` or `Reference`
+		refer to the value of the parameter in the input file.
+
+	Notes
+	-----
+	For each parameter, the other parameters are kept at their values in the input
+	file. The initial interval is expanded until it contains the target cost and the
+	parameter value is determined with Brent's method (see :func:`solve_target_cost`),
+	which typically requires fewer than 15 model evaluations per parameter. Parameters
+	are solved concurrently, one parameter per worker. If no interval containing the
+	target is found, the value of the parameter is NaN.
+	'''
+
+	def __init__(self, input_file):
+		self.inp = convert_input_to_dictionary(input_file)
+
+		settings = self.inp['Target_Cost_Analysis']
+
+		self.target = settings['Target Price ($)']['Value']
+		self.processes = settings.get('Processes', {}).get('Value', None)
+		self.backend = settings.get('Backend', {}).get('Value', 'process')
+		self.tolerance = settings.get('Tolerance', {}).get('Value', 1e-6)
+		self.max_expansions = int(settings.get('Maximum Expansions', {}).get('Value', 10))
+
+		self.parameters = process_parameter_ranges(self.inp, 'Parameters - Target_Cost_Analysis')
+		self.perform_target_cost_analysis()
+
+	def perform_target_cost_analysis(self):
+		'''Solving for target cost for each parameter and printing results.
+
+		Returns
+		-------
+		self.results : dict
+			Dictionary with parameter names as keys and results of
+			:func:`solve_target_cost` as values, including the `Reference` value
+			(1 for parameters of type 'factor').
+		'''
+
+		start = timer()
+
+		processes = self.processes
+		if processes is None:
+			processes = os.cpu_count() or 1
+		processes = min(int(processes), len(self.parameters))
+
+		arguments = [(parameter['Parameter'], parameter['Type'], parameter['Values'],
+					  self.target, self.tolerance, self.max_expansions)
+					 for parameter in self.parameters.values()]
+
+		if self.backend not in ('process', 'thread'):
+			raise ValueError(f"backend has to be 'process' or 'thread', not {self.backend}.")
+
+		if processes <= 1:
+			results = [solve_target_cost(self.inp, *argument) for argument in arguments]
+
+		elif self.backend == 'thread':
+			lookup_tables.preload_tables()
+			with ThreadPoolExecutor(max_workers = processes) as executor:
+				results = list(executor.map(solve_target_cost, [self.inp] * len(arguments),
+											*zip(*arguments)))
+
+		else:
+			lookup_tables.preload_tables()
+			with shared_arrays.Shared_Arrays(self.inp) as shared_inp, \
+				 ProcessPoolExecutor(max_workers = processes) as executor:
+				results = list(executor.map(solve_target_cost, [shared_inp] * len(arguments),
+											*zip(*arguments)))
+
+		self.results = {}
+		for (name, parameter), result in zip(self.parameters.items(), results):
+			reference = 1. if parameter['Type'] == 'factor' else parameter['Reference']
+			self.results[name] = {**result, 'Reference': reference}
+
+		end = timer()
+		evaluations = sum(result['Evaluations'] for result in results)
+		print(f'Time Target Cost Analysis ({evaluations} evaluations):', end - start)
+
+		self.print_results()
+
+	def print_results(self):
+		'''Printing of parameter values reaching target cost.'''
+
+		print(f'Target cost analysis results (target: {self.target} $/kg):')
+		print('--------------------------------------------------------------------------------')
+
+		for name, result in self.results.items():
+			path = reverse_parameter_to_string(self.parameters[name]['Parameter'])
+
+			if result['Converged']:
+				print(f"{path}	 target value is {result['Value']} (reference: {result['Reference']}, {result['Evaluations']} evaluations)")
+			elif result['Bracketed']:
+				print(f"{path}	 not converged, last value is {result['Value']} with H2 cost {result['H2 Cost']} (reference: {result['Reference']}, {result['Evaluations']} evaluations)")
+			else:
+				print(f"{path}	 target cost not bracketed, no interval containing target cost found ({result['Evaluations']} evaluations)")
+
+		print('--------------------------------------------------------------------------------')
+
+	def target_cost_plot(self, ax = None, figure_lean = True, plot_kwargs = {}, **kwargs):
+		'''Bar chart of relative change of parameters (compared to reference values)
+		required to reach target cost. Parameters with a reference value of 0 or
+		without target value are shown without bar.
+
+		Parameters
+		----------
+		ax : matplotlib.axes, optional
+			Axes object in which plot is drawn. Default is None, creating new plot.
+		figure_lean : bool, optional
+			If figure_lean is True, matplotlib.fig object is returned.
+		plot_kwargs: dict, optional
+			Dictionary containing optional keyword arguments for
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`, has priority over `**kwargs`.
+		**kwargs:
+			Additional `kwargs` passed to
+			:func:`~pyH2A.Utilities.output_utilities.Figure_Lean`
+
+		Returns
+		-------
+		figure : matplotlib.fig or None
+			matplotlib.fig is returned if `figure_lean` is True.
+		'''
+
+		kwargs = {**{'left': 0.3, 'right': 0.95, 'bottom': 0.15, 'top': 0.95,
+					 'fig_width': 6, 'fig_height': 4, 'name': 'Target_Cost_Plot'},
+				  **kwargs, **plot_kwargs}
+
+		if ax is None:
+			figure = Figure_Lean(**kwargs)
+			ax = figure.ax
+
+		names = list(self.results)
+		changes = np.array([100 * (result['Value'] / result['Reference'] - 1) 
+							if result['Reference'] != 0 else np.nan
+							for result in self.results.values()])
+
+		ax.barh(np.arange(len(names)), changes, color = np.where(changes > 0, 'darkred', 'darkgreen'))
+		ax.set_yticks(np.arange(len(names)))
+		ax.set_yticklabels(names)
+		ax.set_xlabel(f'Change of parameter to reach {self.target} USD/kg / %')
+		ax.axvline(0, color = 'black', linewidth = 0.8)
+		ax.grid(color = 'grey', linestyle = '--', linewidth = 0.2)
+
+		if figure_lean is True:
+			figure.execute()
+			return figure.fig
@@ -1,10 +1,16 @@
 import copy
 import numbers
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from functools import lru_cache
 import numpy as np
-from pyH2A.Utilities.input_modification import convert_input_to_dictionary, process_input, process_table, insert, read_textfile, set_by_path, execute_plugin
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, process_input, process_table, insert, read_textfile, set_by_path, copy_input
+from pyH2A.Utilities.plugin_registry import get_plugin
 from pyH2A.LCA.LCA import LCA
 import pyH2A.Utilities.find_nearest as fn
+import pyH2A.Utilities.lookup_tables as lookup_tables
+import pyH2A.Utilities.shared_arrays as shared_arrays
 
 def numpy_npv(rate, values):
 	'''Calculation of net present value.
@@ -76,7 +82,7 @@ def MACRS_depreciation(plant_years, depreciation_length, annual_depreciable_capi
 	return annual_charge
 
 def discounted_cash_flow_function(inp, values, parameters, attribute = 'h2_cost', 
-											plugin = None, plugin_attr = None):
+											plugin = None, plugin_attr = None, value_types = None):
 	'''Wrapper function for ``Discounted_Cash_Flow``, substituting provided values 
 	at specified parameter positions and returning desired attribute of 
 	``Discounted_Cash_Flow`` object.
@@ -104,6 +110,10 @@ def discounted_cash_flow_function(inp, values, parameters, attribute = 'h2_cost'
 	plugin_attr : str, optional
 		If `attribute` is set to `plugs`, `plugin_attr` controls which attribute of the 
 		specified `plugin` is accessed.
+	value_types : str, list or None, optional
+		Type of provided values for each parameter ('value' or 'factor', see 
+		:func:`~pyH2A.Utilities.input_modification.set_by_path`). A single string
+		applies to all parameters. Defaults to 'value'.
 
 	Returns
 	-------
@@ -117,17 +127,25 @@ def discounted_cash_flow_function(inp, values, parameters, attribute = 'h2_cost'
 	if isinstance(inp, str):
 		inp = convert_input_to_dictionary(inp)
 
+	if value_types is None:
+		value_types = 'value'
+
 	results = []
 
 	for value_set in values:
-		input_dict = copy.deepcopy(inp)
+		input_dict = copy_input(inp)
 
 		if isinstance(value_set, numbers.Number):
-			set_by_path(input_dict, parameters, value_set)
+			set_by_path(input_dict, parameters, value_set, value_type = value_types)
 
 		else:
-			for value, parameter in zip(value_set, parameters):
-				set_by_path(input_dict, parameter, value)
+			if isinstance(value_types, str):
+				types = [value_types] * len(parameters)
+			else:
+				types = value_types
+
+			for value, parameter, value_type in zip(value_set, parameters, types):
+				set_by_path(input_dict, parameter, value, value_type = value_type)
 
 		dcf = Discounted_Cash_Flow(input_dict, print_info = False)
 
@@ -141,6 +159,193 @@ def discounted_cash_flow_function(inp, values, parameters, attribute = 'h2_cost'
 
 	return results
 
+_batch_worker = {}
+
+def initialize_batch_worker(inp, parameters, kwargs):
+	'''Storing shared arguments of :func:`discounted_cash_flow_batch` once per 
+	worker process, so that `inp` is not transferred with every chunk.
+	Lookup tables are loaded unless they were inherited from the parent process.
+	Arrays placed in shared memory by the parent process are attached as read-only
+	views (see :mod:`~pyH2A.Utilities.shared_arrays`).
+	'''
+
+	lookup_tables.preload_tables()
+
+	_batch_worker['inp'] = shared_arrays.attach_arrays(inp)
+	_batch_worker['parameters'] = parameters
+	_batch_worker['kwargs'] = kwargs
+
+def evaluate_batch_chunk(values):
+	'''Evaluating chunk of parameter values in worker process.'''
+
+	return discounted_cash_flow_function(_batch_worker['inp'], values, 
+										 _batch_worker['parameters'], 
+										 **_batch_worker['kwargs'])
+
+def discounted_cash_flow_batch(inp, values, parameters, attribute = 'h2_cost', 
+							   plugin = None, plugin_attr = None, value_types = None,
+							   processes = None, chunk_size = None, backend = 'process'):
+	'''Evaluation of many parameter sets with :func:`discounted_cash_flow_function`, 
+	distributed over a process pool.
+
+	Parameters
+	----------
+	inp : dict or str
+		Dictionary containing input information or path to input file.
+	values : ndarray
+		1D (in case of one parameter) or 2D array (in case of multiple parameters)
+		containing the values which are to be used.
+	parameters : ndarray
+		1D or 2D array containing the parameter specifications (location within inp);
+		Format: [top_key, middle_key, bottom_key].
+	attribute, plugin, plugin_attr, value_types : optional
+		See :func:`discounted_cash_flow_function`.
+	processes : int or None, optional
+		Number of worker processes (or threads). If None, all available CPUs are used. 
+		If 1, or if there are fewer value sets than processes, values are evaluated
+		in the calling process.
+	chunk_size : int or None, optional
+		Number of value sets sent to a worker at once. If None, values are divided
+		into four chunks per process.
+	backend : str, optional
+		'process' (default) for a pool of worker processes or 'thread' for a pool 
+		of threads, see :func:`discounted_cash_flow_chunks`.
+
+	Returns
+	-------
+	results : list
+		Requested attribute for each value set, in the order of `values`.
+
+	Notes
+	-----
+	`inp` is converted to a dictionary once and transferred to each worker 
+	during its initialization, chunks of `values` are then distributed to
+	the workers. When the start method of multiprocessing is 'spawn' 
+	(Windows, macOS), scripts need to be guarded by `if __name__ == '__main__':`.
+	'''
+
+	if isinstance(inp, str):
+		inp = convert_input_to_dictionary(inp)
+
+	kwargs = {'attribute': attribute, 'plugin': plugin, 'plugin_attr': plugin_attr,
+			  'value_types': value_types}
+
+	if processes is None:
+		processes = os.cpu_count() or 1
+
+	processes = min(processes, len(values))
+
+	if processes <= 1:
+		return discounted_cash_flow_function(inp, values, parameters, **kwargs)
+
+	if chunk_size is None:
+		chunk_size = int(np.ceil(len(values) / (4 * processes)))
+
+	chunks = (values[start:start + chunk_size] for start in range(0, len(values), chunk_size))
+
+	results = []
+	for chunk_results in discounted_cash_flow_chunks(inp, chunks, parameters, 
+													 processes = processes, backend = backend, 
+													 **kwargs):
+		results.extend(chunk_results)
+
+	return results
+
+def discounted_cash_flow_chunks(inp, chunks, parameters, attribute = 'h2_cost', 
+								plugin = None, plugin_attr = None, value_types = None,
+								processes = None, max_pending = None, backend = 'process'):
+	'''Lazy evaluation of an iterable of value chunks with 
+	:func:`discounted_cash_flow_function`, using one process pool for all chunks.
+
+	Parameters
+	----------
+	inp : dict or str
+		Dictionary containing input information or path to input file.
+	chunks : iterable
+		Iterable (e.g. generator) of 1D or 2D arrays with values, see 
+		:func:`discounted_cash_flow_function`.
+	parameters : ndarray
+		1D or 2D array containing the parameter specifications (location within inp).
+	attribute, plugin, plugin_attr, value_types : optional
+		See :func:`discounted_cash_flow_function`.
+	processes : int or None, optional
+		Number of worker processes (or threads). If None, all available CPUs are used. 
+		If 1, chunks are evaluated in the calling process.
+	max_pending : int or None, optional
+		Maximum number of chunks which are submitted to the pool but whose
+		results have not been yielded yet. Defaults to twice the number of processes.
+	backend : str, optional
+		'process' (default) evaluates chunks in a pool of worker processes. 'thread'
+		evaluates chunks in a pool of threads of the calling process, which share
+		`inp` and all caches without any transfer. Threads run in parallel where 
+		numpy releases the GIL (and fully on free-threaded Python builds).
+
+	Yields
+	------
+	results : list
+		Results for each chunk, in the order of `chunks`.
+
+	Notes
+	-----
+	`chunks` is only consumed as far as required to keep `max_pending` chunks in
+	flight, so that arbitrarily long (lazily generated) sequences can be 
+	evaluated with bounded memory. Large arrays in `inp` (e.g. hourly power data) 
+	are placed in shared memory once, and workers use read-only views of them 
+	instead of receiving their own copies.
+
+	Evaluation does not modify `inp` or cached arrays (lookup tables and hourly
+	data are read-only), so that threads can safely evaluate chunks concurrently.
+	'''
+
+	if isinstance(inp, str):
+		inp = convert_input_to_dictionary(inp)
+
+	kwargs = {'attribute': attribute, 'plugin': plugin, 'plugin_attr': plugin_attr,
+			  'value_types': value_types}
+
+	if processes is None:
+		processes = os.cpu_count() or 1
+
+	if backend not in ('process', 'thread'):
+		raise ValueError(f"backend has to be 'process' or 'thread', not {backend}.")
+
+	if processes <= 1:
+		for chunk in chunks:
+			yield discounted_cash_flow_function(inp, chunk, parameters, **kwargs)
+		return
+
+	if max_pending is None:
+		max_pending = 2 * processes
+
+	lookup_tables.preload_tables()
+
+	if backend == 'thread':
+		with ThreadPoolExecutor(max_workers = processes) as executor:
+			yield from evaluate_pending(executor, chunks, max_pending, discounted_cash_flow_function, 
+										inp, parameters = parameters, **kwargs)
+		return
+
+	with shared_arrays.Shared_Arrays(inp) as shared_inp, \
+		 ProcessPoolExecutor(max_workers = processes, initializer = initialize_batch_worker,
+							 initargs = (shared_inp, parameters, kwargs)) as executor:
+		yield from evaluate_pending(executor, chunks, max_pending, evaluate_batch_chunk)
+
+def evaluate_pending(executor, chunks, max_pending, function, *args, **kwargs):
+	'''Submitting `function(*args, chunk, **kwargs)` for each chunk to `executor`, 
+	keeping at most `max_pending` chunks in flight and yielding results in order.
+	'''
+
+	pending = deque()
+
+	for chunk in chunks:
+		pending.append(executor.submit(function, *args, chunk, **kwargs))
+
+		if len(pending) >= max_pending:
+			yield pending.popleft().result()
+
+	while pending:
+		yield pending.popleft().result()
+
 def discounted_cash_flow_function_1D(values, parameters, inp, attribute = 'h2_cost', 
 											plugin = None, plugin_attr = None):
 	'''
@@ -243,7 +448,8 @@ class Discounted_Cash_Flow:
 
 	Workflow specifies which functions and plugins are used and in which order they are executed. The listed
 	five functions have to be executed in the specified order for pyH2A to work. Plugins can be inserted at 
-	appropiate positions (Type: "plugin"). Plugins have to be located in the ./Plugins/ directory. Execcution
+	appropiate positions (Type: "plugin"). Plugins have to be located in the ./Plugins/ directory or be provided
+	by another package through the "pyH2A.plugins" entry point group. Execcution
 	order is determined by the "Position" input. If the specified position is equal to an already exisiting one,
 	the function/plugin will be executed after the already specified one. If multiple plugins/function are
 	specified with the same position, they will be executed in the order in which they are listed in the 
@@ -348,7 +554,7 @@ class Discounted_Cash_Flow:
 			if inp['Workflow'][key]['Type'] == 'function':
 				self.execute_function(key, npv_dict)
 			else:
-				execute_plugin(key, plugs_dict, print_info = self.print_info, dcf = self)
+				plugs_dict[key] = get_plugin(key)(self, self.print_info)
 
 	def post_workflow(self):
 		'''Functions executed after workflow.
@@ -422,29 +628,15 @@ class Discounted_Cash_Flow:
 		self.inflation_correction = inflation_rate ** (self.fin['startup year']['Value'] - 
 			      									   self.fin['ref year']['Value'])
 
-		plant_cost = read_textfile('pyH2A.Lookup_Tables~Plant_Cost_Index.csv', 
-			  						delimiter = '	')
-		gdp_deflator_price = read_textfile('pyH2A.Lookup_Tables~GDP_Implicit_Deflator_Price_Index.csv', 
-											delimiter = '	')
-		labor_price = read_textfile('pyH2A.Lookup_Tables~Labor_Index.csv', 
-									 delimiter = '	')
-		chemical_price = read_textfile('pyH2A.Lookup_Tables~SRI_Chemical_Price_Index.csv', 
-										delimiter = '	')
-
-		plant_idx = fn.find_nearest(plant_cost, [self.fin['current year capital costs']['Value'], 
-												 self.fin['basis year']['Value']])
-		gdp_idx = fn.find_nearest(gdp_deflator_price, [self.fin['ref year']['Value'], 
-													   self.fin['current year capital costs']['Value']])
-		labor_idx = fn.find_nearest(labor_price, [self.fin['ref year']['Value'], 
-												  self.fin['basis year']['Value']])
-		chemical_idx = fn.find_nearest(chemical_price, [self.fin['ref year']['Value'], 
-														self.fin['basis year']['Value']])
-
-		self.cepci_inflator = plant_cost[:,1][plant_idx[0]]/plant_cost[:,1][plant_idx[1]]
-		self.ci_inflator = gdp_deflator_price[:,1][gdp_idx[0]]/gdp_deflator_price[:,1][gdp_idx[1]]
+		inflators = lookup_tables.inflators(self.fin['ref year']['Value'],
+											self.fin['basis year']['Value'],
+											self.fin['current year capital costs']['Value'])
+
+		self.cepci_inflator = inflators.cepci
+		self.ci_inflator = inflators.ci
 		self.combined_inflator = self.cepci_inflator * self.ci_inflator
-		self.labor_inflator = labor_price[:,1][labor_idx[0]]/labor_price[:,1][labor_idx[1]]
-		self.chemical_inflator = chemical_price[:,1][chemical_idx[0]]/chemical_price[:,1][chemical_idx[1]]
+		self.labor_inflator = inflators.labor
+		self.chemical_inflator = inflators.chemical
 
 	def production_scaling(self):
 		'''Get plant outpuer per year at gate.
@@ -521,7 +713,7 @@ class Discounted_Cash_Flow:
 			Total replacement costs.
 		'''
 	
-		yearly_costs = self.inp['Replacement']['Total']['Value']
+		yearly_costs = np.array(self.inp['Replacement']['Total']['Value'], dtype = float)
 
 		self.start_idx = fn.find_nearest(self.plant_years, 0)[0]
 		yearly_costs[:self.start_idx] = 0
@@ -1,15 +1,30 @@
-from pyH2A.Utilities.input_modification import insert, process_table
+from pyH2A.Utilities.input_modification import insert, process_table, hourly_to_daily_power
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 class Battery_Plugin:
     '''Simulation of electricity storage using a battery.
-    Simulation assumes that battery is charged and completely discharged every day.
-    (no electricity storage across days, only one discharge per day, not multiple ones).
+    In 'daily' dispatch mode (default), simulation assumes that battery is charged and
+    completely discharged every day (no electricity storage across days, only one
+    discharge per day, not multiple ones). In 'hourly' dispatch mode, battery is charged
+    with surplus power and discharged to the electrolyzer hour by hour, with the state of
+    charge carried across days.
 
     Parameters
     ----------
     Power Generation > Available Power (daily, kWh) > Value : dict
-        Available power, daily basis, dictionary of years (in kWh).
+        Available power, daily basis, dictionary of years (in kWh). Used in 'daily'
+        dispatch mode.
+    Power Generation > Available Power (hourly, kWh) > Value : dict, optional
+        Available power, hourly basis, dictionary of years (in kWh). Used in 'hourly'
+        dispatch mode.
+    Electrolyzer > Unused Capacity (hourly, kWh) > Value : dict, optional
+        Difference between electrolyzer power demand and power consumption for each hour
+        (dictionary of years, in kWh). Used in 'hourly' dispatch mode.
     Battery > Design Capacity (kWh) > Value : float
         Full design capacity of battery in kWh.
     Battery > Lowest discharge level > Value : float
@@ -18,24 +33,39 @@ class Battery_Plugin:
         Loss of capacity per year. Percentage or value > 0.
     Battery > Round trip efficiency > Value : float
         Round trip efficiency of battery. Percentage or value between 0 and 1.
-    
+    Battery > Dispatch > Value : str, optional
+        'daily' (default) or 'hourly' dispatch mode.
+    Battery > Power (kW) > Value : float, optional
+        Maximum charge and discharge power of battery in kW, used in 'hourly' dispatch
+        mode. Defaults to no limit.
+
     Returns
     -------
     Power Generation > Stored Power (daily, kWh) > Value : dict
-        Power stored in battery daily in kWh (dictionary of years).
+        Power stored in battery daily in kWh (dictionary of years). In 'hourly' dispatch
+        mode, power discharged from battery to the electrolyzer each day.
     Power Generation > Available Power (daily, kWh) > Value : dict
-        Available power, daily basis, dictionary of years (in kWh) - power which 
+        Available power, daily basis, dictionary of years (in kWh) - power which
         has not been stored in battery
     Power Generation > Available Power (hourly, kWh) > Value : float
-        Available power (hourly, kWh) is set to zero, since available power is now 
-        only in daily format. 
+        Available power (hourly, kWh) is set to zero, since available power is now
+        only in daily format.
+    Power Generation > Available Power from PV Profile > Value : bool
+        Set to False, since available power has been modified (only if provided).
     '''
 
     def __init__(self, dcf, print_info):
         process_table(dcf.inp, 'Power Generation', 'Value')
         process_table(dcf.inp, 'Battery', 'Value')
 
-        self.calculate_electricity_storage(dcf)
+        dispatch = dcf.inp['Battery'].get('Dispatch', {}).get('Value', 'daily')
+
+        if dispatch == 'daily':
+            self.calculate_electricity_storage(dcf)
+        elif dispatch == 'hourly':
+            self.calculate_hourly_dispatch(dcf)
+        else:
+            raise ValueError(f"Battery > Dispatch > Value has to be 'daily' or 'hourly', not {dispatch}.")
 
         insert(dcf, 'Power Generation', 'Stored Power (daily, kWh)', 'Value',
                 self.yearly_recovered_power, __name__, print_info = print_info)
@@ -44,6 +74,10 @@ class Battery_Plugin:
         insert(dcf, 'Power Generation', 'Available Power (hourly, kWh)', 'Value',
                 0, __name__, print_info = print_info)
 
+        if 'Available Power from PV Profile' in dcf.inp['Power Generation']:
+            insert(dcf, 'Power Generation', 'Available Power from PV Profile', 'Value',
+                   False, __name__, print_info = print_info)
+
     def calculate_electricity_storage(self, dcf):
         '''Using hourly power generation data and electrolyzer parameters,
         H2 production is calculated.
@@ -66,11 +100,34 @@ class Battery_Plugin:
             unstored_power = daily_available_power - daily_stored_power
 
             yearly_recovered_power[year] = daily_recovered_power
-            yearly_unstored_power[year] = unstored_power  
-      
+            yearly_unstored_power[year] = unstored_power
+
         self.yearly_recovered_power = yearly_recovered_power
         self.yearly_unstored_power = yearly_unstored_power
-    
+
+    def calculate_hourly_dispatch(self, dcf):
+        '''Hourly dispatch of battery, all operation years are simulated at once
+        using :func:`battery_dispatch`.
+        '''
+
+        available_power_yearly = dcf.inp['Power Generation']['Available Power (hourly, kWh)']['Value']
+        unused_capacity_yearly = dcf.inp['Electrolyzer']['Unused Capacity (hourly, kWh)']['Value']
+
+        surplus = np.vstack([available_power_yearly[year] for year in dcf.operation_years])
+        deficit = np.vstack([unused_capacity_yearly[year] for year in dcf.operation_years])
+        capacity = np.array([self.calculate_battery_capacity(dcf, year)[0] for year in dcf.operation_years])
+
+        charged, discharged = battery_dispatch(surplus, deficit, capacity,
+                                               dcf.inp['Battery'].get('Power (kW)', {}).get('Value', np.inf),
+                                               dcf.inp['Battery']['Round trip efficiency']['Value'])
+
+        self.yearly_recovered_power = {}
+        self.yearly_unstored_power = {}
+
+        for counter, year in enumerate(dcf.operation_years):
+            self.yearly_recovered_power[year] = hourly_to_daily_power(discharged[counter])
+            self.yearly_unstored_power[year] = hourly_to_daily_power(surplus[counter] - charged[counter])
+
     def calculate_battery_capacity(self, dcf, year):
 
         capacity_decrease = (1. - dcf.inp['Battery']['Capacity loss per year']['Value']) ** year
@@ -78,4 +135,103 @@ class Battery_Plugin:
 
         capacity = nominal_capacity * capacity_decrease
 
-        return capacity, capacity_decrease
\ No newline at end of file
+        return capacity, capacity_decrease
+
+def _dispatch_numpy(surplus, deficit, capacity, power, efficiency):
+    '''State of charge recurrence, vectorized over all rows (years, scenarios)
+    and iterating over hours.
+    '''
+
+    charged = np.empty_like(surplus)
+    discharged = np.empty_like(surplus)
+    state_of_charge = np.zeros(surplus.shape[0])
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        for hour in range(surplus.shape[1]):
+            room = (capacity - state_of_charge) / efficiency
+            charged[:,hour] = np.fmin(np.minimum(surplus[:,hour], power), room)
+            state_of_charge += charged[:,hour] * efficiency
+
+            discharged[:,hour] = np.minimum(np.minimum(deficit[:,hour], power), state_of_charge)
+            state_of_charge -= discharged[:,hour]
+
+    return charged, discharged
+
+def _dispatch_loop(surplus, deficit, capacity, power, efficiency):
+    '''State of charge recurrence as explicit loops, compiled with numba if available.
+    '''
+
+    charged = np.zeros_like(surplus)
+    discharged = np.zeros_like(surplus)
+
+    for row in range(surplus.shape[0]):
+        state_of_charge = 0.
+
+        for hour in range(surplus.shape[1]):
+            charge = min(surplus[row, hour], power[row])
+            if efficiency[row] > 0.:
+                charge = min(charge, (capacity[row] - state_of_charge) / efficiency[row])
+            charged[row, hour] = charge
+            state_of_charge += charge * efficiency[row]
+
+            discharge = min(deficit[row, hour], power[row], state_of_charge)
+            discharged[row, hour] = discharge
+            state_of_charge -= discharge
+
+    return charged, discharged
+
+if njit is not None:
+    _dispatch_loop = njit(cache = True)(_dispatch_loop)
+
+def battery_dispatch(surplus, deficit, capacity, power = np.inf, efficiency = 1.):
+    '''Hourly battery dispatch for an arbitrary number of years and/or scenarios.
+
+    Parameters
+    ----------
+    surplus : ndarray
+        Array of shape (..., hours) with surplus power available for charging each hour
+        in kWh.
+    deficit : ndarray
+        Array with the same shape as `surplus` containing the power demand which can be
+        met by discharging the battery each hour in kWh.
+    capacity : float or ndarray
+        Usable capacity of battery in kWh, broadcastable to the leading dimensions of
+        `surplus` (e.g. one capacity per year).
+    power : float or ndarray, optional
+        Maximum charge and discharge power in kW, broadcastable like `capacity`.
+    efficiency : float or ndarray, optional
+        Round trip efficiency, applied when charging. Broadcastable like `capacity`.
+
+    Returns
+    -------
+    charged : ndarray
+        Power drawn from `surplus` to charge the battery each hour in kWh.
+    discharged : ndarray
+        Power delivered by the battery each hour in kWh.
+
+    Notes
+    -----
+    In each hour, the battery is first charged with the surplus power (limited by power and
+    remaining capacity) and then discharged to meet the deficit (limited by power and state
+    of charge). The state of charge is carried across hours and starts at zero for each row,
+    so that rows (years, scenarios) are independent and are simulated together. If numba
+    is installed, a compiled loop is used, otherwise the recurrence is vectorized over rows.
+    '''
+
+    surplus = np.asarray(surplus, dtype = float)
+    deficit = np.asarray(deficit, dtype = float)
+    shape = surplus.shape
+
+    surplus = surplus.reshape(-1, shape[-1])
+    deficit = deficit.reshape(-1, shape[-1])
+    rows = surplus.shape[0]
+
+    capacity, power, efficiency = [np.broadcast_to(value, shape[:-1]).reshape(rows).astype(float)
+                                   for value in (capacity, power, efficiency)]
+
+    if njit is not None:
+        charged, discharged = _dispatch_loop(surplus, deficit, capacity, power, efficiency)
+    else:
+        charged, discharged = _dispatch_numpy(surplus, deficit, capacity, power, efficiency)
+
+    return charged.reshape(shape), discharged.reshape(shape)
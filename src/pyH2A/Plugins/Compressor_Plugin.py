@@ -1,178 +1,519 @@
-from pyH2A.Utilities.input_modification import insert, process_table
-import numpy as np
-
-class Compressor_Plugin:
-    '''Simulation of hydrogen gas compression for storage and transport.
-
-    Parameters
-    ----------
-    Compressor > Inlet Pressure (bar) > Value : float
-        Inlet pressure of hydrogen gas in bar.
-    Compressor > Outlet Pressure (bar) > Value : float
-        Outlet pressure of hydrogen gas in bar.
-    Compressor > Isentropic Efficiency (%) > Value : float
-        Isentropic efficiency of compressor. Percentage or value between 0 and 1.
-    Compressor > Number of Stages > Value : int, optional
-        Number of compression stages. If not provided, it is automatically estimated
-        so the per-stage compression ratio is approximately <= 10.
-    Compressor > Unit CAPEX ($ per kW) > Value : float, optional
-        Unit capital cost in dollars per kW of compressor power. If not provided,
-        a default value based on literature estimates will be used.
-    Compressor > CAPEX Reference Power (kW) > Value : float, optional
-        Reference power for CAPEX scaling. Used with CAPEX Multiplier to account
-        for economies of scale.
-    CAPEX Multiplier > Multiplier > Value : float, optional
-        Multiplier to describe cost reduction of compressor CAPEX for every ten-fold
-        increase of power relative to CAPEX reference power. Based on the multiplier the CAPEX
-        scaling factor is calculated as: multiplier ^ (number of ten-fold increases). A value
-        of 1 leads to no CAPEX reduction, a value < 1 enables cost reduction.
-    Electrolyzer > H2 Production (yearly, kg) > Value : nd.array
-        Yearly hydrogen production in kg from electrolyzer (if using Electrolyzer_Plugin).
-    Photoelectrochemical > H2 Production (yearly, kg) > Value : nd.array
-        Yearly hydrogen production in kg from PEC system (if using PEC_Plugin).
-
-    Returns
-    -------
-    Compressor > Power Consumption (yearly, kWh) > Value : nd.array
-        Yearly power consumption for hydrogen compression in kWh.
-    Compressor > Compression Ratio > Value : float
-        Pressure ratio between outlet and inlet pressure.
-    Compressor > Power Consumption per kg H2 (kWh/kg) > Value : float
-        Average power consumption per kg of hydrogen produced.
-    Compressor > Number of Stages > Value : int
-        Number of compressor stages used in the calculation.
-    Compressor > Stage Compression Ratio > Value : float
-        Compression ratio per stage for equal-ratio staging.
-    Compressor > CAPEX ($) > Value : float
-        Estimated capital cost of the compressor system in dollars.
-        
-    Notes
-    -----
-    To include compressor electricity costs in the economic analysis, add a utility
-    entry in your input data with the compressor power consumption per kg H2:
-    
-    Utilities > Compressor Electricity > Usage per kg H2 > Value
-        Should be set to the value from "Compressor > Power Consumption per kg H2 (kWh/kg)"
-    Utilities > Compressor Electricity > Cost > Value
-        Electricity cost in $/kWh
-    '''
-
-    def __init__(self, dcf, print_info):
-        process_table(dcf.inp, 'Compressor', 'Value')
-        
-        # Process CAPEX Multiplier table if it exists
-        if 'CAPEX Multiplier' in dcf.inp:
-            process_table(dcf.inp, 'CAPEX Multiplier', 'Value')
-        
-        self.hours_in_a_year = 8760
-
-        self.calculate_compression(dcf)
-        self.calculate_capex(dcf)
-
-        insert(dcf, 'Compressor', 'Compression Ratio', 'Value',
-                self.compression_ratio, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Number of Stages', 'Value',
-            self.number_of_stages, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Stage Compression Ratio', 'Value',
-            self.stage_compression_ratio, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'H2 Production (yearly, kg)', 'Value', 
-            self.h2_production_yearly, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Power Consumption (yearly, kWh)', 'Value',
-            self.yearly_power_consumption_kwh, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Average Power Consumption (yearly, kWh)', 'Value',
-            np.mean(self.yearly_power_consumption_kwh), __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Power Consumption (kW)', 'Value',
-                self.power_consumption, __name__, print_info=print_info)
-        insert(dcf, 'Compressor', 'Power Consumption per kg H2 (kWh/kg)', 'Value',
-                self.power_per_kg_h2, __name__, print_info=print_info) 
-        insert(dcf, 'Compressor', 'CAPEX ($)', 'Value',
-                self.compressor_capex, __name__, print_info=print_info)
-        
-          
-        
-    def calculate_compression(self, dcf):
-        '''Calculate power required for hydrogen compression using the isentropic
-        compression work equation for ideal gas. Reads H2 production from either
-        Electrolyzer or PEC systems.
-        '''
-
-        # Try to read H2 production from Electrolyzer first
-        if 'Electrolyzer' in dcf.inp and 'H2 Production (yearly, kg)' in dcf.inp['Electrolyzer']:
-            self.h2_production_yearly = dcf.inp['Electrolyzer']['H2 Production (yearly, kg)']['Value']
-        else:
-            # For PEC/PC systems, calculate H2 from design output and operating capacity factor
-            design_output_per_day = dcf.inp['Technical Operating Parameters and Specifications']['Design Output per Day']['Value']
-            operating_capacity_factor = dcf.inp['Technical Operating Parameters and Specifications']['Operating Capacity Factor (%)']['Value']
-            
-            # Annual H2 production = daily design output * 365 days * capacity factor
-            self.h2_production_yearly = design_output_per_day * 365 * operating_capacity_factor * np.ones(len(dcf.operation_years))
-        
-        inlet_pressure = dcf.inp['Compressor']['Inlet Pressure (bar)']['Value']
-        outlet_pressure = dcf.inp['Compressor']['Outlet Pressure (bar)']['Value']
-        isentropic_efficiency = dcf.inp['Compressor']['Isentropic Efficiency (%)']['Value']
-        # Calculate compression ratio
-        self.compression_ratio = outlet_pressure / inlet_pressure
-
-        # Isentropic work for hydrogen compression (kWh/kg)
-        # For hydrogen: gamma = 1.41, specific gas constant R = 4.124 kJ/(kg·K), T_inlet ≈ 288 K
-        gamma = 1.41
-        R = 4.124  # kJ/(kg·K)
-        T_inlet = 288.15  # K (15°C)
-
-        if 'Number of Stages' in dcf.inp['Compressor']:
-            self.number_of_stages = int(dcf.inp['Compressor']['Number of Stages']['Value'])
-            if self.number_of_stages < 1:
-                self.number_of_stages = 1
-        else:
-            stage_ratio = 3.0  # typical with intercooling
-            self.number_of_stages = max(1, int(np.ceil(np.log(self.compression_ratio) / np.log(stage_ratio))))
-
-        self.stage_compression_ratio = self.compression_ratio ** (1.0 / self.number_of_stages)
-
-        # Equal-ratio staged compression with intercooling between stages
-        # Isentropic work per stage: W_s = (gamma/(gamma-1)) * R * T_inlet * (r_stage^((gamma-1)/gamma) - 1)
-        isentropic_exponent = (gamma - 1) / gamma
-        W_isentropic_stage = (gamma / (gamma - 1)) * R * T_inlet * (
-            self.stage_compression_ratio ** isentropic_exponent - 1
-        )  # kJ/kg
-        W_isentropic = self.number_of_stages * W_isentropic_stage  # kJ/kg
-
-        # Convert to kWh/kg and apply efficiency
-        W_isentropic_kWh = W_isentropic / 3600  # kJ/kg to kWh/kg
-        actual_work = W_isentropic_kWh / isentropic_efficiency  # Account for efficiency losses
-        
-        # Store power consumption per kg H2 for use in Utilities
-        self.power_per_kg_h2 = actual_work  # kWh/kg
-        
-        # Calculate yearly and average power consumption
-        self.yearly_power_consumption_kwh = self.h2_production_yearly * actual_work  # kWh/year
-        self.power_consumption = self.yearly_power_consumption_kwh / self.hours_in_a_year  # kW average for each year
-
-    def calculate_capex(self, dcf):
-        '''Calculate compressor capital cost based on power rating.
-        
-        Uses unit CAPEX ($/kW) and maximum power consumption. Optionally applies
-        economies of scale using CAPEX multiplier and reference power.
-        
-        Default unit CAPEX is based on multi-stage reciprocating compressor estimates
-        for hydrogen service, including intercoolers and auxiliaries.
-        '''
-        
-        # Get max power for sizing
-        max_power_kw = np.max(self.power_consumption)
-        
-        # Default unit CAPEX if not provided ($/kW)
-        # Literature values for multi-stage H2 compressors: $75/kW
-        # Adjusted for stages and intercoolers
-        default_unit_capex = 75.0 + (self.number_of_stages - 1) * 15.0  # Additional cost per stage
-        
-        if 'Unit CAPEX ($ per kW)' in dcf.inp['Compressor']:
-            unit_capex = dcf.inp['Compressor']['Unit CAPEX ($ per kW)']['Value']
-        else:
-            unit_capex = default_unit_capex
-        
-        # CAPEX calculation
-        self.compressor_capex = unit_capex * max_power_kw
-        
-
-    
+from functools import lru_cache
+from pyH2A.Utilities.input_modification import insert, process_table, read_textfile, parse_parameter_to_array
+import numpy as np
+
+class Compressor_Plugin:
+    '''Simulation of hydrogen gas compression for storage and transport.
+
+    Parameters
+    ----------
+    Compressor > Inlet Pressure (bar) > Value : float
+        Inlet pressure of hydrogen gas in bar.
+    Compressor > Outlet Pressure (bar) > Value : float
+        Outlet pressure of hydrogen gas in bar.
+    Compressor > Isentropic Efficiency (%) > Value : float
+        Isentropic efficiency of compressor. Percentage or value between 0 and 1.
+    Compressor > Number of Stages > Value : int, optional
+        Number of compression stages. If not provided, it is automatically estimated
+        so the per-stage compression ratio is approximately <= 10.
+    Compressor > Gas Model > Value : str, optional
+        'ideal' (default) for ideal gas compression with constant heat capacity ratio,
+        'real' for real gas compression using tabulated compressibility factors and heat
+        capacities of hydrogen (see :func:`compression_work`).
+    Compressor > Stage Inlet Temperature (K) > Value : float or str, optional
+        Temperature of hydrogen entering each stage after intercooling in K. Multiple values
+        (one per stage) can be separated by ';', if fewer values than stages are provided,
+        the last value is used for the remaining stages. Defaults to 288.15 K.
+    Compressor > Load Profile > Value : str, optional
+        'average' (default) to size the compressor on the yearly average power consumption,
+        'hourly' to calculate the hourly power draw from the hourly hydrogen production of
+        the electrolyzer and to size the compressor on its peak. 'hourly' requires
+        `Electrolyzer > H2 Production (hourly, kg) > Value`, otherwise a ValueError is raised.
+    Compressor > Power Consumer Type > Value : str, optional
+        If provided ('flexible' or 'on_demand'), the yearly power consumption of the
+        compressor is registered as a power consumer for Power_Management_Plugin.
+    Compressor > Electricity Cost > Value : float or str, optional
+        If provided, compressor electricity is added to the `Utilities` table and its cost is
+        included by Variable_Operating_Cost_Plugin. Either cost in $/kWh or path to a cost
+        table, e.g. the AEO tables in `pyH2A.Lookup_Tables.Utility_Cost`
+        (pyH2A.Lookup_Tables.Utility_Cost~Industrial_Electricity_AEO_2017_Reference_Case.csv).
+    Compressor > Electricity Price Conversion Factor > Value : float, optional
+        Conversion factor between electricity cost and kWh. Defaults to 0.0036 (GJ/kWh) for
+        cost tables (which are in $/GJ) and 1 for costs in $/kWh.
+    Compressor > Unit CAPEX ($ per kW) > Value : float, optional
+        Unit capital cost in dollars per kW of compressor power. If not provided,
+        a default value based on literature estimates will be used.
+    Compressor > CAPEX Reference Power (kW) > Value : float, optional
+        Reference power for CAPEX scaling. Used with CAPEX Multiplier to account
+        for economies of scale.
+    CAPEX Multiplier > Multiplier > Value : float, optional
+        Multiplier to describe cost reduction of compressor CAPEX for every ten-fold
+        increase of power relative to CAPEX reference power. Based on the multiplier the CAPEX
+        scaling factor is calculated as: multiplier ^ (number of ten-fold increases). A value
+        of 1 leads to no CAPEX reduction, a value < 1 enables cost reduction.
+    Electrolyzer > H2 Production (yearly, kg) > Value : nd.array
+        Yearly hydrogen production in kg from electrolyzer (if using Electrolyzer_Plugin).
+    Photoelectrochemical > H2 Production (yearly, kg) > Value : nd.array
+        Yearly hydrogen production in kg from PEC system (if using PEC_Plugin).
+    Electrolyzer > H2 Production (hourly, kg) > Value : nd.array, optional
+        Hourly hydrogen production in kg (operation years, hours), required for 'hourly'
+        load profile.
+
+    Returns
+    -------
+    Compressor > Power Consumption (yearly, kWh) > Value : nd.array
+        Yearly power consumption for hydrogen compression in kWh.
+    Compressor > Compression Ratio > Value : float
+        Pressure ratio between outlet and inlet pressure.
+    Compressor > Power Consumption per kg H2 (kWh/kg) > Value : float
+        Average power consumption per kg of hydrogen produced.
+    Compressor > Number of Stages > Value : int
+        Number of compressor stages used in the calculation.
+    Compressor > Stage Compression Ratio > Value : float
+        Compression ratio per stage for equal-ratio staging.
+    Compressor > CAPEX ($) > Value : float
+        Estimated capital cost of the compressor system in dollars.
+    Compressor > Power Consumption (hourly, kW) > Value : nd.array
+        Hourly power draw of compressor in kW (operation years, hours), only for 'hourly'
+        load profile.
+    Compressor > Peak Power (kW) > Value : float
+        Maximum power draw of compressor in kW used for CAPEX sizing.
+    Power Consumption > Compressor (kWh, yearly) > Value : nd.array
+        Yearly power consumption of compressor during operation years in kWh, only if
+        `Power Consumer Type` is provided.
+    Power Consumption > Compressor (kWh, yearly) > Type : str
+        Type of power consumer, as specified by `Power Consumer Type`.
+    Utilities > Compressor Electricity > Usage per kg H2 : float
+        Power consumption per kg H2 (kWh/kg), only if `Electricity Cost` is provided.
+    Utilities > Compressor Electricity > Cost : float or str
+        Electricity cost, only if `Electricity Cost` is provided.
+    Utilities > Compressor Electricity > Price Conversion Factor : float
+        Price conversion factor, only if `Electricity Cost` is provided.
+
+    Notes
+    -----
+    Compressor_Plugin has to run before Variable_Operating_Cost_Plugin (position < 10 in
+    `Workflow` table) for the automatically added utility to be included. If compressor
+    power is supplied by the plant itself (`Power Consumer Type`), `Electricity Cost`
+    should not be provided to avoid counting the electricity twice.
+    '''
+
+    def __init__(self, dcf, print_info):
+        process_table(dcf.inp, 'Compressor', 'Value')
+        
+        # Process CAPEX Multiplier table if it exists
+        if 'CAPEX Multiplier' in dcf.inp:
+            process_table(dcf.inp, 'CAPEX Multiplier', 'Value')
+        
+        self.hours_in_a_year = 8760
+
+        self.calculate_compression(dcf)
+
+        load_profile = dcf.inp['Compressor'].get('Load Profile', {}).get('Value', 'average')
+
+        if load_profile == 'hourly':
+            self.calculate_hourly_load(dcf)
+        elif load_profile == 'average':
+            self.peak_power = np.max(self.power_consumption)
+        else:
+            raise ValueError(f"Compressor > Load Profile > Value has to be 'average' or 'hourly', not {load_profile}.")
+
+        self.calculate_capex(dcf)
+
+        insert(dcf, 'Compressor', 'Compression Ratio', 'Value',
+                self.compression_ratio, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Number of Stages', 'Value',
+            self.number_of_stages, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Stage Compression Ratio', 'Value',
+            self.stage_compression_ratio, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'H2 Production (yearly, kg)', 'Value', 
+            self.h2_production_yearly, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Power Consumption (yearly, kWh)', 'Value',
+            self.yearly_power_consumption_kwh, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Average Power Consumption (yearly, kWh)', 'Value',
+            np.mean(self.yearly_power_consumption_kwh), __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Power Consumption (kW)', 'Value',
+                self.power_consumption, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Power Consumption per kg H2 (kWh/kg)', 'Value',
+                self.power_per_kg_h2, __name__, print_info=print_info) 
+        insert(dcf, 'Compressor', 'CAPEX ($)', 'Value',
+                self.compressor_capex, __name__, print_info=print_info)
+        insert(dcf, 'Compressor', 'Peak Power (kW)', 'Value',
+                self.peak_power, __name__, print_info=print_info)
+
+        if load_profile == 'hourly':
+            insert(dcf, 'Compressor', 'Power Consumption (hourly, kW)', 'Value',
+                    self.hourly_power_consumption, __name__, print_info=print_info)
+
+        if 'Electricity Cost' in dcf.inp['Compressor']:
+            self.add_electricity_utility(dcf, print_info)
+
+        if 'Power Consumer Type' in dcf.inp['Compressor']:
+            insert(dcf, 'Power Consumption', 'Compressor (kWh, yearly)', 'Value',
+                    self.yearly_power_consumption_kwh[-len(dcf.operation_years):], __name__,
+                    print_info=print_info)
+            insert(dcf, 'Power Consumption', 'Compressor (kWh, yearly)', 'Type',
+                    dcf.inp['Compressor']['Power Consumer Type']['Value'], __name__,
+                    print_info=print_info)
+        
+          
+        
+    def calculate_compression(self, dcf):
+        '''Calculate power required for hydrogen compression using the isentropic
+        compression work equation for ideal or real gas. Reads H2 production from either
+        Electrolyzer or PEC systems.
+        '''
+
+        # Try to read H2 production from Electrolyzer first
+        if 'Electrolyzer' in dcf.inp and 'H2 Production (yearly, kg)' in dcf.inp['Electrolyzer']:
+            self.h2_production_yearly = dcf.inp['Electrolyzer']['H2 Production (yearly, kg)']['Value']
+        else:
+            # For PEC/PC systems, calculate H2 from design output and operating capacity factor
+            design_output_per_day = dcf.inp['Technical Operating Parameters and Specifications']['Design Output per Day']['Value']
+            operating_capacity_factor = dcf.inp['Technical Operating Parameters and Specifications']['Operating Capacity Factor (%)']['Value']
+            
+            # Annual H2 production = daily design output * 365 days * capacity factor
+            self.h2_production_yearly = design_output_per_day * 365 * operating_capacity_factor * np.ones(len(dcf.operation_years))
+        
+        inlet_pressure = dcf.inp['Compressor']['Inlet Pressure (bar)']['Value']
+        outlet_pressure = dcf.inp['Compressor']['Outlet Pressure (bar)']['Value']
+        isentropic_efficiency = dcf.inp['Compressor']['Isentropic Efficiency (%)']['Value']
+
+        if 'Number of Stages' in dcf.inp['Compressor']:
+            stages = dcf.inp['Compressor']['Number of Stages']['Value']
+        else:
+            stages = None
+
+        gas_model = dcf.inp['Compressor'].get('Gas Model', {}).get('Value', 'ideal')
+        stage_temperatures = dcf.inp['Compressor'].get('Stage Inlet Temperature (K)', {}).get('Value', None)
+        if isinstance(stage_temperatures, str):
+            stage_temperatures = parse_parameter_to_array(stage_temperatures, delimiter = ';')
+
+        work, stage_ratio, stages, compression_ratio = compression_work(inlet_pressure, outlet_pressure,
+                                                                        isentropic_efficiency, stages,
+                                                                        gas_model = gas_model,
+                                                                        stage_temperatures = stage_temperatures)
+
+        self.compression_ratio = float(compression_ratio)
+        self.number_of_stages = int(stages)
+        self.stage_compression_ratio = float(stage_ratio)
+
+        # Store power consumption per kg H2 for use in Utilities
+        actual_work = float(work)
+        self.power_per_kg_h2 = actual_work  # kWh/kg
+        
+        # Calculate yearly and average power consumption
+        self.yearly_power_consumption_kwh = self.h2_production_yearly * actual_work  # kWh/year
+        self.power_consumption = self.yearly_power_consumption_kwh / self.hours_in_a_year  # kW average for each year
+
+    def add_electricity_utility(self, dcf, print_info):
+        '''Adding compressor electricity to `Utilities` table, so that its cost is computed
+        in the same discounted cash flow run.
+        '''
+
+        cost = dcf.inp['Compressor']['Electricity Cost']['Value']
+
+        if 'Electricity Price Conversion Factor' in dcf.inp['Compressor']:
+            conversion_factor = dcf.inp['Compressor']['Electricity Price Conversion Factor']['Value']
+        elif isinstance(cost, str):
+            conversion_factor = 0.0036  # GJ/kWh, cost tables are in $/GJ
+        else:
+            conversion_factor = 1.
+
+        insert(dcf, 'Utilities', 'Compressor Electricity', 'Usage per kg H2',
+                self.power_per_kg_h2, __name__, print_info=print_info)
+        insert(dcf, 'Utilities', 'Compressor Electricity', 'Cost',
+                cost, __name__, print_info=print_info)
+        insert(dcf, 'Utilities', 'Compressor Electricity', 'Price Conversion Factor',
+                conversion_factor, __name__, print_info=print_info)
+
+    def calculate_hourly_load(self, dcf):
+        '''Calculate hourly power draw of compressor (operation years, hours) from the
+        hourly hydrogen production of the electrolyzer.
+        '''
+
+        electrolyzer = dcf.inp.get('Electrolyzer', {})
+
+        if 'H2 Production (hourly, kg)' not in electrolyzer:
+            raise ValueError("Compressor > Load Profile > Value 'hourly' requires hourly H2 production "
+                             "(Electrolyzer > H2 Production (hourly, kg) > Value), which is not "
+                             "available. Run Electrolyzer_Plugin before Compressor_Plugin in the Workflow, "
+                             "or use 'average'.")
+
+        h2_production_hourly = electrolyzer['H2 Production (hourly, kg)']['Value']
+
+        # kg H2 per hour * kWh/kg = kW
+        self.hourly_power_consumption = np.asarray(h2_production_hourly) * self.power_per_kg_h2
+        self.peak_power = np.max(self.hourly_power_consumption)
+
+    def calculate_capex(self, dcf):
+        '''Calculate compressor capital cost based on power rating.
+        
+        Uses unit CAPEX ($/kW) and peak power consumption. Optionally applies
+        economies of scale using CAPEX multiplier and reference power.
+        
+        Default unit CAPEX is based on multi-stage reciprocating compressor estimates
+        for hydrogen service, including intercoolers and auxiliaries.
+        '''
+        
+        if 'Unit CAPEX ($ per kW)' in dcf.inp['Compressor']:
+            unit_capex = dcf.inp['Compressor']['Unit CAPEX ($ per kW)']['Value']
+        else:
+            unit_capex = None
+
+        self.compressor_capex = float(compressor_capex(np.atleast_1d(self.peak_power),
+                                                       self.number_of_stages, unit_capex))
+
+@lru_cache(maxsize = None)
+def real_gas_table():
+    '''Reading hydrogen compressibility factor and heat capacity table into regular
+    (temperature, pressure) grids. The table is read once per process.
+
+    Returns
+    -------
+    temperatures : ndarray
+        Temperature axis in K.
+    pressures : ndarray
+        Pressure axis in bar.
+    properties : ndarray
+        Read-only array of shape (2, temperatures, pressures) with compressibility
+        factor and isobaric heat capacity (kJ/(kg K)).
+    '''
+
+    data = read_textfile('pyH2A.Lookup_Tables~Hydrogen_Real_Gas_Properties.csv', delimiter = '	')
+
+    temperatures = np.unique(data[:,0])
+    pressures = np.unique(data[:,1])
+
+    order = np.lexsort((data[:,1], data[:,0]))
+    properties = data[order][:,2:].T.reshape(2, len(temperatures), len(pressures))
+    properties.setflags(write = False)
+
+    return temperatures, pressures, properties
+
+def real_gas_properties(temperature, pressure):
+    '''Bilinear interpolation of compressibility factor and heat capacity of hydrogen.
+
+    Parameters
+    ----------
+    temperature : float or ndarray
+        Temperature in K.
+    pressure : float or ndarray
+        Pressure in bar.
+
+    Returns
+    -------
+    Z : ndarray
+        Compressibility factor.
+    cp : ndarray
+        Isobaric heat capacity in kJ/(kg K).
+
+    Notes
+    -----
+    The bundled table is a regular grid, so that grid cells are found by direct index
+    calculation (no search). Values outside of the table are clipped to its edges.
+    '''
+
+    temperatures, pressures, properties = real_gas_table()
+
+    def position(axis, values):
+        step = axis[1] - axis[0]
+        index = np.clip((np.asarray(values, dtype = float) - axis[0]) / step, 0, len(axis) - 1)
+        lower = np.minimum(index.astype(int), len(axis) - 2)
+
+        return lower, index - lower
+
+    t, t_weight = position(temperatures, temperature)
+    p, p_weight = position(pressures, pressure)
+
+    values = (properties[:,t,p] * (1 - t_weight) * (1 - p_weight) +
+              properties[:,t+1,p] * t_weight * (1 - p_weight) +
+              properties[:,t,p+1] * (1 - t_weight) * p_weight +
+              properties[:,t+1,p+1] * t_weight * p_weight)
+
+    return values[0], values[1]
+
+def compression_work(inlet_pressure, outlet_pressure, isentropic_efficiency, number_of_stages = None,
+                     stage_ratio = 3.0, gamma = 1.41, R = 4.124, T_inlet = 288.15,
+                     gas_model = 'ideal', stage_temperatures = None):
+    '''Specific work of equal-ratio staged compression with intercooling, broadcast over
+    all arguments.
+
+    Parameters
+    ----------
+    inlet_pressure : float or ndarray
+        Inlet pressure in bar.
+    outlet_pressure : float or ndarray
+        Outlet pressure in bar.
+    isentropic_efficiency : float or ndarray
+        Isentropic efficiency, value between 0 and 1.
+    number_of_stages : int, ndarray or None, optional
+        Number of compression stages (values < 1 are set to 1). If None, the number of
+        stages is estimated so that the per-stage compression ratio is <= `stage_ratio`.
+    stage_ratio : float, optional
+        Typical compression ratio per stage used to estimate the number of stages.
+    gamma : float, optional
+        Heat capacity ratio of hydrogen (ideal gas model).
+    R : float, optional
+        Specific gas constant of hydrogen in kJ/(kg K).
+    T_inlet : float, optional
+        Inlet temperature in K, used for all stages if `stage_temperatures` is None.
+    gas_model : str, optional
+        'ideal' (default) for ideal gas with constant `gamma`, 'real' for real gas
+        behaviour using tabulated compressibility factors and heat capacities.
+    stage_temperatures : float, list or None, optional
+        Temperatures in K of the gas entering each stage (after intercooling). If fewer
+        values than stages are provided, the last value is used for the remaining stages.
+
+    Returns
+    -------
+    work : ndarray
+        Compression work in kWh per kg H2.
+    stage_compression_ratio : ndarray
+        Compression ratio per stage.
+    number_of_stages : ndarray
+        Number of stages (integer array).
+    compression_ratio : ndarray
+        Ratio of outlet and inlet pressure.
+
+    Notes
+    -----
+    Isentropic work per stage: W_s = Z * (k/(k-1)) * R * T_stage * (r_stage^((k-1)/k) - 1).
+    For ideal gas, Z = 1 and k = `gamma`. For real gas, k = cp/(cp - R) is evaluated at the
+    stage inlet and Z is the average of the compressibility factors at stage inlet and
+    (isentropic) stage outlet, both obtained from :func:`real_gas_properties`.
+    All arguments are broadcast against each other, so that e.g. a grid of outlet pressures,
+    efficiencies and stage numbers is evaluated at once.
+    '''
+
+    inlet_pressure = np.asarray(inlet_pressure, dtype = float)
+    compression_ratio = np.asarray(outlet_pressure, dtype = float) / inlet_pressure
+
+    if number_of_stages is None:
+        number_of_stages = np.ceil(np.log(compression_ratio) / np.log(stage_ratio))
+
+    isentropic_efficiency = np.asarray(isentropic_efficiency, dtype = float)
+    number_of_stages = np.maximum(1, np.trunc(number_of_stages)).astype(int)
+
+    (inlet_pressure, compression_ratio,
+     number_of_stages, isentropic_efficiency) = np.broadcast_arrays(inlet_pressure, compression_ratio,
+                                                                    number_of_stages, isentropic_efficiency)
+
+    stage_compression_ratio = compression_ratio ** (1.0 / number_of_stages)
+
+    if stage_temperatures is None:
+        stage_temperatures = T_inlet
+    stage_temperatures = np.atleast_1d(np.asarray(stage_temperatures, dtype = float))
+
+    if gas_model == 'ideal' and len(stage_temperatures) == 1:
+        isentropic_exponent = (gamma - 1) / gamma
+        work_stage = (gamma / (gamma - 1)) * R * stage_temperatures[0] * (stage_compression_ratio ** isentropic_exponent - 1)  # kJ/kg
+        work = number_of_stages * work_stage
+
+    elif gas_model in ('ideal', 'real'):
+        work = np.zeros(stage_compression_ratio.shape)
+
+        for stage in range(int(np.max(number_of_stages, initial = 1))):
+            temperature = stage_temperatures[min(stage, len(stage_temperatures) - 1)]
+
+            if gas_model == 'ideal':
+                Z, k = 1., gamma
+            else:
+                stage_pressure = inlet_pressure * stage_compression_ratio ** stage
+                Z_in, cp = real_gas_properties(temperature, stage_pressure)
+                k = cp / (cp - R)
+                outlet_temperature = temperature * stage_compression_ratio ** ((k - 1) / k)
+                Z_out, _ = real_gas_properties(outlet_temperature, stage_pressure * stage_compression_ratio)
+                Z = (Z_in + Z_out) / 2
+
+            work_stage = Z * (k / (k - 1)) * R * temperature * (stage_compression_ratio ** ((k - 1) / k) - 1)  # kJ/kg
+            work += np.where(stage < number_of_stages, work_stage, 0.)
+
+    else:
+        raise ValueError(f"Gas model has to be 'ideal' or 'real', not {gas_model}.")
+
+    work = work / 3600 / isentropic_efficiency  # kWh/kg
+
+    return work, stage_compression_ratio, number_of_stages, compression_ratio
+
+def compressor_capex(power_consumption, number_of_stages, unit_capex = None):
+    '''Compressor CAPEX based on the maximum power consumption, broadcast over scenarios.
+
+    Parameters
+    ----------
+    power_consumption : ndarray
+        Power consumption in kW with years (or peak values) in the last dimension,
+        shape (..., years).
+    number_of_stages : int or ndarray
+        Number of stages, broadcastable to the leading dimensions of `power_consumption`.
+    unit_capex : float, ndarray or None, optional
+        Unit CAPEX in $ per kW. If None, the default for multi-stage reciprocating
+        hydrogen compressors (75 $/kW plus 15 $/kW per additional stage, accounting for
+        intercoolers and auxiliaries) is used.
+
+    Returns
+    -------
+    capex : ndarray
+        Compressor CAPEX in $.
+    '''
+
+    max_power_kw = np.max(power_consumption, axis = -1)
+
+    if unit_capex is None:
+        unit_capex = 75.0 + (np.asarray(number_of_stages) - 1) * 15.0
+
+    return unit_capex * max_power_kw
+
+def compression_sweep(inlet_pressure, outlet_pressure, isentropic_efficiency, number_of_stages = None,
+                      h2_production_yearly = None, h2_production_hourly = None, unit_capex = None,
+                      hours_in_a_year = 8760, **kwargs):
+    '''Evaluation of the compression model for arrays of pressures, efficiencies and stage
+    numbers in one broadcast evaluation, without a discounted cash flow analysis.
+
+    Parameters
+    ----------
+    inlet_pressure, outlet_pressure, isentropic_efficiency, number_of_stages :
+        See :func:`compression_work`. Arrays are broadcast against each other.
+    h2_production_yearly : ndarray, optional
+        Yearly H2 production in kg. If provided, power consumption and CAPEX are
+        calculated for each combination.
+    h2_production_hourly : ndarray, optional
+        Hourly H2 production in kg (years, hours). If provided, CAPEX is sized on the peak
+        hourly power draw, which is returned as 'Peak Power (kW)'.
+    unit_capex : float, ndarray or None, optional
+        See :func:`compressor_capex`.
+    hours_in_a_year : int, optional
+        Hours per year used to convert yearly energy to average power.
+    **kwargs :
+        Keyword arguments passed to :func:`compression_work` (e.g. `gas_model`,
+        `stage_temperatures`).
+
+    Returns
+    -------
+    results : dict
+        Dictionary with 'Compression Ratio', 'Number of Stages', 'Stage Compression Ratio'
+        and 'Power Consumption per kg H2 (kWh/kg)' arrays with the broadcast shape of the
+        arguments. If `h2_production_yearly` is provided, 'Power Consumption (kW)'
+        (with years as additional last dimension) and 'CAPEX ($)' are included.
+    '''
+
+    work, stage_ratio, stages, compression_ratio = compression_work(inlet_pressure, outlet_pressure,
+                                                                    isentropic_efficiency, number_of_stages,
+                                                                    **kwargs)
+
+    results = {'Compression Ratio': compression_ratio,
+               'Number of Stages': stages,
+               'Stage Compression Ratio': stage_ratio,
+               'Power Consumption per kg H2 (kWh/kg)': work}
+
+    if h2_production_yearly is not None:
+        power = np.asarray(work)[..., None] * np.asarray(h2_production_yearly) / hours_in_a_year
+        results['Power Consumption (kW)'] = power
+        results['CAPEX ($)'] = compressor_capex(power, stages, unit_capex)
+
+    if h2_production_hourly is not None:
+        peak_power = np.asarray(work) * np.max(h2_production_hourly)
+        results['Peak Power (kW)'] = peak_power
+        results['CAPEX ($)'] = compressor_capex(peak_power[..., None], stages, unit_capex)
+
+    return results
@@ -1,6 +1,27 @@
+from functools import lru_cache
 from pyH2A.Utilities.input_modification import insert, process_table, hourly_to_daily_power
 import numpy as np
 
+HOURLY_OUTPUT_SETTINGS = [('Battery', 'Dispatch', 'hourly'),
+                          ('Compressor', 'Load Profile', 'hourly')]
+
+def hourly_outputs_requested(inp):
+    '''Checking if hourly outputs of Electrolyzer_Plugin are required.
+
+    Returns
+    -------
+    requested : bool
+        True if `Electrolyzer > Hourly Outputs > Value` is True or if one of the
+        settings in `HOURLY_OUTPUT_SETTINGS` (table, row, value), which enable
+        plugins using hourly outputs, is found in `inp`.
+    '''
+
+    if str(inp['Electrolyzer'].get('Hourly Outputs', {}).get('Value', False)).lower() == 'true':
+        return True
+
+    return any(inp.get(table, {}).get(row, {}).get('Value') == value
+               for table, row, value in HOURLY_OUTPUT_SETTINGS)
+
 class Electrolyzer_Plugin:
     '''Simulation of hydrogen production using electrolysis.
 
@@ -28,6 +49,14 @@ class Electrolyzer_Plugin:
         Operating time in hours before stack replacement of electrolyzer is required.
     Power Generation > Available Power (hourly, kWh) > Value : dict
         Available power, hourly basis, dictionary of years (in kWh).
+    Power Generation > Available Power from PV Profile > Value : bool, optional
+        True if available power is the unmodified output of Photovoltaic_Plugin, which 
+        enables the calculation based on :class:`Load_Duration_Curve` (using
+        `Power Generation > PV Profile (hourly, kWh per kW) > Value` and
+        `Power Generation > PV Profile Scaling (kW) > Value`).
+    Electrolyzer > Hourly Outputs > Value : bool, optional
+        If True, hourly outputs are provided even if no plugin using them is enabled
+        (see :func:`hourly_outputs_requested`). Defaults to False.
 
     Returns
     -------
@@ -46,11 +75,23 @@ class Electrolyzer_Plugin:
         Yearly operation data of electrolyzer in (year, H2 produced, electrolyzer capacity) format.
     Electrolyzer > H2 Production (yearly, kg) > Value : nd.array
         Yearly hydrogen production in kg.
-    Power Generation > Available Power (hourly, kWh) > Value : dict
+    Electrolyzer > H2 Production (hourly, kg) > Value : nd.array
+        Hourly hydrogen production in kg, 2D array with one row per operation year.
+        Only provided if hourly outputs are requested (e.g. `Compressor > Load Profile
+        > Value` is 'hourly').
+    Power Generation > Available Power (hourly, kWh) > Value : dict or int
         Available power (hourly, kWh) after subtracting power consumed by electrolyzer. 
-        (dictionary of years).
+        (dictionary of years). If the calculation is based on :class:`Load_Duration_Curve`,
+        available power is only provided in daily format and hourly available power is 
+        set to 0.
     Power Generation > Available Power (daily, kWh) > Value : dict
         Available power (daily, kWh) after subtracting power consumed by electrolyzer.
+    Power Generation > Available Power from PV Profile > Value : bool
+        Set to False, since available power has been modified (only if provided).
+    Electrolyzer > Unused Capacity (hourly, kWh) > Value : dict
+        Difference between electrolyzer power demand and power consumption for each
+        hour (dictionary of years, in kWh). Only provided if hourly outputs are
+        requested (e.g. `Battery > Dispatch > Value` is 'hourly').
     '''
 
     def __init__(self, dcf, print_info):
@@ -58,6 +99,7 @@ class Electrolyzer_Plugin:
         process_table(dcf.inp, 'Electrolyzer', 'Value')
         process_table(dcf.inp, 'Power Generation', 'Value')
 
+        self.hourly_outputs = hourly_outputs_requested(dcf.inp)
         self.calculate_H2_production(dcf)
         self.replacement_frequency = calculate_stack_replacement(self.yearly_data[:,2], 
                                     dcf.inp['Electrolyzer']['Replacement time (h)']['Value'])
@@ -84,16 +126,41 @@ class Electrolyzer_Plugin:
         insert(dcf, 'Power Generation', 'Available Power (daily, kWh)', 'Value',
                 self.yearly_data_unused_power_daily, __name__, print_info = print_info)
 
+        if 'Available Power from PV Profile' in dcf.inp['Power Generation']:
+            insert(dcf, 'Power Generation', 'Available Power from PV Profile', 'Value',
+                   False, __name__, print_info = print_info)
+
+        if self.hourly_outputs is True:
+            insert(dcf, 'Electrolyzer','H2 Production (hourly, kg)', 'Value',
+                   self.h2_production_hourly, __name__, print_info = print_info)
+            insert(dcf, 'Electrolyzer', 'Unused Capacity (hourly, kWh)', 'Value',
+                   self.yearly_data_unused_capacity, __name__, print_info = print_info)
+
     def calculate_H2_production(self, dcf):
         '''Using hourly power generation data and electrolyzer parameters,
         H2 production is calculated.
+
+        Notes
+        -----
+        If available power is the unmodified output of Photovoltaic_Plugin (a fixed
+        hourly profile scaled for each year, indicated by `Power Generation > Available
+        Power from PV Profile > Value`) and no hourly outputs are requested, the 
+        calculation is based on a cached :class:`Load_Duration_Curve` (see 
+        :meth:`calculate_H2_production_load_duration`).
         '''
 
+        if (self.hourly_outputs is False and
+            dcf.inp['Power Generation'].get('Available Power from PV Profile', {}).get('Value', False) is True):
+            self.calculate_H2_production_load_duration(dcf)
+            return
+
         power_generation_yearly_data = dcf.inp['Power Generation']['Available Power (hourly, kWh)']['Value']
 
         yearly_data = []
+        hourly_h2_production = []
         yearly_data_unused_power = {}
         yearly_data_unused_power_daily = {}
+        yearly_data_unused_capacity = {}
 
         for year in dcf.operation_years:
 
@@ -104,7 +171,7 @@ class Electrolyzer_Plugin:
                                                                                             year)
 
             electrolyzer_power_demand *= np.ones(len(power_generation))
-            electrolyzer_power_consumption = np.amin(np.c_[power_generation, electrolyzer_power_demand], axis = 1)
+            electrolyzer_power_consumption = np.minimum(power_generation, electrolyzer_power_demand)
 
             threshold = dcf.inp['Electrolyzer']['Minimum capacity']['Value']
             electrolyzer_capacity = electrolyzer_power_consumption / electrolyzer_power_demand
@@ -124,11 +191,50 @@ class Electrolyzer_Plugin:
             yearly_data_unused_power[year] = unused_power
             yearly_data_unused_power_daily[year] = hourly_to_daily_power(unused_power)
 
+            if self.hourly_outputs is True:
+                hourly_h2_production.append(h2_produced)
+                yearly_data_unused_capacity[year] = electrolyzer_power_demand - electrolyzer_power_consumption
+
         self.yearly_data = np.asarray(yearly_data)
         self.h2_production = np.concatenate([np.zeros(dcf.inp['Financial Input Values']['construction time']['Value']), 
                                                 self.yearly_data[:,1]])
+        self.h2_production_hourly = np.vstack(hourly_h2_production) if self.hourly_outputs is True else None
         self.yearly_data_unused_power = yearly_data_unused_power
         self.yearly_data_unused_power_daily = yearly_data_unused_power_daily
+        self.yearly_data_unused_capacity = yearly_data_unused_capacity
+
+    def calculate_H2_production_load_duration(self, dcf):
+        '''Calculation of H2 production for a fixed hourly power profile which is scaled
+        for each year (PV nominal power and power loss).
+
+        Consumed energy and operating hours of each day and year are obtained from the
+        load duration curves of the profile by binary search and prefix sums (see
+        :meth:`Load_Duration_Curve.period_operation`), without hourly arrays. Available
+        power is only provided in daily format.
+        '''
+
+        power_generation = dcf.inp['Power Generation']
+        years = np.asarray(dcf.operation_years)
+
+        electrolyzer_power_demand, power_increase = calculate_electrolyzer_power_demand(dcf.inp['Electrolyzer']['Power requirement increase per year']['Value'],
+                                                                                        dcf.inp['Electrolyzer']['Nominal Power (kW)']['Value'],
+                                                                                        years)
+        threshold = dcf.inp['Electrolyzer']['Minimum capacity']['Value']
+        efficiency = dcf.inp['Electrolyzer']['Conversion efficiency (kg H2/kWh)']['Value']
+        scaling = np.asarray(power_generation['PV Profile Scaling (kW)']['Value'], dtype = float)
+
+        curve = load_duration_curve(power_generation['PV Profile (hourly, kWh per kW)']['Value'])
+        consumed, operating_hours = curve.period_operation(scaling, electrolyzer_power_demand, threshold)
+
+        self.yearly_data = np.c_[years, calculate_hydrogen_production(consumed.sum(axis = 1), efficiency, power_increase),
+                                 operating_hours.sum(axis = 1)]
+        self.h2_production = np.concatenate([np.zeros(dcf.inp['Financial Input Values']['construction time']['Value']), 
+                                                self.yearly_data[:,1]])
+
+        unused_power_daily = scaling[:,None] * curve.period_profile - consumed
+
+        self.yearly_data_unused_power = 0
+        self.yearly_data_unused_power_daily = {year: unused_power_daily[counter] for counter, year in enumerate(dcf.operation_years)}
 
     def calculate_scaling_factors(self, dcf):
         '''Calculation of electrolyzer CAPEX scaling factors.
@@ -144,6 +250,143 @@ class Electrolyzer_Plugin:
 
         return dcf.inp['CAPEX Multiplier']['Multiplier']['Value'] ** number_of_tenfold_increases
     
+class Load_Duration_Curve:
+    '''Load duration curve (sorted hourly power profile with prefix sums) for the
+    calculation of electrolyzer operation at any scaling of the profile.
+
+    Parameters
+    ----------
+    profile : ndarray
+        Hourly power profile (e.g. power generation per kW of nominal PV power).
+    period : int, optional
+        Number of hours per period (e.g. 24 for days) for which operation is
+        calculated by :meth:`period_operation`.
+
+    Notes
+    -----
+    For a power generation of `scale` * `profile` and an electrolyzer with power demand
+    `demand`, the electrolyzer operates in hours in which generation exceeds
+    `threshold` * `demand` and consumes min(generation, demand). Since the profile is
+    sorted once, the operating hours and the consumed energy are obtained by two binary
+    searches and prefix sum lookups, independent of the number of hours.
+
+    For each period, the ranks of its hours in the sorted profile are sorted as well,
+    so that the operation within all periods is obtained by binary searches of the
+    ranks which bound operation.
+    '''
+
+    def __init__(self, profile, period = 24):
+        profile = np.asarray(profile, dtype = float)
+        order = np.argsort(profile, kind = 'stable')
+
+        self.sorted_profile = profile[order]
+        self.cumulative = np.concatenate([[0.], np.cumsum(self.sorted_profile)])
+        self.hours = len(self.sorted_profile)
+        self.period = period
+
+        if self.hours % period == 0:
+            ranks = np.empty(self.hours, dtype = int)
+            ranks[order] = np.arange(self.hours)
+            period_ranks = np.sort(ranks.reshape(-1, period), axis = 1)
+
+            self.period_keys = (np.arange(len(period_ranks))[:,None] * self.hours + period_ranks).ravel()
+            self.period_cumulative = np.concatenate([[0.], np.cumsum(self.sorted_profile[period_ranks].ravel())])
+            self.period_profile = profile.reshape(-1, period).sum(axis = 1)
+        else:
+            self.period_keys = None
+
+    def operation_ranks(self, scale, demand, threshold):
+        '''Number of hours in which generation is below the operation threshold
+        (`lower`) and below the power demand (`upper`), broadcast over all arguments.
+        '''
+
+        scale, demand, threshold = np.broadcast_arrays(np.asarray(scale, dtype = float),
+                                                       np.asarray(demand, dtype = float),
+                                                       np.asarray(threshold, dtype = float))
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            lower = np.searchsorted(self.sorted_profile, threshold * demand / scale, side = 'right')
+            upper = np.searchsorted(self.sorted_profile, demand / scale, side = 'right')
+
+        lower = np.where(threshold < 1, lower, self.hours)
+        upper = np.maximum(upper, lower)
+
+        return scale, demand, lower, upper
+
+    def operation(self, scale, demand, threshold):
+        '''Consumed energy and operating hours, broadcast over all arguments.
+
+        Parameters
+        ----------
+        scale : float or ndarray
+            Factor by which profile is multiplied (e.g. PV nominal power in kW).
+        demand : float or ndarray
+            Electrolyzer power demand in kW.
+        threshold : float or ndarray
+            Minimum capacity required for electrolyzer operation, value between 0 and 1.
+
+        Returns
+        -------
+        consumed : ndarray
+            Energy consumed by electrolyzer in kWh.
+        operating_hours : ndarray
+            Number of hours in which electrolyzer operates.
+        '''
+
+        scale, demand, lower, upper = self.operation_ranks(scale, demand, threshold)
+
+        operating_hours = self.hours - lower
+        consumed = scale * (self.cumulative[upper] - self.cumulative[lower]) + demand * (self.hours - upper)
+
+        return consumed, operating_hours
+
+    def period_operation(self, scale, demand, threshold):
+        '''Consumed energy and operating hours of each period, broadcast over all
+        arguments (see :meth:`operation`).
+
+        Returns
+        -------
+        consumed : ndarray
+            Energy consumed by electrolyzer in kWh, with an additional last axis for
+            periods.
+        operating_hours : ndarray
+            Number of hours in which electrolyzer operates, with an additional last
+            axis for periods.
+        '''
+
+        if self.period_keys is None:
+            raise ValueError(f"Length of profile ({self.hours}) is not a multiple of period ({self.period}).")
+
+        scale, demand, lower, upper = self.operation_ranks(scale, demand, threshold)
+
+        offsets = np.arange(0, len(self.period_keys), self.period) // self.period * self.hours
+        ends = np.arange(self.period, len(self.period_keys) + 1, self.period)
+
+        lower = np.searchsorted(self.period_keys, offsets + lower[...,None])
+        upper = np.searchsorted(self.period_keys, offsets + upper[...,None])
+
+        operating_hours = ends - lower
+        consumed = (scale[...,None] * (self.period_cumulative[upper] - self.period_cumulative[lower]) 
+                    + demand[...,None] * (ends - upper))
+
+        return consumed, operating_hours
+
+@lru_cache(maxsize = 16)
+def _cached_load_duration_curve(profile_bytes):
+    return Load_Duration_Curve(np.frombuffer(profile_bytes))
+
+def load_duration_curve(profile):
+    '''Cached :class:`Load_Duration_Curve` for `profile`.
+
+    Curves are cached by the content of the profile, so that a new array with the
+    same data (e.g. the column of an irradiation file read in each run) reuses the
+    curve.
+    '''
+
+    profile = np.ascontiguousarray(profile, dtype = float)
+
+    return _cached_load_duration_curve(profile.tobytes())
+
 def calculate_electrolyzer_power_demand(power_requirement_increase, nominal_power, year):
     '''Calculation of yearly increase in electrolyzer power demand.
     '''
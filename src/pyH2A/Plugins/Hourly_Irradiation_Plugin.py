@@ -101,12 +101,13 @@ def import_Chang_data(file_name):
 def import_hourly_data(file_name):
 	'''Imports hourly irradiation data and location coordinates from the `.csv` format provided 
 	by: https://re.jrc.ec.europa.eu/pvg_tools/en/#TMY.
-	``@lru_cache`` is used for fast repeated reads
+	``@lru_cache`` is used for fast repeated reads, returned arrays are read-only.
 	'''
 
 	data = np.genfromtxt(file_import(file_name, mode = 'r'), 
 						  delimiter = ',', skip_header = 17, 
 						  skip_footer = 9, converters = {0: converter_function})
+	data.setflags(write = False)
 
 	strings = ['Latitude (decimal degrees)', 'Longitude (decimal degrees)']
 	location = {}
@@ -133,6 +134,7 @@ def calculate_PV_power_ratio(file_name, module_tilt, array_azimuth, nominal_oper
 	'''Calculation based on Chang 2020, https://doi.org/10.1016/j.xcrp.2020.100209
 	SAT: horzontal single axis tracking
 	DAT: dual axis tracking, no diffuse radiation
+	Returned arrays are cached and read-only.
 	'''
 
 	data, location = import_hourly_data(file_name)
@@ -194,5 +196,8 @@ def calculate_PV_power_ratio(file_name, module_tilt, array_azimuth, nominal_oper
 	power_dat_kW = (data['Direct Normal Irradiance'] * temperature_derating * 
 					mismatch_derating * dirt_derating / 1000)
 
+	for power in (power_kW, power_sat_kW, power_dat_kW):
+		power.setflags(write = False)
+
 	return power_kW, power_sat_kW, power_dat_kW
 
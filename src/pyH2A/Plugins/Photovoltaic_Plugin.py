@@ -36,6 +36,15 @@ class Photovoltaic_Plugin:
 		Available power, hourly basis, dictionary of years (in kWh).
 	Power Generation > Available Power (daily, kWh) > Value : dict
 		Available power, daily basis, dictionary of years (in kWh).
+	Power Generation > PV Profile (hourly, kWh per kW) > Value : ndarray
+		Hourly power ratio data used for all years (power generation per kW of nominal power).
+	Power Generation > PV Profile Scaling (kW) > Value : ndarray
+		Factor for each operation year by which the hourly profile is multiplied (nominal
+		power corrected for power loss).
+	Power Generation > Available Power from PV Profile > Value : bool
+		True, indicating that available power is the PV profile scaled for each year.
+		Plugins which modify `Power Generation > Available Power (hourly, kWh) > Value` 
+		set it to False.
 	Non-Depreciable Capital Costs > Land required (acres) > Value : float
 		Total land required in acres.
 	Non-Depreciable Capital Costs > Solar Collection Area (m2) > Value : float
@@ -60,6 +69,12 @@ class Photovoltaic_Plugin:
 				self.power_generation_yearly_data, __name__, print_info = print_info)
 		insert(dcf, 'Power Generation', 'Available Power (daily, kWh)', 'Value',
 		 		self.power_generation_yearly_data_daily_power, __name__, print_info = print_info)
+		insert(dcf, 'Power Generation', 'PV Profile (hourly, kWh per kW)', 'Value',
+				self.profile, __name__, print_info = print_info)
+		insert(dcf, 'Power Generation', 'PV Profile Scaling (kW)', 'Value',
+				self.profile_scaling, __name__, print_info = print_info)
+		insert(dcf, 'Power Generation', 'Available Power from PV Profile', 'Value',
+				True, __name__, print_info = print_info)
 
 		insert(dcf, 'Non-Depreciable Capital Costs', 'Land required (acres)', 'Value', 
 				self.area_acres, __name__, print_info = print_info)
@@ -79,6 +94,9 @@ class Photovoltaic_Plugin:
 		yearly_data = {}
 		yearly_data_daily_power = {}
 
+		self.profile = data
+		self.profile_scaling = self.calculate_photovoltaic_loss_correction(dcf, 1., np.asarray(dcf.operation_years)) * dcf.inp['Photovoltaic']['Nominal Power (kW)']['Value']
+
 		for year in dcf.operation_years:
 			data_loss_corrected = self.calculate_photovoltaic_loss_correction(dcf, data, year)
 			power_generation = data_loss_corrected * dcf.inp['Photovoltaic']['Nominal Power (kW)']['Value']
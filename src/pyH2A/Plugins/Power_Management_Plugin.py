@@ -141,7 +141,7 @@ def calculate_fulfillment(demand, remaining):
     
     fulfilled = np.minimum(demand, remaining)
 
-    remaining -= fulfilled
+    remaining = remaining - fulfilled
     unfulfilled = demand - fulfilled
     
     return remaining, unfulfilled
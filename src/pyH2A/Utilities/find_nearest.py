@@ -1,5 +1,25 @@
 import numpy as np
-import math as math
+
+def _nearest_from_insertion(array_1d, values, idx):
+    '''Choosing between insertion index `idx` and its left neighbour.
+    The left neighbour is only used if it is strictly closer (or `idx` is past
+    the end of `array_1d`).
+    '''
+
+    length = array_1d.shape[-1]
+    left = np.clip(idx - 1, 0, length - 1)
+    right = np.clip(idx, 0, length - 1)
+
+    if array_1d.ndim == 1:
+        left_values, right_values = array_1d[left], array_1d[right]
+    else:
+        left_values = np.take_along_axis(array_1d, left, axis = -1)
+        right_values = np.take_along_axis(array_1d, right, axis = -1)
+
+    use_left = (idx > 0) & ((idx == length) |
+                            (np.abs(values - left_values) < np.abs(values - right_values)))
+
+    return np.where(use_left, left, idx)
 
 def find_nearest(array, values):
     '''Find value(s) in `array` that are nearest to `values`.
@@ -7,32 +27,60 @@ def find_nearest(array, values):
     Parameters
     ----------
     array: ndarray
-        Array to be searched. If `array` has more than one dimension, only
+        Sorted array to be searched. If `array` has more than one dimension, only
         the first column is used.
     values : float, ndarray or list
-        Single float, ndarray or list with values for which the nearest entries
-        in `array` should be found.
+        Single float, ndarray (of any shape) or list with values for which the
+        nearest entries in `array` should be found.
 
     Returns
     -------
-    hits : list
-        List of indices of closest values in `array`.
+    hits : ndarray
+        Integer array of indices of closest values in `array`, with the shape of
+        `values` (at least 1D). If a value is exactly between two entries of
+        `array`, the index of the larger entry is returned.
     '''
-    
+
+    array = np.asarray(array)
+
     if array.ndim != 1:
         array_1d = array[:,0]
     else:
         array_1d = array
 
     values = np.atleast_1d(values)
-    hits = []
+    idx = np.searchsorted(array_1d, values, side = 'left')
+
+    return _nearest_from_insertion(array_1d, values, idx)
+
+def find_nearest_batch(arrays, values):
+    '''Row-wise :func:`find_nearest` for a batch of arrays.
+
+    Parameters
+    ----------
+    arrays : ndarray
+        2D array of shape (N, m), each row is a sorted array to be searched.
+    values : ndarray
+        2D array of shape (N, k), row n contains the values for which the nearest
+        entries in row n of `arrays` should be found. A 1D array of length k is
+        used for all rows.
+
+    Returns
+    -------
+    hits : ndarray
+        Integer array of shape (N, k) with indices of closest values in each row.
+
+    Notes
+    -----
+    Insertion indices are obtained by counting the entries of each row which are
+    smaller than the respective values, which requires N * k * m comparisons
+    without any Python loops. This is efficient for the short arrays (e.g. plant
+    years) searched in Monte Carlo runs.
+    '''
 
-    for i in range(len(values)):
+    arrays = np.atleast_2d(arrays)
+    values = np.broadcast_to(values, (arrays.shape[0], np.shape(values)[-1]))
 
-        idx = np.searchsorted(array_1d, values[i], side= "left")
-        if idx > 0 and (idx == len(array_1d) or math.fabs(values[i] - array_1d[idx-1]) < math.fabs(values[i] - array_1d[idx])):
-            hits.append(idx-1)
-        else:
-            hits.append(idx)
+    idx = np.count_nonzero(arrays[:,None,:] < values[:,:,None], axis = -1)
 
-    return hits
\ No newline at end of file
+    return _nearest_from_insertion(arrays, values, idx)
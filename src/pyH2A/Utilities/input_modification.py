@@ -1,11 +1,12 @@
+import copy
 import numbers
 from functools import lru_cache, reduce
 import importlib.resources
-from importlib import import_module
 from pathlib import Path
 import ast
 import operator
 import numpy as np
+from pyH2A.Utilities.plugin_registry import get_plugin
 
 def import_plugin(plugin_name, plugin_module):
 	'''Importing module.
@@ -27,18 +28,12 @@ def import_plugin(plugin_name, plugin_module):
 	Notes
 	-----
 	Module `plugin_name` is imported. It is assumed that the module contains 
-	a class with the same name as `plugin_name`
+	a class with the same name as `plugin_name`. Classes are resolved through
+	:func:`~pyH2A.Utilities.plugin_registry.get_plugin`, so that each class is only
+	imported once and plugins provided by other packages via entry points are found.
 	'''
 
-	if plugin_module is True:
-		prefix = 'pyH2A.Plugins.'
-	else:
-		prefix = 'pyH2A.Analysis.'
-
-	plugin = import_module(prefix + plugin_name)
-	plugin_class = getattr(plugin, plugin_name)
-
-	return plugin_class
+	return get_plugin(plugin_name, plugin_module)
 
 def execute_plugin(plugin_name, plugs_dict, plugin_module = True, 
 				   nested_dictionary = False, **kwargs):
@@ -160,10 +155,12 @@ def read_textfile(file_name, delimiter, mode = 'rb', **kwargs):
 	Returns
 	-------
 	data : ndarray
-		Array containing read data.
+		Read-only array containing read data. The same array is returned for 
+		repeated reads, so it has to be copied before it is modified.
 	'''
 
 	data = np.genfromtxt(file_import(file_name, mode = mode), delimiter = delimiter, **kwargs)
+	data.setflags(write = False)
 
 	return data
 
@@ -370,10 +367,40 @@ def set_by_path(root, items, value, value_type = 'value'):
 	(value_type = factor) or is replaced by provided one.
 	In-place replacement, should only be used on deep copy of self.inp dictionary
 	'''
+	container = get_by_path(root, items[:-1])
+
 	if value_type == 'factor':
-		get_by_path(root, items[:-1])[items[-1]] *= value
+		container[items[-1]] = container[items[-1]] * value
 	else:
-		get_by_path(root, items[:-1])[items[-1]] = value
+		container[items[-1]] = value
+
+def _read_only_arrays(obj, memo):
+	'''Collecting read-only arrays in nested dictionaries/lists in `memo`.'''
+
+	if isinstance(obj, dict):
+		for value in obj.values():
+			_read_only_arrays(value, memo)
+	elif isinstance(obj, (list, tuple)):
+		for value in obj:
+			_read_only_arrays(value, memo)
+	elif isinstance(obj, np.ndarray) and not obj.flags.writeable:
+		memo[id(obj)] = obj
+
+def copy_input(inp):
+	'''Deep copy of input dictionary, in which read-only arrays are referenced 
+	instead of copied.
+
+	Notes
+	-----
+	Read-only arrays (e.g. arrays in shared memory, see 
+	:mod:`~pyH2A.Utilities.shared_arrays`) cannot be modified in-place, so that
+	the copy can refer to the same array without affecting `inp`.
+	'''
+
+	memo = {}
+	_read_only_arrays(inp, memo)
+
+	return copy.deepcopy(inp, memo)
 
 def insert(class_object, top_key, middle_key, bottom_key, value, name, 
 		   print_info = True, add_processed = True, insert_path = True):
@@ -0,0 +1,95 @@
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+import pyH2A.Utilities.find_nearest as fn
+from pyH2A.Utilities.input_modification import read_textfile
+
+INFLATION_TABLES = {'Plant Cost': 'pyH2A.Lookup_Tables~Plant_Cost_Index.csv',
+					'GDP Deflator': 'pyH2A.Lookup_Tables~GDP_Implicit_Deflator_Price_Index.csv',
+					'Labor': 'pyH2A.Lookup_Tables~Labor_Index.csv',
+					'Chemical': 'pyH2A.Lookup_Tables~SRI_Chemical_Price_Index.csv'}
+
+Inflators = namedtuple('Inflators', ['cepci', 'ci', 'labor', 'chemical'])
+
+_tables = {}
+
+def preload_tables():
+	'''Loading all inflation index tables into the store of the current process.
+
+	Notes
+	-----
+	Tables are loaded once per process. When called before a process pool is created,
+	forked worker processes inherit the loaded (read-only) tables without reading or
+	copying them again.
+	'''
+
+	for name in INFLATION_TABLES:
+		get_table(name)
+
+def get_table(name):
+	'''Read-only array of the inflation index table `name` (year in first column,
+	index in second column).
+	'''
+
+	if name not in _tables:
+		table = np.array(read_textfile(INFLATION_TABLES[name], delimiter = '	'))
+		table.setflags(write = False)
+		_tables[name] = table
+
+	return _tables[name]
+
+def year_index(name, years):
+	'''Lookup of the rows of table `name` with the years nearest to `years`.
+
+	Parameters
+	----------
+	name : str
+		Name of table in `INFLATION_TABLES`.
+	years : float or ndarray
+		Year(s) to be looked up.
+
+	Returns
+	-------
+	idx : ndarray
+		Indices of rows with the nearest years, with the same shape as `years`
+		(see :func:`~pyH2A.Utilities.find_nearest.find_nearest`).
+	'''
+
+	return fn.find_nearest(get_table(name), years).reshape(np.shape(years))
+
+def index_ratio(name, numerator_year, denominator_year):
+	'''Ratio of index values of table `name` in the years nearest to `numerator_year`
+	and `denominator_year`.
+	'''
+
+	numerator_idx, denominator_idx = year_index(name, [numerator_year, denominator_year])
+	values = get_table(name)[:,1]
+
+	return values[numerator_idx] / values[denominator_idx]
+
+@lru_cache(maxsize = None)
+def inflators(ref_year, basis_year, current_year):
+	'''Inflators for capital costs, chemicals and labor, cached for each combination of
+	reference year, basis year and current year for capital costs.
+
+	Parameters
+	----------
+	ref_year : float
+		Reference year.
+	basis_year : float
+		Basis year.
+	current_year : float
+		Current year for capital costs.
+
+	Returns
+	-------
+	inflators : namedtuple
+		Inflators with `cepci` (plant cost index from basis year to current year),
+		`ci` (GDP deflator from current year to reference year), `labor` and `chemical`
+		(from basis year to reference year) fields.
+	'''
+
+	return Inflators(cepci = index_ratio('Plant Cost', current_year, basis_year),
+					 ci = index_ratio('GDP Deflator', ref_year, current_year),
+					 labor = index_ratio('Labor', ref_year, basis_year),
+					 chemical = index_ratio('Chemical', ref_year, basis_year))
@@ -1,4 +1,7 @@
 import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import PurePath
 from pathlib import Path
 import matplotlib.pyplot as plt
@@ -46,6 +49,105 @@ def set_font(font_family, font, font_size):
 	rcParams['font.sans-serif'] = [font]
 	rcParams['font.size'] = font_size
 
+RENDERING_MODES = ('inline', 'deferred', 'none')
+
+_rendering = {'mode': 'inline', 'queue': [], 'backend': None}
+
+def set_rendering_mode(mode):
+	'''Set how figures are handled by `Figure_Lean.execute()`.
+
+	Parameters
+	----------
+	mode : str
+		'inline': figures are shown and/or saved immediately (default).
+		'deferred': figures which are to be saved are queued and rendered by 
+		:func:`render_deferred_figures`, `show` is ignored.
+		'none': figures are neither shown nor saved (compute-only runs).
+
+	Returns
+	-------
+	previous_mode : str
+		Rendering mode before the change.
+
+	Notes
+	-----
+	For 'deferred' and 'none', the non-interactive Agg backend is used. The previous
+	matplotlib backend is restored when the mode is set to 'inline' again.
+	'''
+
+	if mode not in RENDERING_MODES:
+		raise ValueError(f'Rendering mode has to be one of {RENDERING_MODES}, not {mode}.')
+
+	if mode != 'inline' and _rendering['backend'] is None:
+		_rendering['backend'] = plt.get_backend()
+		plt.switch_backend('Agg')
+	elif mode == 'inline' and _rendering['backend'] is not None:
+		plt.switch_backend(_rendering['backend'])
+		_rendering['backend'] = None
+
+	previous_mode = _rendering['mode']
+	_rendering['mode'] = mode
+
+	return previous_mode
+
+def get_rendering_mode():
+	'''Current rendering mode (see :func:`set_rendering_mode`).'''
+
+	return _rendering['mode']
+
+def render_figure(job):
+	'''Rendering pickled figure to file.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of pickled matplotlib.fig, path to file, dpi and transparent flag.
+
+	Returns
+	-------
+	path_to_file : str
+		Path to saved figure.
+	'''
+
+	figure_bytes, path_to_file, dpi, transparent = job
+
+	fig = pickle.loads(figure_bytes)
+	fig.savefig(path_to_file, transparent = transparent, dpi = dpi)
+	plt.close(fig)
+
+	return str(path_to_file)
+
+def render_deferred_figures(processes = None):
+	'''Rendering all figures queued in 'deferred' rendering mode.
+
+	Parameters
+	----------
+	processes : int or None, optional
+		Number of worker processes used for rendering. If None, all available
+		CPUs are used. If 1, figures are rendered in the calling process.
+		Worker processes use the non-interactive Agg backend.
+
+	Returns
+	-------
+	paths : list
+		Paths of saved figures.
+	'''
+
+	jobs = _rendering['queue']
+	_rendering['queue'] = []
+
+	if processes is None:
+		processes = os.cpu_count() or 1
+
+	processes = min(processes, len(jobs))
+
+	if processes <= 1:
+		return [render_figure(job) for job in jobs]
+
+	with ProcessPoolExecutor(max_workers = processes, initializer = plt.switch_backend,
+							 initargs = ('Agg',)) as executor:
+		return list(executor.map(render_figure, jobs))
+
 class Figure_Lean:
 	'''Wrapper class for figures.
 
@@ -106,7 +208,8 @@ class Figure_Lean:
 	Notes
 	-----
 	Provided figure is shown and/or saved in provided directory with given name by
-	running `Figure_Lean.execute()`.
+	running `Figure_Lean.execute()`. How this is done depends on the rendering
+	mode (see :func:`set_rendering_mode`).
 	'''
 	def __init__(self, name, directory, provided_figure_and_axis = None, 
 				 show = False, save = False, 
@@ -148,7 +251,27 @@ class Figure_Lean:
 	def execute(self):
 		'''Running `self.execute()` executes desired 
 		`show` and `save` options.
+
+		Notes
+		-----
+		In 'deferred' rendering mode, figures which are to be saved are pickled
+		and queued for :func:`render_deferred_figures` (figures which cannot be
+		pickled are saved immediately). In 'none' rendering mode, the figure is 
+		closed without being shown or saved.
 		'''
+
+		mode = _rendering['mode']
+
+		if mode == 'none':
+			plt.close(self.fig)
+			return
+
+		if mode == 'deferred':
+			if self.save:
+				self.queue_figure(self.pdf, self.dpi, self.transparent)
+			plt.close(self.fig)
+			return
+
 		if self.show:
 			plt.show()
 		else:
@@ -157,17 +280,33 @@ class Figure_Lean:
 		if self.save:
 			self.save_figure(self.pdf, self.dpi, self.transparent)
 
-	def save_figure(self, pdf, dpi, transparent):
-		'''Saving figure in target dictionary with specified 
-		parameters.
-		'''
+	def file_path(self, pdf):
+		'''Path of saved figure.'''
 
 		if pdf is True:
 			suffix = '.pdf'
 		else:
 			suffix = '.png'
 
-		path_to_file = PurePath(self.directory, self.name + suffix)
+		return PurePath(self.directory, self.name + suffix)
+
+	def queue_figure(self, pdf, dpi, transparent):
+		'''Queueing figure for rendering by :func:`render_deferred_figures`.
+		'''
+
+		try:
+			figure_bytes = pickle.dumps(self.fig)
+		except (pickle.PicklingError, TypeError, AttributeError):
+			self.save_figure(pdf, dpi, transparent)
+		else:
+			_rendering['queue'].append((figure_bytes, self.file_path(pdf), dpi, transparent))
+
+	def save_figure(self, pdf, dpi, transparent):
+		'''Saving figure in target dictionary with specified 
+		parameters.
+		'''
+
+		path_to_file = self.file_path(pdf)
 
 		self.fig.savefig(path_to_file, 
 						 transparent = transparent, 
@@ -0,0 +1,194 @@
+import inspect
+import warnings
+from importlib import import_module
+from importlib.metadata import entry_points
+
+PLUGIN_ENTRY_POINT_GROUP = 'pyH2A.plugins'
+ANALYSIS_ENTRY_POINT_GROUP = 'pyH2A.analysis'
+
+_registry = {True: {}, False: {}}
+_entry_points_loaded = {True: False, False: False}
+
+def required_arguments(plugin_module = True):
+	'''Arguments with which plugin (`plugin_module` is True) or analysis module 
+	(`plugin_module` is False) classes are instantiated.
+
+	Returns
+	-------
+	args : tuple
+		Names of positional arguments. Plugins are called as 
+		``plugin_class(dcf, print_info)`` by 
+		:class:`~pyH2A.Discounted_Cash_Flow.Discounted_Cash_Flow`.
+	kwargs : tuple
+		Names of keyword arguments. Analysis modules are called as 
+		``module_class(input_file = input_file)`` by 
+		:func:`~pyH2A.Utilities.input_modification.execute_plugin`.
+	'''
+
+	if plugin_module is True:
+		return ('dcf', 'print_info'), ()
+	else:
+		return (), ('input_file',)
+
+def validate_plugin_signature(plugin_class, name, plugin_module = True):
+	'''Checking that `plugin_class` can be instantiated by pyH2A.
+
+	Parameters
+	----------
+	plugin_class : class
+		Class to be checked.
+	name : str
+		Name under which class is registered, used for error messages.
+	plugin_module : bool, optional
+		Flag to differentiate between plugins and analysis modules.
+
+	Raises
+	------
+	TypeError
+		If `plugin_class` is not a class or if it cannot be called the way
+		pyH2A calls it (positional `dcf` and `print_info` for plugins, keyword
+		`input_file` for analysis modules).
+	'''
+
+	if not inspect.isclass(plugin_class):
+		raise TypeError(f'{name} is not a class (type is {type(plugin_class)}).')
+
+	args, kwargs = required_arguments(plugin_module)
+
+	try:
+		inspect.signature(plugin_class).bind(*[None for argument in args],
+											 **{argument: None for argument in kwargs})
+	except TypeError as error:
+		arguments = list(args) + [f'{argument} = ...' for argument in kwargs]
+		raise TypeError('{0} cannot be instantiated with arguments ({1}): {2}'.format(
+						name, ', '.join(arguments), error)) from None
+
+def register_plugin(plugin_class, name = None, plugin_module = True):
+	'''Registering plugin or analysis module class.
+
+	Parameters
+	----------
+	plugin_class : class
+		Plugin or analysis module class.
+	name : str or None, optional
+		Name under which class is registered (name used in `Workflow` table or
+		analysis table title). If None, the name of the class is used.
+	plugin_module : bool, optional
+		Flag to differentiate between plugins and analysis modules.
+
+	Returns
+	-------
+	plugin_class : class
+		Registered class, so that `register_plugin` can be used as a decorator.
+
+	Notes
+	-----
+	The signature of `plugin_class` is validated once during registration
+	using :func:`validate_plugin_signature`, registered classes are not checked
+	again when they are executed.
+	'''
+
+	if name is None:
+		name = plugin_class.__name__
+
+	validate_plugin_signature(plugin_class, name, plugin_module = plugin_module)
+	_registry[plugin_module][name] = plugin_class
+
+	return plugin_class
+
+def select_entry_points(group):
+	'''Entry points of `group` from installed packages.'''
+
+	installed = entry_points()
+
+	if hasattr(installed, 'select'):
+		return installed.select(group = group)
+	else:
+		return installed.get(group, [])
+
+def load_entry_points(plugin_module = True):
+	'''Registering plugins or analysis modules provided by other packages.
+
+	Notes
+	-----
+	Packages provide plugins in the `pyH2A.plugins` and analysis modules in the
+	`pyH2A.analysis` entry point group. The entry point name is the name used in
+	the input file, the entry point value refers to the class, e.g.:
+
+	[project.entry-points."pyH2A.plugins"]
+	My_Plugin = "my_package.my_module:My_Plugin"
+
+	Entry points which cannot be loaded or whose class has an invalid signature are
+	skipped with a warning, so that a broken package does not prevent the use of 
+	other plugins.
+	'''
+
+	if plugin_module is True:
+		group = PLUGIN_ENTRY_POINT_GROUP
+	else:
+		group = ANALYSIS_ENTRY_POINT_GROUP
+
+	for entry_point in select_entry_points(group):
+		try:
+			register_plugin(entry_point.load(), name = entry_point.name,
+							plugin_module = plugin_module)
+		except Exception as error:
+			warnings.warn(f'Entry point {entry_point.name} ({group}) is skipped: {error}')
+
+	_entry_points_loaded[plugin_module] = True
+
+def get_plugin(plugin_name, plugin_module = True):
+	'''Resolving plugin or analysis module class by name.
+
+	Parameters
+	----------
+	plugin_name : str
+		Name of plugin or analysis module.
+	plugin_module : bool, optional
+		Flag to differentiate between plugins and analysis modules. If `True`,
+		classes are looked up in the `pyH2A.plugins` entry point group and
+		the `pyH2A.Plugins.` directory. If `False`, the `pyH2A.analysis` entry
+		point group and the `pyH2A.Analysis.` directory are used.
+
+	Returns
+	-------
+	plugin_class:
+		Registered class.
+
+	Notes
+	-----
+	Classes are resolved once and cached in the registry. Lookup order is:
+	already registered classes, classes provided via entry points (loaded on first
+	lookup), module `plugin_name` within pyH2A, which is assumed to contain
+	a class with the same name as `plugin_name`.
+	'''
+
+	registry = _registry[plugin_module]
+
+	try:
+		return registry[plugin_name]
+	except KeyError:
+		pass
+
+	if _entry_points_loaded[plugin_module] is False:
+		load_entry_points(plugin_module)
+
+		if plugin_name in registry:
+			return registry[plugin_name]
+
+	if plugin_module is True:
+		prefix = 'pyH2A.Plugins.'
+	else:
+		prefix = 'pyH2A.Analysis.'
+
+	plugin = import_module(prefix + plugin_name)
+
+	return register_plugin(getattr(plugin, plugin_name), name = plugin_name,
+						   plugin_module = plugin_module)
+
+def clear_registry():
+	'''Removing all registered classes, entry points are loaded again on next lookup.'''
+
+	for plugin_module in _registry:
+		_registry[plugin_module].clear()
+		_entry_points_loaded[plugin_module] = False
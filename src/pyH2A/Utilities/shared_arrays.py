@@ -0,0 +1,133 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+MIN_SHARED_BYTES = 65536
+
+_attached = []
+
+class Shared_Array:
+	'''Picklable reference to an array stored in a shared memory block.
+
+	Parameters
+	----------
+	name : str
+		Name of shared memory block.
+	shape : tuple
+		Shape of array.
+	dtype : str
+		Data type of array.
+	'''
+
+	def __init__(self, name, shape, dtype):
+		self.name = name
+		self.shape = shape
+		self.dtype = dtype
+
+	def attach(self):
+		'''Read-only view on the shared array (no copy). The shared memory block
+		stays attached for the lifetime of the process.
+		'''
+
+		block = shared_memory.SharedMemory(name = self.name)
+		_attached.append(block)
+
+		array = np.ndarray(self.shape, dtype = self.dtype, buffer = block.buf)
+		array.setflags(write = False)
+
+		return array
+
+def share_arrays(obj, blocks, min_bytes = MIN_SHARED_BYTES):
+	'''Copying large arrays in nested dictionaries/lists into shared memory.
+
+	Parameters
+	----------
+	obj : dict, list, tuple, ndarray or other
+		Object which is searched for arrays.
+	blocks : list
+		List to which created shared memory blocks are appended.
+	min_bytes : int, optional
+		Arrays smaller than `min_bytes` are not moved to shared memory.
+
+	Returns
+	-------
+	shared_obj : dict, list, tuple, Shared_Array or other
+		Copy of nested containers in `obj` in which large arrays are replaced by
+		:class:`Shared_Array` references. Other objects are returned as is.
+	'''
+
+	if isinstance(obj, dict):
+		return {key: share_arrays(value, blocks, min_bytes) for key, value in obj.items()}
+
+	elif isinstance(obj, (list, tuple)):
+		return type(obj)(share_arrays(value, blocks, min_bytes) for value in obj)
+
+	elif isinstance(obj, np.ndarray) and obj.nbytes >= min_bytes and obj.dtype != object:
+		block = shared_memory.SharedMemory(create = True, size = obj.nbytes)
+		blocks.append(block)
+
+		shared = np.ndarray(obj.shape, dtype = obj.dtype, buffer = block.buf)
+		shared[...] = obj
+
+		return Shared_Array(block.name, obj.shape, obj.dtype.str)
+
+	else:
+		return obj
+
+def attach_arrays(obj):
+	'''Replacing :class:`Shared_Array` references in nested dictionaries/lists by
+	read-only views on the shared memory blocks.
+	'''
+
+	if isinstance(obj, dict):
+		return {key: attach_arrays(value) for key, value in obj.items()}
+
+	elif isinstance(obj, (list, tuple)):
+		return type(obj)(attach_arrays(value) for value in obj)
+
+	elif isinstance(obj, Shared_Array):
+		return obj.attach()
+
+	else:
+		return obj
+
+class Shared_Arrays:
+	'''Context manager placing large arrays of `obj` in shared memory.
+
+	Parameters
+	----------
+	obj : dict
+		Object (e.g. input dictionary) containing arrays.
+	min_bytes : int, optional
+		Arrays smaller than `min_bytes` are not moved to shared memory.
+
+	Notes
+	-----
+	On entering, a copy of `obj` is returned in which all large arrays are replaced by
+	:class:`Shared_Array` references. This object is small to pickle and can be passed to
+	worker processes, which use :func:`attach_arrays` to obtain zero-copy, read-only views.
+	The shared memory blocks are released when the context is exited.
+	'''
+
+	def __init__(self, obj, min_bytes = MIN_SHARED_BYTES):
+		self.obj = obj
+		self.min_bytes = min_bytes
+		self.blocks = []
+
+	def __enter__(self):
+		try:
+			return share_arrays(self.obj, self.blocks, self.min_bytes)
+		except BaseException:
+			self.release()
+			raise
+
+	def __exit__(self, *args):
+		self.release()
+
+	def release(self):
+		'''Closing and removing all shared memory blocks.'''
+
+		for block in self.blocks:
+			block.close()
+			block.unlink()
+
+		self.blocks = []
@@ -1,5 +1,7 @@
 import click
-from pyH2A.run_pyH2A import command_line_pyH2A
+import sys
+from pyH2A.run_pyH2A import command_line_pyH2A, run_batch
+from pyH2A.serve_pyH2A import serve_pyH2A
 from pyH2A.Utilities.plugin_input_output_processing import Generate_Template_Input_File
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
@@ -13,10 +15,12 @@ def cli():
 @cli.command()
 @click.option('-i', '--input_file', type=str, help='Path to input file.', required = True)
 @click.option('-o', '--output_dir', type=str, help='Path to output directory.', required = True)
-def run(input_file, output_dir):
+@click.option('-r', '--render', type=click.Choice(['inline', 'deferred', 'none']), default = 'inline', 
+			  help='Figure rendering: immediately (inline), in worker processes after the run (deferred) or not at all (none).')
+def run(input_file, output_dir, render):
 	'''Run pyH2A analysis.
 	'''
-	output = command_line_pyH2A(input_file, output_dir)
+	output = command_line_pyH2A(input_file, output_dir, render = render)
 
 @cli.command()
 @click.option('-i', '--input_file', type=str, help='Path to input file.', required = True)
@@ -28,6 +32,30 @@ def generate(input_file, output_file, origin, comments):
 	'''
 	Generate_Template_Input_File(input_file, output_file, origin = origin, comment = comments)
 
+@cli.command()
+@click.option('-i', '--input', 'sources', type=str, multiple = True, required = True,
+			  help='Glob pattern, input file or manifest file (one input file per line). Can be used multiple times.')
+@click.option('-o', '--output_dir', type=str, help='Path to output directory.', required = True)
+@click.option('-t', '--table', type=str, default = None, help='Path to results table (default: Batch_Results.csv in output directory).')
+@click.option('-p', '--processes', type=int, default = None, help='Number of worker processes (default: number of CPUs).')
+@click.option('-r', '--render', type=click.Choice(['inline', 'deferred', 'none']), default = 'deferred', 
+			  help='Figure rendering in worker processes.')
+def batch(sources, output_dir, table, processes, render):
+	'''Run pyH2A analysis for multiple input files.
+	'''
+	results = run_batch(sources, output_dir, results_file = table, processes = processes, render = render)
 
+	if any(result['Error'] is not None for result in results):
+		sys.exit(1)
 
+@cli.command()
+@click.option('-i', '--input_file', 'input_files', type=str, multiple = True, required = True,
+			  help='Path to input file which is served. Can be used multiple times.')
+@click.option('--host', type=str, default = '127.0.0.1', help='Host address.')
+@click.option('--port', type=int, default = 8765, help='Port.')
+@click.option('-w', '--workers', type=int, default = None, help='Number of worker processes (default: number of CPUs, 0: evaluate in server process).')
+def serve(input_files, host, port, workers):
+	'''Serve pyH2A models via HTTP/JSON.
+	'''
+	serve_pyH2A(input_files, host = host, port = port, workers = workers)
 
@@ -1,8 +1,15 @@
 import sys
 import ast
 import os
+import csv
+import glob
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import matplotlib.pyplot as plt
 from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
 from pyH2A.Utilities.input_modification import convert_input_to_dictionary, execute_plugin, convert_dict_to_kwargs_dict, check_for_meta_module
+from pyH2A.Utilities.output_utilities import set_rendering_mode, render_deferred_figures
 
 from timeit import default_timer as timer
 
@@ -19,6 +26,14 @@ class pyH2A:
 		Path to output file.
 	print_info : bool, optional
 		Flag to control if detailed information during run of pyH2A is printed.
+	render : str, optional
+		Rendering mode for figures generated by analysis methods: 'inline' 
+		(figures are shown/saved immediately), 'deferred' (figures are saved
+		by a pool of worker processes after all analysis modules have been 
+		executed) or 'none' (no figures are shown or saved).
+	render_processes : int or None, optional
+		Number of worker processes used in 'deferred' rendering mode. If None,
+		all available CPUs are used.
 
 	Returns
 	-------
@@ -37,7 +52,8 @@ class pyH2A:
 		Dictionary containing class instances of executes analysis modules.
 	'''
 
-	def __init__(self, input_file, output_directory, print_info = False):
+	def __init__(self, input_file, output_directory, print_info = False, render = 'inline',
+				 render_processes = None):
 
 		self.input_file = input_file
 		self.file_name = os.path.basename(input_file).split('.')[0]
@@ -45,8 +61,16 @@ class pyH2A:
 		self.inp = convert_input_to_dictionary(self.input_file)
 		self.base_case = Discounted_Cash_Flow(self.input_file, print_info = print_info)
 
-		self.meta_modules = {}
-		self.meta_workflow(self.meta_modules)
+		previous_mode = set_rendering_mode(render)
+
+		try:
+			self.meta_modules = {}
+			self.meta_workflow(self.meta_modules)
+
+			if render == 'deferred':
+				self.figure_paths = render_deferred_figures(processes = render_processes)
+		finally:
+			set_rendering_mode(previous_mode)
 
 		print(f'Levelized cost of hydrogen (base case): {self.base_case.h2_cost} $/kg')
 
@@ -131,11 +155,217 @@ def run_pyH2A():
 
 	return output
 
-def command_line_pyH2A(input_file, output_dir):
+def command_line_pyH2A(input_file, output_dir, render = 'inline'):
 	'''Wrapper function to run pyH2A using click.
 	'''
 
-	output = pyH2A(input_file, output_dir)
+	output = pyH2A(input_file, output_dir, render = render)
 
 	return output
 
+def collect_input_files(sources):
+	'''Collecting input files for batch runs.
+
+	Parameters
+	----------
+	sources : list of str
+		Glob patterns (e.g. `inputs/*.md`), paths to input files or paths to
+		manifest files. A manifest is a text file which does not end with `.md`
+		and contains one input file path per line (empty lines and lines 
+		starting with `#` are ignored). Relative paths in manifests are relative 
+		to the location of the manifest.
+
+	Returns
+	-------
+	input_files : list
+		Paths to input files, duplicates are removed. Explicitly named input files
+		(sources without glob characters and manifest entries) are kept even if 
+		they do not exist, so that they are reported as failed runs.
+	'''
+
+	input_files = []
+
+	for source in sources:
+		path = Path(source)
+
+		if path.is_file() and path.suffix != '.md':
+			for line in path.read_text().splitlines():
+				line = line.strip()
+				if line and line[0] != '#':
+					input_files.append(str(path.parent / line))
+
+		elif path.is_file() or not any(character in source for character in '*?['):
+			input_files.append(source)
+
+		else:
+			input_files.extend(sorted(glob.glob(source, recursive = True)))
+
+	return list(dict.fromkeys(input_files))
+
+def warm_caches(input_file):
+	'''Running discounted cash flow analysis for `input_file`, so that plugins
+	are imported and lookup tables/irradiation data are stored in the caches of 
+	the current process. Errors are ignored.
+	'''
+
+	try:
+		Discounted_Cash_Flow(input_file, print_info = False)
+	except Exception:
+		pass
+
+def initialize_batch_worker(render, warm_file):
+	'''Initialization of batch worker processes. Workers use the non-interactive
+	Agg backend for all rendering modes. Caches are only warmed if the worker does
+	not inherit them from the parent process (start method other than 'fork').
+	'''
+
+	plt.switch_backend('Agg')
+	set_rendering_mode(render)
+
+	if warm_file is not None and multiprocessing.get_start_method() != 'fork':
+		warm_caches(warm_file)
+
+def run_batch_entry(input_file, output_directory, render = 'deferred'):
+	'''Running pyH2A for a single input file of a batch run.
+
+	Returns
+	-------
+	result : dict
+		Dictionary with `File`, `LCOH ($/kg)`, `Contributions` (H2 cost contributions
+		of base case), `Runtime (s)` and `Error` (None if run was successful).
+	'''
+
+	start = timer()
+	result = {'File': input_file, 'LCOH ($/kg)': None, 'Contributions': {}, 'Error': None}
+
+	try:
+		output = pyH2A(input_file, output_directory, render = render, render_processes = 1)
+		result['LCOH ($/kg)'] = output.base_case.h2_cost
+		result['Contributions'] = output.base_case.contributions['Data']
+	except Exception as error:
+		result['Error'] = f'{type(error).__name__}: {error}'
+
+	result['Runtime (s)'] = timer() - start
+
+	return result
+
+def batch_output_directories(input_files, output_directory):
+	'''Output directory for each input file of a batch run.
+
+	Returns
+	-------
+	directories : list
+		Paths of subdirectories of `output_directory`, named after the input files.
+		If input files in different directories have the same name, a counter is
+		appended (e.g. `Base`, `Base_2`), skipping names which are already used by
+		other input files.
+	'''
+
+	names = [os.path.basename(input_file).split('.')[0] for input_file in input_files]
+	used = set()
+	directories = []
+
+	for name in names:
+		unique_name, counter = name, 1
+
+		while unique_name in used or (unique_name != name and unique_name in names):
+			counter += 1
+			unique_name = f'{name}_{counter}'
+
+		used.add(unique_name)
+		directories.append(str(Path(output_directory, unique_name)))
+
+	return directories
+
+def write_batch_results(results, results_file):
+	'''Writing results of batch run to tab separated `results_file`, with
+	one row per input file and one column per cost contribution.
+	'''
+
+	contribution_names = []
+	for result in results:
+		for name in result['Contributions']:
+			if name not in contribution_names:
+				contribution_names.append(name)
+
+	with open(results_file, 'w', newline = '') as file_write:
+		writer = csv.writer(file_write, delimiter = '	')
+		writer.writerow(['File', 'Status', 'LCOH ($/kg)'] + contribution_names + ['Runtime (s)', 'Error'])
+
+		for result in results:
+			status = 'Failed' if result['Error'] is not None else 'OK'
+			contributions = [result['Contributions'].get(name, '') for name in contribution_names]
+			lcoh = '' if result['LCOH ($/kg)'] is None else result['LCOH ($/kg)']
+
+			writer.writerow([result['File'], status, lcoh] + contributions + 
+							[f"{result['Runtime (s)']:.3f}", result['Error'] or ''])
+
+def run_batch(sources, output_directory, results_file = None, processes = None, render = 'deferred'):
+	'''Running pyH2A for multiple input files in a process pool.
+
+	Parameters
+	----------
+	sources : list of str
+		Glob patterns, input files or manifest files, see :func:`collect_input_files`.
+	output_directory : str
+		Path to output directory. Figures of each run are saved in a subdirectory
+		named after the input file (see :func:`batch_output_directories`).
+	results_file : str or None, optional
+		Path to results table. Defaults to `Batch_Results.csv` in `output_directory`.
+	processes : int or None, optional
+		Number of worker processes. If None, all available CPUs are used.
+	render : str, optional
+		Rendering mode in worker processes ('deferred', 'inline' or 'none'). Workers
+		use the non-interactive Agg backend, so figures are only saved, not shown.
+
+	Returns
+	-------
+	results : list
+		Results of each run (see :func:`run_batch_entry`), in the order of input files.
+
+	Notes
+	-----
+	Before the pool is started, one input file is evaluated in the calling process
+	to warm caches (imports, lookup tables, irradiation data), which forked worker 
+	processes inherit. Failed runs do not stop the batch, they are listed in the 
+	results table and reported at the end.
+	'''
+
+	input_files = collect_input_files(sources)
+
+	if len(input_files) == 0:
+		raise FileNotFoundError(f'No input files found for {sources}.')
+
+	if results_file is None:
+		results_file = str(Path(output_directory, 'Batch_Results.csv'))
+
+	if processes is None:
+		processes = os.cpu_count() or 1
+
+	processes = min(processes, len(input_files))
+
+	output_directories = batch_output_directories(input_files, output_directory)
+
+	for directory in output_directories:
+		Path(directory).mkdir(parents = True, exist_ok = True)
+
+	warm_caches(input_files[0])
+
+	with ProcessPoolExecutor(max_workers = processes, initializer = initialize_batch_worker,
+							 initargs = (render, input_files[0])) as executor:
+		results = list(executor.map(run_batch_entry, input_files, output_directories,
+									[render] * len(input_files)))
+
+	write_batch_results(results, results_file)
+
+	failed = [result for result in results if result['Error'] is not None]
+
+	print(f'Batch run: {len(results) - len(failed)} of {len(results)} input files processed, results saved in {results_file}')
+
+	if len(failed) > 0:
+		print(f'{len(failed)} input file(s) failed:')
+		for result in failed:
+			print(f"	{result['File']}: {result['Error']}")
+
+	return results
+
@@ -0,0 +1,251 @@
+import copy
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from timeit import default_timer as timer
+import numpy as np
+from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, parse_parameter, get_by_path, set_by_path
+
+_models = {}
+
+def model_names(input_files):
+	'''Names under which input files are served (file name without suffix).'''
+
+	names = {}
+
+	for input_file in input_files:
+		name = Path(input_file).stem
+		if name in names:
+			raise ValueError(f'Input files {names[name]} and {input_file} have the same name.')
+		names[name] = input_file
+
+	return names
+
+def load_models(models):
+	'''Parsing input files and running one discounted cash flow analysis per model,
+	so that plugins, lookup tables and irradiation data are cached in the
+	current process.
+
+	Parameters
+	----------
+	models : dict
+		Dictionary with model names as keys and paths to input files as values.
+	'''
+
+	for name, input_file in models.items():
+		_models[name] = convert_input_to_dictionary(input_file)
+		Discounted_Cash_Flow(copy.deepcopy(_models[name]), print_info = False)
+
+def to_json_compatible(value):
+	'''Converting numpy arrays/scalars and nested dictionaries to JSON compatible types.'''
+
+	if isinstance(value, dict):
+		return {str(key): to_json_compatible(item) for key, item in value.items()}
+	elif isinstance(value, (list, tuple)):
+		return [to_json_compatible(item) for item in value]
+	elif isinstance(value, np.ndarray):
+		return value.tolist()
+	elif isinstance(value, np.generic):
+		return value.item()
+	else:
+		return value
+
+def evaluate_request(request):
+	'''Evaluation of a single request with a model loaded by :func:`load_models`.
+
+	Parameters
+	----------
+	request : dict
+		`model` : name of model (optional if only one model is loaded).
+		`overrides` : dictionary with parameter paths (top key > middle key > bottom key)
+		as keys and new values as values.
+		`factors` : dictionary with parameter paths as keys and factors by which the
+		values in the input are multiplied.
+		`outputs` : list of paths which are returned after the discounted cash flow
+		analysis (e.g. values inserted by plugins).
+		`contributions` : if True (default), H2 cost contributions are returned.
+
+	Returns
+	-------
+	response : dict
+		Dictionary with `model`, `h2_cost`, `contributions`, `outputs` and
+		`runtime_ms`.
+	'''
+
+	start = timer()
+
+	if 'model' in request:
+		name = request['model']
+	elif len(_models) == 1:
+		name = next(iter(_models))
+	else:
+		raise KeyError(f'Model has to be specified, available models: {list(_models)}.')
+
+	if name not in _models:
+		raise KeyError(f'Model {name} is not loaded, available models: {list(_models)}.')
+
+	input_dict = copy.deepcopy(_models[name])
+
+	for path, value in request.get('overrides', {}).items():
+		set_by_path(input_dict, parse_parameter(path), value)
+
+	for path, value in request.get('factors', {}).items():
+		set_by_path(input_dict, parse_parameter(path), value, value_type = 'factor')
+
+	dcf = Discounted_Cash_Flow(input_dict, print_info = False)
+
+	response = {'model': name, 'h2_cost': dcf.h2_cost}
+
+	if request.get('contributions', True) is True:
+		response['contributions'] = dcf.contributions['Data']
+
+	response['outputs'] = {path: get_by_path(dcf.inp, parse_parameter(path))
+						   for path in request.get('outputs', [])}
+	response['runtime_ms'] = (timer() - start) * 1000.
+
+	return to_json_compatible(response)
+
+class pyH2A_Request_Handler(BaseHTTPRequestHandler):
+	'''Handler for JSON requests.
+
+	Notes
+	-----
+	`POST /evaluate` with a JSON body (see :func:`evaluate_request`) returns the
+	results as JSON. `GET /models` lists the loaded models. Errors in requests
+	are returned with status 400, requests exceeding the number of pending
+	requests of the server with status 503.
+	'''
+
+	def send_json(self, status, data):
+		body = json.dumps(data).encode('utf-8')
+
+		self.send_response(status)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_GET(self):
+		if self.path == '/models':
+			self.send_json(200, {'models': list(self.server.models)})
+		else:
+			self.send_json(404, {'error': f'Unknown path {self.path}.'})
+
+	def do_POST(self):
+		if self.path != '/evaluate':
+			self.send_json(404, {'error': f'Unknown path {self.path}.'})
+			return
+
+		try:
+			length = int(self.headers.get('Content-Length', 0))
+			request = json.loads(self.rfile.read(length) or b'{}')
+		except ValueError as error:
+			self.send_json(400, {'error': f'Invalid JSON: {error}'})
+			return
+
+		if not self.server.pending.acquire(blocking = False):
+			self.send_json(503, {'error': 'Too many pending requests.'})
+			return
+
+		try:
+			response = self.server.evaluate(request)
+		except Exception as error:
+			self.send_json(400, {'error': f'{type(error).__name__}: {error}'})
+		else:
+			self.send_json(200, response)
+		finally:
+			self.server.pending.release()
+
+	def log_message(self, format, *args):
+		if self.server.verbose:
+			super().log_message(format, *args)
+
+class pyH2A_Server(ThreadingHTTPServer):
+	'''HTTP server evaluating pyH2A models with warm caches.
+
+	Parameters
+	----------
+	input_files : list of str
+		Input files which are served, models are named by file name without suffix.
+	host : str, optional
+		Host address, defaults to localhost.
+	port : int, optional
+		Port, 0 selects a free port.
+	workers : int or None, optional
+		Number of worker processes evaluating requests. If None, all available CPUs
+		are used. If 0, requests are evaluated in the request handling threads.
+	max_pending : int or None, optional
+		Maximum number of requests which are evaluated or waiting for evaluation.
+		Defaults to four times the number of workers.
+	verbose : bool, optional
+		Flag to control if requests are logged.
+
+	Notes
+	-----
+	Input files are parsed once, and one discounted cash flow analysis per model is
+	performed during start up, in the server process and in each worker process,
+	so that imported plugins, lookup tables and irradiation data stay cached for
+	all subsequent requests. Requests are accepted concurrently by threads and
+	evaluated by the bounded pool of worker processes.
+	'''
+
+	daemon_threads = True
+
+	def __init__(self, input_files, host = '127.0.0.1', port = 8765, workers = None,
+				 max_pending = None, verbose = False):
+
+		self.models = model_names(input_files)
+		self.verbose = verbose
+
+		if workers is None:
+			workers = os.cpu_count() or 1
+
+		if max_pending is None:
+			max_pending = 4 * max(workers, 1)
+
+		self.pending = threading.BoundedSemaphore(max_pending)
+
+		load_models(self.models)
+
+		if workers > 0:
+			self.executor = ProcessPoolExecutor(max_workers = workers, initializer = load_models,
+												initargs = (self.models,))
+		else:
+			self.executor = None
+
+		super().__init__((host, port), pyH2A_Request_Handler)
+
+	def evaluate(self, request):
+		'''Evaluating request in worker pool (or in the calling thread if no
+		workers are used).'''
+
+		if self.executor is None:
+			return evaluate_request(request)
+		else:
+			return self.executor.submit(evaluate_request, request).result()
+
+	def server_close(self):
+		super().server_close()
+
+		if self.executor is not None:
+			self.executor.shutdown()
+
+def serve_pyH2A(input_files, host = '127.0.0.1', port = 8765, workers = None, verbose = True):
+	'''Starting :class:`pyH2A_Server` and serving until interrupted.
+	'''
+
+	server = pyH2A_Server(input_files, host = host, port = port, workers = workers,
+						  verbose = verbose)
+
+	print(f'Serving {list(server.models)} on http://{host}:{server.server_address[1]} (POST /evaluate)')
+
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
@@ -0,0 +1,112 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Analysis.Elasticity_Analysis import (
+    Elasticity_Analysis,
+    elasticities,
+    numeric_leaves,
+    perturbation_matrix,
+)
+from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+PV_CAPEX = "Direct Capital Costs - PV > PV CAPEX ($/kW) > Value"
+RO_CAPEX = (
+    "Direct Capital Costs - Reverse Osmosis > "
+    "Reverse Osmosis CAPEX ($ per m3/h capacity) > Value"
+)
+
+
+def test_numeric_leaves():
+    """Non-zero floats and integers are included, discrete rows, strings and
+    excluded tables are not."""
+
+    inp = {
+        "Workflow": {"Plugin": {"Position": 1}},
+        "Parameters - Monte_Carlo_Analysis": {"A": {"Values": 1.0}},
+        "Financial Input Values": {
+            "plant life": {"Value": 20},
+            "startup year": {"Value": 2020},
+            "irr": {"Value": 0.08},
+        },
+        "Fixed Operating Costs": {"shifts": {"Value": 3}, "area": {"Value": 405000}},
+        "Table": {
+            "Row": {"Value": 2.5, "Cost": 30, "Flag": True, "Zero": 0.0},
+            "Text": {"Value": "1; 2"},
+        },
+        "Other": {"Row": {"Value": 3.0}},
+    }
+
+    paths, values = numeric_leaves(inp, excluded_tables=("Other",))
+
+    assert paths == [
+        ["Financial Input Values", "irr", "Value"],
+        ["Fixed Operating Costs", "area", "Value"],
+        ["Table", "Row", "Value"],
+        ["Table", "Row", "Cost"],
+    ]
+    np.testing.assert_array_equal(values, [0.08, 405000, 2.5, 30])
+
+    paths, _ = numeric_leaves(inp, excluded_tables=("Other",), discrete_rows={})
+    assert ["Fixed Operating Costs", "shifts", "Value"] in paths
+    assert ["Workflow", "Plugin", "Position"] not in paths
+
+
+@pytest.mark.parametrize("scheme", ["forward", "central"])
+def test_power_law_elasticities(scheme):
+    """Elasticities of a product of powers are its exponents."""
+
+    exponents = np.array([1.0, -2.0, 0.5])
+    values = np.array([2.0, 3.0, 4.0])
+    model = lambda matrix: np.prod(matrix**exponents, axis=1)
+
+    matrix = perturbation_matrix(values, step=1e-4, scheme=scheme)
+    result = elasticities(model(values[None])[0], model(matrix), 1e-4, scheme)
+
+    np.testing.assert_allclose(result, exponents, rtol=1e-3)
+
+
+def test_elasticity_analysis(tmp_path):
+    """Elasticities match separate finite difference runs and are written to file."""
+
+    output_file = tmp_path / "elasticities.txt"
+    tables = f"""
+# Elasticity_Analysis
+
+Name | Value
+--- | ---
+Step | 0.02
+Processes | 2
+Exclude | Financial Input Values
+Output File | {output_file}
+"""
+    input_file = tmp_path / "elasticity.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    analysis = Elasticity_Analysis(str(input_file))
+
+    assert len(analysis.results) == len(analysis.paths)
+    assert not any(path[0] == "Financial Input Values" for path in analysis.paths)
+
+    base = Discounted_Cash_Flow(str(input_file), print_info=False).h2_cost
+    np.testing.assert_allclose(analysis.h2_cost, base)
+
+    input_text = input_file.read_text().replace(
+        "PV CAPEX ($/kW) | 818.0", f"PV CAPEX ($/kW) | {818.0 * 1.02!r}"
+    )
+    input_file.write_text(input_text)
+    perturbed = Discounted_Cash_Flow(str(input_file), print_info=False).h2_cost
+
+    table = analysis.results_table()
+    np.testing.assert_allclose(
+        table[PV_CAPEX]["Elasticity"], (perturbed - base) / (base * 0.02)
+    )
+    assert list(table) == list(analysis.results_table(len(table)))
+
+    assert table[RO_CAPEX]["Value"] == 6000
+    assert table[RO_CAPEX]["Elasticity"] > 0
+    assert "Fixed Operating Costs > shifts > Value" not in table
+
+    lines = output_file.read_text().splitlines()
+    assert len(lines) == len(analysis.paths) + 1
+    assert lines[1].split("\t")[0] == list(table)[0]
@@ -0,0 +1,413 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+from scipy.spatial import distance as scipy_distance
+from pyH2A.Analysis.Monte_Carlo_Analysis import (
+    Distance_Tree,
+    Monte_Carlo_Analysis,
+    adaptive_importance_sampling,
+    calculate_distance,
+    hash_input,
+    nearest_indices,
+    read_header_entry,
+    read_input_hash,
+    uniform_samples,
+    weighted_savgol_filter,
+)
+from pyH2A.Analysis.Comparative_MC_Analysis import Comparative_MC_Analysis
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+
+
+def write_monte_carlo_input(
+    directory, name, samples=130, settings="", target_price_range="1; 10"
+):
+    """Writing PV_E_Base input file extended by Monte Carlo tables."""
+
+    output_file = directory / f"{name}_Monte_Carlo.csv"
+    tables = f"""
+# Monte_Carlo_Analysis
+
+Name | Value
+--- | ---
+Samples | {samples}
+Target Price Range ($) | {target_price_range}
+Output File | {output_file}
+{settings}
+# Parameters - Monte_Carlo_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | Base; 200
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Efficiency | value | Base; 0.025
+"""
+    input_file = directory / f"{name}.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    return str(input_file), output_file
+
+
+def test_results_are_reused_when_input_hash_matches(tmp_path):
+    """Stored results are read if they were generated with identical input."""
+
+    input_file, output_file = write_monte_carlo_input(tmp_path, "model")
+
+    first = Monte_Carlo_Analysis(input_file)
+    assert read_input_hash(output_file) == first.input_hash
+
+    second = Monte_Carlo_Analysis(input_file)
+    np.testing.assert_allclose(second.results, first.results)
+    np.testing.assert_allclose(second.results_distances, first.results_distances)
+
+    input_file, _ = write_monte_carlo_input(tmp_path, "model", samples=131)
+    third = Monte_Carlo_Analysis(input_file)
+    assert third.input_hash != first.input_hash
+    assert len(third.results) == 131
+
+
+def test_hash_ignores_output_settings(tmp_path):
+    """Output file and methods tables do not change the input hash."""
+
+    input_file, _ = write_monte_carlo_input(tmp_path, "model")
+    inp = convert_input_to_dictionary(input_file)
+    reference = hash_input(inp)
+
+    inp["Monte_Carlo_Analysis"]["Output File"]["Value"] = "other.csv"
+    inp["Methods - Monte_Carlo_Analysis"] = {"plot": {"Method Name": "plot"}}
+    assert hash_input(inp) == reference
+
+    inp["Monte_Carlo_Analysis"]["Samples"]["Value"] = 100
+    assert hash_input(inp) != reference
+
+
+def test_hash_includes_importance_settings(tmp_path):
+    """Target price range and importance settings change the hash only for
+    importance sampling."""
+
+    input_file, _ = write_monte_carlo_input(tmp_path, "model")
+    inp = convert_input_to_dictionary(input_file)
+    reference = hash_input(inp)
+
+    inp["Monte_Carlo_Analysis"]["Target Price Range ($)"]["Value"] = "2; 3"
+    inp["Monte_Carlo_Analysis"]["Elite Fraction"] = {"Value": 0.2}
+    assert hash_input(inp) == reference
+
+    inp["Monte_Carlo_Analysis"]["Sampling"] = {"Value": "importance"}
+    importance = hash_input(inp)
+
+    for key, value in [
+        ("Target Price Range ($)", "2; 4"),
+        ("Elite Fraction", 0.3),
+        ("Importance Batches", 3),
+    ]:
+        inp["Monte_Carlo_Analysis"][key] = {"Value": value}
+        assert hash_input(inp) != importance
+        importance = hash_input(inp)
+
+
+def test_seeded_runs_are_reproducible(tmp_path):
+    """Serial and parallel runs with the same seed produce identical results."""
+
+    serial_file, _ = write_monte_carlo_input(
+        tmp_path, "serial", settings="Seed | 7\n"
+    )
+    parallel_file, _ = write_monte_carlo_input(
+        tmp_path, "parallel", settings="Seed | 7\nProcesses | 2\n"
+    )
+    other_file, _ = write_monte_carlo_input(tmp_path, "other", settings="Seed | 8\n")
+
+    serial = Monte_Carlo_Analysis(serial_file)
+    parallel = Monte_Carlo_Analysis(parallel_file)
+    other = Monte_Carlo_Analysis(other_file)
+
+    np.testing.assert_array_equal(parallel.results, serial.results)
+    assert serial.seed == 7
+    assert not np.array_equal(other.results[:, :-1], serial.results[:, :-1])
+
+
+def test_random_seed_is_stored(tmp_path, capsys):
+    """A randomly drawn seed is printed, stored with the results and reproduces
+    them."""
+
+    input_file, output_file = write_monte_carlo_input(tmp_path, "random")
+    analysis = Monte_Carlo_Analysis(input_file)
+
+    assert f"Monte Carlo seed: {analysis.seed}" in capsys.readouterr().out
+    assert read_header_entry(output_file, "Seed") == str(analysis.seed)
+    assert Monte_Carlo_Analysis(input_file).seed == analysis.seed
+    assert (
+        Monte_Carlo_Analysis(input_file, state=analysis.export_state()).seed
+        == analysis.seed
+    )
+
+    seeded_file, _ = write_monte_carlo_input(
+        tmp_path, "seeded", settings=f"Seed | {analysis.seed}\n"
+    )
+    np.testing.assert_allclose(
+        Monte_Carlo_Analysis(seeded_file).results, analysis.results
+    )
+
+
+def test_uniform_samples_chunks():
+    """Samples do not depend on the total number of samples (prefix property),
+    chunk streams are independent and values are within limits."""
+
+    lower, upper = np.array([0.0, 10.0]), np.array([1.0, 20.0])
+
+    full = uniform_samples(lower, upper, 1000, 123, chunk_size=64)
+    partial = uniform_samples(lower, upper, 300, 123, chunk_size=64)
+
+    np.testing.assert_array_equal(full[:300], partial)
+    assert np.all((full >= lower) & (full < upper))
+    assert not np.array_equal(full[:64], full[64:128])
+    np.testing.assert_array_equal(
+        full[64:128],
+        np.random.default_rng(np.random.SeedSequence(123).spawn(2)[1]).uniform(
+            lower, upper, (64, 2)
+        ),
+    )
+
+
+def test_adaptive_importance_sampling():
+    """Samples concentrate in the target region and weighted estimates are unbiased."""
+
+    values, results, weights = adaptive_importance_sampling(
+        lambda values: values.sum(axis=1),
+        lambda results: np.maximum(1.8 - results, 0),
+        samples=5000,
+        number_of_parameters=2,
+        entropy=0,
+    )
+
+    inside = results >= 1.8
+    assert np.all((values >= 0) & (values <= 1))
+    assert np.mean(inside) > 0.15
+    # Probability of x + y >= 1.8 and centroid of the corresponding triangle.
+    np.testing.assert_allclose(np.sum(weights[inside]) / len(weights), 0.02, rtol=0.1)
+    np.testing.assert_allclose(
+        np.average(values[inside, 0], weights=weights[inside]), 2.8 / 3, atol=0.01
+    )
+
+
+def test_importance_sampling_analysis(tmp_path):
+    """Importance sampling yields more samples within the target price range than
+    uniform sampling, weights are stored and read with the results."""
+
+    settings = "Seed | 3\nImportance Batches | 4\n"
+    uniform_file, _ = write_monte_carlo_input(
+        tmp_path, "uniform", 200, settings, target_price_range="2.9; 3.3"
+    )
+    importance_file, _ = write_monte_carlo_input(
+        tmp_path,
+        "importance",
+        200,
+        settings + "Sampling | importance\n",
+        target_price_range="2.9; 3.3",
+    )
+
+    uniform = Monte_Carlo_Analysis(uniform_file)
+    importance = Monte_Carlo_Analysis(importance_file)
+
+    assert uniform.weights is None
+    assert len(importance.target_price_data) > 3 * len(uniform.target_price_data)
+    assert len(importance.target_price_weights) == len(importance.target_price_data)
+    np.testing.assert_allclose(np.mean(importance.weights), 1)
+
+    reread = Monte_Carlo_Analysis(importance_file)
+    np.testing.assert_allclose(reread.results, importance.results)
+    np.testing.assert_allclose(reread.weights, importance.weights)
+
+
+def test_importance_weighted_distribution(tmp_path):
+    """Weighted histogram and mean of importance samples match uniform sampling."""
+
+    settings = "Seed | 3\nImportance Batches | 4\nProcesses | 2\n"
+    uniform_file, _ = write_monte_carlo_input(
+        tmp_path, "uniform", 300, settings, target_price_range="2.9; 3.3"
+    )
+    importance_file, _ = write_monte_carlo_input(
+        tmp_path,
+        "importance",
+        300,
+        settings + "Sampling | importance\n",
+        target_price_range="2.9; 3.3",
+    )
+
+    uniform = Monte_Carlo_Analysis(uniform_file)
+    importance = Monte_Carlo_Analysis(importance_file)
+
+    uniform_cost = uniform.results[:, -1]
+    importance_cost = importance.results[:, -1]
+    bins = np.linspace(uniform_cost.min(), uniform_cost.max(), 6)
+
+    figure = importance.plot_complete_histogram(
+        bins=bins, directory=tmp_path, input_file_name="importance"
+    )
+    heights = np.array([patch.get_height() for patch in figure.axes[0].patches])
+
+    expected, _ = np.histogram(uniform_cost, bins, density=True)
+    weighted, _ = np.histogram(
+        importance_cost, bins, density=True, weights=importance.weights
+    )
+    np.testing.assert_allclose(heights, weighted)
+    np.testing.assert_allclose(
+        weighted * np.diff(bins), expected * np.diff(bins), atol=0.06
+    )
+
+    mean = np.average(importance_cost, weights=importance.weights)
+    assert mean == pytest.approx(np.mean(uniform_cost), rel=0.05)
+    assert np.mean(importance_cost) < 0.8 * np.mean(uniform_cost)
+
+
+@pytest.mark.parametrize("window_length, poly_order", [(5, 4), (11, 2), (51, 4)])
+def test_weighted_savgol_filter(window_length, poly_order):
+    """Equal weights reproduce scipy's filter, weights shift the local fits."""
+
+    values = np.cumsum(np.random.default_rng(1).normal(size=500))
+
+    np.testing.assert_allclose(
+        weighted_savgol_filter(values, np.full(500, 3.0), window_length, poly_order),
+        savgol_filter(values, window_length, poly_order),
+        atol=1e-8,
+    )
+
+    weights = np.ones(500)
+    weights[250] = 1e9
+    smoothed = weighted_savgol_filter(values, weights, window_length, poly_order)
+    assert smoothed[250] == pytest.approx(values[250])
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_comparative_models(tmp_path, processes):
+    """Models evaluated in worker processes match sequential evaluation."""
+
+    files = [write_monte_carlo_input(tmp_path, name)[0] for name in ("a", "b")]
+    comparative_file = tmp_path / "comparative.md"
+    comparative_file.write_text(
+        "# Comparative_MC_Analysis\n\nName | Value\n--- | ---\n"
+        f"a | {files[0]}\nb | {files[1]}\n"
+    )
+
+    comparative = Comparative_MC_Analysis(str(comparative_file), processes=processes)
+
+    for name, input_file in zip(("a", "b"), files):
+        model = comparative.models[name]["Model"]
+        reference = Monte_Carlo_Analysis(input_file)
+
+        np.testing.assert_allclose(model.results, reference.results)
+        np.testing.assert_allclose(
+            model.distances_cost_savgol, reference.distances_cost_savgol
+        )
+        assert model.shortest_target_distance == reference.shortest_target_distance
+
+
+PARAMETERS = {
+    "a": {"Index": 0, "Reference": 1.0, "Limit": 3.0},
+    "b": {"Index": 1, "Reference": 10.0, "Limit": 2.0},
+    "c": {"Index": 2, "Reference": 5.0, "Limit": 50.0},
+}
+
+
+def random_data(size=1000, seed=3):
+    rng = np.random.default_rng(seed)
+    return np.c_[
+        rng.uniform(1, 3, size), rng.uniform(2, 10, size), rng.uniform(5, 50, size)
+    ]
+
+
+@pytest.mark.parametrize("metric", ["cityblock", "euclidean", "chebyshev"])
+@pytest.mark.parametrize("log_normalize", [False, True])
+def test_chunked_distance(metric, log_normalize):
+    """Chunked distances match a direct calculation with scipy."""
+
+    data = random_data()
+    selection = list(PARAMETERS)
+    scaled = np.empty_like(data)
+
+    for counter, key in enumerate(selection):
+        base, limit = PARAMETERS[key]["Reference"], PARAMETERS[key]["Limit"]
+        if log_normalize:
+            scaled[:, counter] = np.log10(data[:, counter] / base) / np.log10(
+                limit / base
+            )
+        else:
+            scaled[:, counter] = (data[:, counter] - base) / (limit - base)
+
+    expected = scipy_distance.cdist(scaled, np.zeros((1, 3)), metric=metric)
+    expected /= 3 if metric == "cityblock" else np.sqrt(3)
+
+    distances = calculate_distance(
+        data,
+        PARAMETERS,
+        selection,
+        metric=metric,
+        log_normalize=log_normalize,
+        chunk_size=64,
+    )
+    np.testing.assert_allclose(distances, expected)
+
+    distances_single = calculate_distance(
+        data,
+        PARAMETERS,
+        selection,
+        metric=metric,
+        log_normalize=log_normalize,
+        dtype=np.float32,
+    )
+    assert distances_single.dtype == np.float32
+    np.testing.assert_allclose(distances_single, expected, rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("metric", ["cityblock", "euclidean"])
+def test_distance_tree_queries(metric):
+    """KD-tree and partial sorting queries match a full argsort."""
+
+    data = random_data()
+    selection = list(PARAMETERS)
+    distances = calculate_distance(data, PARAMETERS, selection, metric=metric)
+    order = np.argsort(distances[:, 0])
+
+    np.testing.assert_array_equal(nearest_indices(distances, k=5), order[:5])
+
+    tree = Distance_Tree(data, PARAMETERS, selection, metric=metric)
+    tree_distances, idx = tree.query(k=5)
+    np.testing.assert_array_equal(idx, order[:5])
+    np.testing.assert_allclose(tree_distances, distances[order[:5], 0])
+
+    point = {"a": 2.0, "b": 6.0, "c": 20.0}
+    _, idx = tree.query(k=1, point=point)
+    brute = np.abs(
+        (data - [point[key] for key in selection])
+        / [PARAMETERS[k]["Limit"] - PARAMETERS[k]["Reference"] for k in selection]
+    )
+    if metric == "cityblock":
+        brute = brute.sum(axis=1)
+    else:
+        brute = np.sqrt((brute**2).sum(axis=1))
+    assert idx[0] == np.argmin(brute)
+
+
+def test_adaptive_target_price_region():
+    """Refined region agrees with dense grid evaluation at fewer evaluations."""
+
+    input_file = "pyH2A.Example~211109_Future_PEC_Type_1_Figure_Test.md"
+
+    adaptive = Monte_Carlo_Analysis(input_file)
+    adaptive.target_price_2D_region(grid_points=5, refinement_levels=2)
+    adaptive_region = adaptive.target_price_2D_region
+
+    dense = Monte_Carlo_Analysis(input_file)
+    dense.target_price_2D_region(grid_points=17)
+    dense_region = dense.target_price_2D_region
+
+    np.testing.assert_allclose(
+        adaptive_region["Grid Values"], dense_region["Grid Values"]
+    )
+    assert adaptive_region["Evaluations"] < dense_region["Evaluations"]
+
+    target = max(adaptive.target_price_range)
+    np.testing.assert_array_equal(
+        adaptive_region["H2 Cost 2D"] < target, dense_region["H2 Cost 2D"] < target
+    )
@@ -0,0 +1,102 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Analysis.Morris_Analysis import (
+    Morris_Analysis,
+    elementary_effects,
+    morris_trajectories,
+)
+from pyH2A.Utilities.input_modification import convert_file_to_dictionary
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+
+
+def test_trajectories():
+    """Each step changes one parameter by delta and points stay in the unit cube."""
+
+    points, order, signs, delta = morris_trajectories(20, 4, levels=6, seed=1)
+
+    assert points.shape == (20, 5, 4)
+    assert np.all((points >= 0) & (points <= 1 + 1e-12))
+
+    steps = np.diff(points, axis=1)
+    changed = np.abs(steps) > 1e-12
+    assert np.all(changed.sum(axis=2) == 1)
+    np.testing.assert_array_equal(np.argmax(changed, axis=2), order)
+    np.testing.assert_allclose(np.abs(steps).sum(axis=2), delta)
+
+
+def test_elementary_effects():
+    """Elementary effects of a linear function are its (range scaled) slopes."""
+
+    points, order, signs, delta = morris_trajectories(8, 3, seed=2)
+    results = points @ np.array([2.0, 0.0, -1.0])
+
+    effects = elementary_effects(results, order, signs, delta)
+
+    np.testing.assert_allclose(effects, np.tile([2.0, 0.0, -1.0], (8, 1)))
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_morris_analysis(tmp_path, processes):
+    """Negligible parameter is identified and removed from reduced table."""
+
+    output_file = tmp_path / "reduced.md"
+    tables = f"""
+# Morris_Analysis
+
+Name | Value
+--- | ---
+Trajectories | 4
+Seed | 5
+Processes | {processes}
+Threshold | 0.05
+Output File | {output_file}
+
+# Parameters - Monte_Carlo_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | 400; 1200
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Efficiency | value | 0.015; 0.025
+Non-Depreciable Capital Costs > Cost of land ($ per acre) > Value | Land Cost | value | 400; 600
+"""
+    input_file = tmp_path / "morris.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    analysis = Morris_Analysis(str(input_file))
+
+    assert len(analysis.results) == 4 * 4
+    np.testing.assert_array_equal(analysis.negligible, [False, False, True])
+    assert list(analysis.results_table())[-1] == "Land Cost"
+
+    reduced = convert_file_to_dictionary(open(output_file))
+    assert list(reduced["Parameters - Monte_Carlo_Analysis"]) == [
+        "Direct Capital Costs - PV > PV CAPEX ($/kW) > Value",
+        "Electrolyzer > Conversion efficiency (kg H2/kWh) > Value",
+    ]
+
+
+def test_morris_duplicate_names(tmp_path):
+    """Parameters with the same name are rejected instead of being collapsed."""
+
+    tables = """
+# Morris_Analysis
+
+Name | Value
+--- | ---
+Trajectories | 2
+Seed | 5
+
+# Parameters - Monte_Carlo_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | Cost | value | 400; 1200
+Non-Depreciable Capital Costs > Cost of land ($ per acre) > Value | Cost | value | 400; 600
+"""
+    input_file = tmp_path / "morris.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    with pytest.raises(ValueError, match="Cost"):
+        Morris_Analysis(str(input_file))
@@ -0,0 +1,113 @@
+from pathlib import Path
+import numpy as np
+from pyH2A.Analysis.Monte_Carlo_Analysis import Monte_Carlo_Analysis
+from pyH2A.Analysis.Optimization_Analysis import (
+    Optimization_Analysis,
+    warm_start_values,
+)
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+PV_CAPEX = ["Direct Capital Costs - PV", "PV CAPEX ($/kW)", "Value"]
+EFFICIENCY = ["Electrolyzer", "Conversion efficiency (kg H2/kWh)", "Value"]
+LAND_COST = ["Non-Depreciable Capital Costs", "Cost of land ($ per acre)", "Value"]
+
+
+def monte_carlo_results(directory):
+    """Monte Carlo results for PV CAPEX and efficiency."""
+
+    output_file = directory / "Monte_Carlo.csv"
+    tables = f"""
+# Monte_Carlo_Analysis
+
+Name | Value
+--- | ---
+Samples | 130
+Seed | 4
+Target Price Range ($) | 1; 10
+Output File | {output_file}
+
+# Parameters - Monte_Carlo_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | Base; 300
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Efficiency | value | Base; 0.025
+"""
+    input_file = directory / "monte_carlo.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    return Monte_Carlo_Analysis(str(input_file)), str(output_file)
+
+
+def write_optimization_input(directory, settings):
+    """Writing PV_E_Base input file extended by optimization tables, parameters
+    are in different order than in Monte Carlo results."""
+
+    tables = f"""
+# Optimization_Analysis
+
+Name | Value
+--- | ---
+{settings}
+# Parameters - Optimization_Analysis
+
+Parameter | Bounds
+--- | ---
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Base; 0.025
+Non-Depreciable Capital Costs > Cost of land ($ per acre) > Value | 400; 600
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | 200; Base
+"""
+    input_file = directory / "optimization.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    return str(input_file)
+
+
+def test_warm_start_values(tmp_path):
+    """Best samples are matched by path and clipped to bounds."""
+
+    monte_carlo, output_file = monte_carlo_results(tmp_path)
+    inp = convert_input_to_dictionary(str(BASE_INPUT))
+    bounds = np.array([[0.0185, 0.025], [400, 600], [350, 818]])
+
+    values, matched = warm_start_values(
+        output_file, [EFFICIENCY, LAND_COST, PV_CAPEX], bounds, inp, 5
+    )
+
+    best = monte_carlo.results[np.argsort(monte_carlo.results[:, -1])[:5]]
+    np.testing.assert_array_equal(matched, [True, False, True])
+    np.testing.assert_allclose(values[:, 0], best[:, 1])
+    np.testing.assert_allclose(values[:, 2], np.clip(best[:, 0], 350, 818))
+    assert np.all(np.isnan(values[:, 1]))
+
+
+def test_warm_started_optimization(tmp_path):
+    """Initial population and local starting point are taken from Monte Carlo results
+    and optimization does not end above the best Monte Carlo sample."""
+
+    monte_carlo, output_file = monte_carlo_results(tmp_path)
+    best_cost = np.min(monte_carlo.results[:, -1])
+
+    input_file = write_optimization_input(
+        tmp_path,
+        f"Method | minimize\nMaximum Iterations | 20\nMonte Carlo File | {output_file}\n",
+    )
+    local = Optimization_Analysis(input_file)
+
+    best = monte_carlo.results[np.argmin(monte_carlo.results[:, -1])]
+    np.testing.assert_allclose(local.starting_point(), [best[1], 500, best[0]])
+    assert local.optimization_result.fun <= best_cost
+
+    input_file = write_optimization_input(
+        tmp_path,
+        "Population Size | 5\nMaximum Iterations | 2\nSeed | 1\n"
+        f"Monte Carlo File | {output_file}\n",
+    )
+    evolution = Optimization_Analysis(input_file)
+
+    population = evolution.initial_population()
+    assert population.shape == (15, 3)
+    np.testing.assert_allclose(population[0, [0, 2]], local.starting_point()[[0, 2]])
+    assert np.all((population[:, 1] >= 400) & (population[:, 1] <= 600))
+    assert evolution.optimization_result.fun <= best_cost
@@ -0,0 +1,103 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Analysis.Scenario_Analysis import Scenario_Analysis, expand_scenarios
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_function
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+PATHS = [
+    ["Direct Capital Costs - PV", "PV CAPEX ($/kW)", "Value"],
+    ["Electrolyzer", "Conversion efficiency (kg H2/kWh)", "Value"],
+]
+
+
+def write_scenario_input(directory, mode, processes, settings=None):
+    output_file = directory / "scenarios.csv"
+    if settings is None:
+        settings = f"Output File | {output_file}"
+    tables = f"""
+# Scenario_Analysis
+
+Name | Value
+--- | ---
+Mode | {mode}
+{settings}
+Chunk Size | 2
+Processes | {processes}
+
+# Parameters - Scenario_Analysis
+
+Parameter | Name | Type | Values | Range
+--- | --- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | 400; Base; 1200 |
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Efficiency | factor | | 0.8; 1.2; 3
+"""
+    input_file = directory / "scenarios.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    return str(input_file), output_file
+
+
+def test_expand_scenarios():
+    axes = [np.array([1, 2]), np.array([3, 4])]
+
+    product, number = expand_scenarios(axes, mode="product")
+    assert number == 4
+    assert list(product) == [(1, 3), (1, 4), (2, 3), (2, 4)]
+
+    zipped, number = expand_scenarios(axes, mode="zip")
+    assert number == 2
+    assert list(zipped) == [(1, 3), (2, 4)]
+
+    with pytest.raises(ValueError):
+        expand_scenarios([np.array([1, 2]), np.array([3])], mode="zip")
+
+
+@pytest.mark.parametrize("mode, number", [("product", 9), ("zip", 3)])
+@pytest.mark.parametrize("processes", [1, 2])
+def test_scenario_analysis(tmp_path, mode, number, processes):
+    """Streamed results match direct evaluation of each scenario."""
+
+    input_file, output_file = write_scenario_input(tmp_path, mode, processes)
+    analysis = Scenario_Analysis(input_file)
+
+    assert analysis.results.shape == (number, 3)
+    np.testing.assert_allclose(np.unique(analysis.results[:, 0]), [400, 818, 1200])
+
+    expected = discounted_cash_flow_function(
+        input_file,
+        analysis.results[:, :2],
+        PATHS,
+        value_types=["value", "factor"],
+    )
+    np.testing.assert_allclose(analysis.results[:, 2], expected)
+
+    stored = np.loadtxt(output_file, delimiter="\t", ndmin=2)
+    np.testing.assert_allclose(stored, analysis.results)
+    assert output_file.read_text().splitlines()[0] == "# PV CAPEX\tEfficiency\tH2 Cost"
+
+
+@pytest.mark.parametrize(
+    "settings, in_memory",
+    [
+        (None, False),
+        ("Output File | {output_file}\nKeep Results | True", True),
+        ("Keep Results | False", True),
+    ],
+)
+def test_scenario_results_in_memory(tmp_path, settings, in_memory):
+    """Results are only kept in memory if requested or if there is no output file."""
+
+    output_file = tmp_path / "scenarios.csv"
+    if settings is not None:
+        settings = settings.format(output_file=output_file)
+    input_file, _ = write_scenario_input(tmp_path, "zip", 1, settings)
+    analysis = Scenario_Analysis(input_file)
+
+    assert (analysis._results is not None) is in_memory
+    assert analysis.results.shape == (3, 3)
+    np.testing.assert_allclose(analysis.results_table()["PV CAPEX"], [400, 818, 1200])
+
+    if output_file.exists():
+        stored = np.loadtxt(output_file, delimiter="\t", ndmin=2)
+        np.testing.assert_array_equal(stored, analysis.results)
@@ -0,0 +1,92 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Analysis.Sobol_Analysis import (
+    Sobol_Analysis,
+    bootstrap_sobol_indices,
+    saltelli_matrices,
+    sobol_indices,
+    split_saltelli_results,
+)
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+
+
+def ishigami(x, a=7.0, b=0.1):
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+def test_saltelli_matrices():
+    A = np.arange(6.0).reshape(3, 2)
+    B = -A
+
+    values = saltelli_matrices(A, B)
+
+    assert values.shape == (12, 2)
+    np.testing.assert_array_equal(values[:3], A)
+    np.testing.assert_array_equal(values[3:6], B)
+    np.testing.assert_array_equal(values[6:9], np.c_[B[:, 0], A[:, 1]])
+    np.testing.assert_array_equal(values[9:], np.c_[A[:, 0], B[:, 1]])
+
+
+def test_ishigami_indices():
+    """Indices of the Ishigami function agree with analytical values, which are
+    within the bootstrap confidence intervals."""
+
+    rng = np.random.default_rng(0)
+    samples = 20000
+    A, B = rng.uniform(-np.pi, np.pi, (2, samples, 3))
+
+    f_A, f_B, f_AB = split_saltelli_results(
+        ishigami(saltelli_matrices(A, B)), samples, 3
+    )
+    first_order, total = sobol_indices(f_A, f_B, f_AB)
+    first_interval, total_interval = bootstrap_sobol_indices(
+        f_A, f_B, f_AB, resamples=200, seed=1
+    )
+
+    expected_first = np.array([0.3139, 0.4424, 0.0])
+    expected_total = np.array([0.5576, 0.4424, 0.2437])
+
+    np.testing.assert_allclose(first_order, expected_first, atol=0.03)
+    np.testing.assert_allclose(total, expected_total, atol=0.03)
+    assert np.all(first_interval[0] <= expected_first + 0.01)
+    assert np.all(first_interval[1] >= expected_first - 0.01)
+    assert np.all(total_interval[0] <= expected_total)
+    assert np.all(total_interval[1] >= expected_total)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_sobol_analysis(tmp_path, processes):
+    """Parallel evaluation gives the same indices, efficiency dominates the
+    variance of the H2 cost for the chosen ranges."""
+
+    tables = f"""
+# Sobol_Analysis
+
+Name | Value
+--- | ---
+Samples | 16
+Seed | 3
+Processes | {processes}
+Bootstrap Resamples | 50
+
+# Parameters - Monte_Carlo_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | 800; 820
+Electrolyzer > Conversion efficiency (kg H2/kWh) > Value | Efficiency | value | 0.01; 0.03
+"""
+    input_file = tmp_path / "sobol.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    analysis = Sobol_Analysis(str(input_file))
+
+    assert len(analysis.results) == 16 * 4
+    assert list(analysis.results_table()) == ["Efficiency", "PV CAPEX"]
+    assert analysis.total[1] > 0.9
+    assert analysis.total[0] < 0.05
+
+    reference = Sobol_Analysis(str(input_file))
+    np.testing.assert_array_equal(reference.first_order, analysis.first_order)
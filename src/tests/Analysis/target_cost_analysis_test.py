@@ -0,0 +1,113 @@
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Analysis.Target_Cost_Analysis import Target_Cost_Analysis, expand_bracket
+from pyH2A.Discounted_Cash_Flow import discounted_cash_flow_function
+
+BASE_INPUT = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+PV_CAPEX = ["Direct Capital Costs - PV", "PV CAPEX ($/kW)", "Value"]
+
+
+@pytest.mark.parametrize("lower, upper", [(1.0, 2.0), (20.0, 21.0), (9.0, 9.5)])
+def test_expand_bracket(lower, upper):
+    """Interval containing the root is found without evaluating negative values."""
+
+    evaluated = []
+
+    def function(value):
+        evaluated.append(value)
+        return np.log(value / 10.0)
+
+    lower, upper, f_lower, f_upper, bracketed = expand_bracket(
+        function, lower, upper, function(lower), function(upper)
+    )
+
+    assert bracketed
+    assert lower <= 10.0 <= upper
+    assert np.sign(f_lower) != np.sign(f_upper)
+    assert min(evaluated) > 0
+    assert len(evaluated) <= 6
+
+
+def test_expand_bracket_without_root():
+    """Expansion stops after `max_expansions` evaluations if there is no root."""
+
+    evaluated = []
+
+    def function(value):
+        evaluated.append(value)
+        return (value - 1.0) ** 2 + 1.0
+
+    *_, bracketed = expand_bracket(function, 2.0, 3.0, 2.0, 5.0, max_expansions=5)
+
+    assert not bracketed
+    assert len(evaluated) == 5
+
+
+@pytest.mark.parametrize("backend", ["process", "thread"])
+def test_target_cost_analysis(tmp_path, backend):
+    """Target cost is reached with few evaluations, unreachable targets give NaN."""
+
+    tables = f"""
+# Target_Cost_Analysis
+
+Name | Value
+--- | ---
+Target Price ($) | 3.5
+Processes | 2
+Backend | {backend}
+
+# Parameters - Target_Cost_Analysis
+
+Parameter | Name | Type | Values
+--- | --- | --- | ---
+Direct Capital Costs - PV > PV CAPEX ($/kW) > Value | PV CAPEX | value | 800; 900
+Non-Depreciable Capital Costs > Cost of land ($ per acre) > Value | Land Cost | value | Base; 600
+"""
+    input_file = tmp_path / "target_cost.md"
+    input_file.write_text(BASE_INPUT.read_text() + tables)
+
+    analysis = Target_Cost_Analysis(str(input_file))
+
+    pv_capex = analysis.results["PV CAPEX"]
+    assert pv_capex["Converged"]
+    assert pv_capex["Evaluations"] < 15
+    assert pv_capex["Reference"] == 818.0
+    np.testing.assert_allclose(
+        discounted_cash_flow_function(str(input_file), [pv_capex["Value"]], PV_CAPEX),
+        3.5,
+    )
+
+    land_cost = analysis.results["Land Cost"]
+    assert not land_cost["Converged"]
+    assert not land_cost["Bracketed"]
+    assert np.isnan(land_cost["Value"])
+    assert land_cost["Evaluations"] == 12
+
+
+def test_target_cost_report(tmp_path, capsys):
+    """Unbracketed and unconverged parameters are reported separately and a zero
+    reference value does not break the plot."""
+
+    analysis = Target_Cost_Analysis.__new__(Target_Cost_Analysis)
+    analysis.target = 3.5
+    analysis.parameters = {
+        name: {"Parameter": ["Top", name, "Value"]} for name in ("A", "B", "C")
+    }
+    result = {"H2 Cost": 3.5, "Evaluations": 5, "Reference": 2.0}
+    analysis.results = {
+        "A": {**result, "Value": 1.0, "Bracketed": True, "Converged": True},
+        "B": {**result, "Value": 1.5, "Bracketed": True, "Converged": False},
+        "C": {**result, "Value": np.nan, "Bracketed": False, "Converged": False},
+    }
+
+    analysis.print_results()
+    lines = capsys.readouterr().out.splitlines()[2:5]
+    assert "target value is 1.0" in lines[0]
+    assert "not converged, last value is 1.5" in lines[1]
+    assert "not bracketed" in lines[2]
+
+    analysis.results["A"]["Reference"] = 0.0
+    figure = analysis.target_cost_plot(directory=str(tmp_path), show=False, save=False)
+    widths = [patch.get_width() for patch in figure.axes[0].patches]
+    np.testing.assert_allclose(widths, [np.nan, -25.0, np.nan])
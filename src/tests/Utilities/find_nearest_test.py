@@ -0,0 +1,64 @@
+import math
+import numpy as np
+import pytest
+from pyH2A.Utilities.find_nearest import find_nearest, find_nearest_batch
+
+
+def reference_find_nearest(array_1d, values):
+    """Element-wise implementation used before vectorization."""
+
+    hits = []
+
+    for value in np.atleast_1d(values):
+        idx = np.searchsorted(array_1d, value, side="left")
+        if idx > 0 and (
+            idx == len(array_1d)
+            or math.fabs(value - array_1d[idx - 1]) < math.fabs(value - array_1d[idx])
+        ):
+            hits.append(idx - 1)
+        else:
+            hits.append(idx)
+
+    return hits
+
+
+ARRAY = np.array([-1.0, 0.0, 1.0, 2.0, 4.0, 8.0])
+VALUES = np.array([-5.0, -1.0, -0.5, 0.5, 1.2, 3.0, 6.0, 7.9, 8.0, 20.0])
+
+
+def test_matches_reference():
+    """Same indices, including ties (larger entry) and out of range values."""
+
+    np.testing.assert_array_equal(
+        find_nearest(ARRAY, VALUES), reference_find_nearest(ARRAY, VALUES)
+    )
+    assert list(find_nearest(ARRAY, 0.4)) == [1]
+
+
+def test_shapes_and_2d_arrays():
+    """Values of any shape are supported, 2D arrays are searched by first column."""
+
+    table = np.c_[ARRAY, np.arange(len(ARRAY))]
+    hits = find_nearest(table, VALUES.reshape(2, 5))
+
+    assert hits.shape == (2, 5)
+    np.testing.assert_array_equal(hits.ravel(), reference_find_nearest(ARRAY, VALUES))
+
+
+@pytest.mark.parametrize("shared_values", [False, True])
+def test_batch(shared_values):
+    """Row-wise batch lookup matches single lookups."""
+
+    rng = np.random.default_rng(1)
+    arrays = np.sort(rng.uniform(0, 10, (20, 8)), axis=1)
+    arrays[:, 3] = arrays[:, 2]
+    values = VALUES if shared_values else rng.uniform(-1, 11, (20, 10))
+
+    hits = find_nearest_batch(arrays, values)
+
+    assert hits.shape == (20, 10)
+    for row, array in enumerate(arrays):
+        row_values = values if shared_values else values[row]
+        np.testing.assert_array_equal(
+            hits[row], reference_find_nearest(array, row_values)
+        )
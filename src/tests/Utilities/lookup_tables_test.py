@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import pyH2A.Utilities.find_nearest as fn
+import pyH2A.Utilities.lookup_tables as lookup_tables
+from pyH2A.Utilities.input_modification import read_textfile
+
+
+@pytest.mark.parametrize("name", list(lookup_tables.INFLATION_TABLES))
+def test_year_index_matches_find_nearest(name):
+    """Vectorized year lookup agrees with find_nearest, including ties and
+    years outside of the table."""
+
+    table = read_textfile(lookup_tables.INFLATION_TABLES[name], delimiter="	")
+    years = np.array([1900, table[0, 0], 2004.5, 2015.2, 2016.7, 2100])
+
+    np.testing.assert_array_equal(
+        lookup_tables.year_index(name, years), fn.find_nearest(table, years)
+    )
+    np.testing.assert_array_equal(
+        lookup_tables.year_index(name, years.reshape(2, 3)).ravel(),
+        fn.find_nearest(table, years),
+    )
+
+
+def test_tables_are_read_only():
+    """Stored tables cannot be modified in place."""
+
+    table = lookup_tables.get_table("Plant Cost")
+
+    with pytest.raises(ValueError):
+        table[0, 1] = 0.0
+
+    assert lookup_tables.get_table("Plant Cost") is table
+
+
+def test_inflators_are_cached():
+    """Inflators are computed once per year triple."""
+
+    lookup_tables.inflators.cache_clear()
+    first = lookup_tables.inflators(2016, 2016, 2016)
+    second = lookup_tables.inflators(2016, 2016, 2016)
+
+    assert first is second
+    assert first.cepci == pytest.approx(1.0)
+    assert lookup_tables.inflators.cache_info().hits == 1
+
+    other = lookup_tables.inflators(2016, 2005, 2016)
+    table = lookup_tables.get_table("Plant Cost")
+    idx = fn.find_nearest(table, [2016, 2005])
+    assert other.cepci == pytest.approx(table[idx[0], 1] / table[idx[1], 1])
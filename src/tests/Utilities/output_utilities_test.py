@@ -0,0 +1,85 @@
+import matplotlib.pyplot as plt
+import pytest
+from pyH2A.Utilities.output_utilities import (
+    Figure_Lean,
+    render_deferred_figures,
+    set_rendering_mode,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_rendering_mode():
+    previous_mode = set_rendering_mode("inline")
+    yield
+    render_deferred_figures(processes=1)
+    set_rendering_mode(previous_mode)
+
+
+def make_figure(directory, name):
+    figure = Figure_Lean(name=name, directory=directory, save=True, pdf=False)
+    figure.ax.plot([0, 1], [1, 0])
+    figure.execute()
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_deferred_rendering(tmp_path, processes):
+    """Figures are only written once the queue is rendered."""
+
+    set_rendering_mode("deferred")
+
+    for name in ("a", "b", "c"):
+        make_figure(tmp_path, name)
+
+    assert list(tmp_path.iterdir()) == []
+
+    paths = render_deferred_figures(processes=processes)
+
+    assert sorted(paths) == sorted(str(tmp_path / f"{n}.png") for n in "abc")
+    assert all((tmp_path / f"{n}.png").stat().st_size > 0 for n in "abc")
+    assert render_deferred_figures() == []
+
+
+def test_no_rendering(tmp_path):
+    """Figures are neither saved nor queued in 'none' mode."""
+
+    set_rendering_mode("none")
+    make_figure(tmp_path, "a")
+
+    assert list(tmp_path.iterdir()) == []
+    assert render_deferred_figures() == []
+
+
+def test_inline_rendering(tmp_path):
+    """Figures are saved immediately in 'inline' mode."""
+
+    make_figure(tmp_path, "a")
+
+    assert (tmp_path / "a.png").is_file()
+
+
+def test_backend_is_restored(tmp_path):
+    """Agg is used while figures are deferred, the previous backend is restored
+    when switching back to 'inline'."""
+
+    original = plt.get_backend()
+    plt.switch_backend("svg")
+
+    try:
+        set_rendering_mode("deferred")
+        assert plt.get_backend().lower() == "agg"
+
+        make_figure(tmp_path, "a")
+        set_rendering_mode("none")
+        render_deferred_figures(processes=1)
+        assert plt.get_backend().lower() == "agg"
+
+        set_rendering_mode("inline")
+        assert plt.get_backend() == "svg"
+        assert (tmp_path / "a.png").is_file()
+    finally:
+        plt.switch_backend(original)
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        set_rendering_mode("interactive")
@@ -0,0 +1,127 @@
+import pytest
+import pyH2A.Utilities.plugin_registry as registry
+from pyH2A.Plugins.Battery_Plugin import Battery_Plugin
+
+
+class Valid_Plugin:
+    """Plugin with the signature expected by Discounted_Cash_Flow."""
+
+    def __init__(self, dcf, print_info):
+        self.dcf = dcf
+
+
+class Invalid_Plugin:
+    """Plugin missing the print_info argument."""
+
+    def __init__(self, dcf):
+        self.dcf = dcf
+
+
+class Keyword_Only_Plugin:
+    """Plugin which cannot be called with positional arguments."""
+
+    def __init__(self, *, dcf, print_info):
+        self.dcf = dcf
+
+
+class Renamed_Plugin:
+    """Plugin with differently named positional arguments."""
+
+    def __init__(self, model, verbose=False):
+        self.model = model
+
+
+class Valid_Analysis:
+    """Analysis module with the signature expected by pyH2A."""
+
+    def __init__(self, input_file):
+        self.input_file = input_file
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    registry.clear_registry()
+    yield
+    registry.clear_registry()
+
+
+def test_builtin_plugin_is_resolved_and_cached():
+    """Built-in plugins are imported once and then returned from the registry."""
+
+    first = registry.get_plugin("Battery_Plugin")
+
+    assert first is Battery_Plugin
+    assert registry._registry[True]["Battery_Plugin"] is Battery_Plugin
+    assert registry.get_plugin("Battery_Plugin") is first
+
+
+def test_register_plugin_validates_signature():
+    """Signatures are checked at registration time."""
+
+    assert registry.register_plugin(Valid_Plugin) is Valid_Plugin
+    assert registry.get_plugin("Valid_Plugin") is Valid_Plugin
+
+    with pytest.raises(TypeError):
+        registry.register_plugin(Invalid_Plugin)
+
+    with pytest.raises(TypeError):
+        registry.register_plugin(Keyword_Only_Plugin)
+
+    assert registry.register_plugin(Renamed_Plugin) is Renamed_Plugin
+
+    with pytest.raises(TypeError):
+        registry.register_plugin(Valid_Plugin, plugin_module=False)
+
+    registry.register_plugin(Valid_Analysis, plugin_module=False)
+    assert registry.get_plugin("Valid_Analysis", plugin_module=False) is Valid_Analysis
+
+
+def test_entry_points_are_registered(monkeypatch):
+    """Classes provided through entry points are found by name."""
+
+    class Dummy_Entry_Point:
+        name = "External_Plugin"
+
+        def load(self):
+            return Valid_Plugin
+
+    groups = []
+
+    def select(group):
+        groups.append(group)
+        return [Dummy_Entry_Point()] if group == registry.PLUGIN_ENTRY_POINT_GROUP else []
+
+    monkeypatch.setattr(registry, "select_entry_points", select)
+
+    assert registry.get_plugin("External_Plugin") is Valid_Plugin
+    assert registry.get_plugin("Battery_Plugin") is Battery_Plugin
+    assert groups == [registry.PLUGIN_ENTRY_POINT_GROUP]
+
+
+def test_broken_entry_points_are_skipped(monkeypatch):
+    """Entry points which fail to load or are invalid are skipped with a warning."""
+
+    class Dummy_Entry_Point:
+        def __init__(self, name, target):
+            self.name = name
+            self.target = target
+
+        def load(self):
+            if self.target is None:
+                raise ImportError("missing dependency")
+            return self.target
+
+    entry_points = [
+        Dummy_Entry_Point("Broken_Plugin", None),
+        Dummy_Entry_Point("Invalid_Plugin", Invalid_Plugin),
+        Dummy_Entry_Point("External_Plugin", Valid_Plugin),
+    ]
+    monkeypatch.setattr(registry, "select_entry_points", lambda group: entry_points)
+
+    with pytest.warns(UserWarning) as record:
+        assert registry.get_plugin("External_Plugin") is Valid_Plugin
+
+    messages = [str(warning.message) for warning in record]
+    assert any("Broken_Plugin" in message for message in messages)
+    assert any("Invalid_Plugin" in message for message in messages)
+    assert "Broken_Plugin" not in registry._registry[True]
@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+import numpy as np
+import pytest
+import pyH2A.Utilities.shared_arrays as shared_arrays
+from pyH2A.Discounted_Cash_Flow import (
+    discounted_cash_flow_chunks,
+    discounted_cash_flow_function,
+)
+from pyH2A.Utilities.input_modification import (
+    convert_input_to_dictionary,
+    copy_input,
+    set_by_path,
+)
+
+INPUT_FILE = str(Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md")
+PARAMETERS = ["Direct Capital Costs - PV", "PV CAPEX ($/kW)", "Value"]
+
+_worker = {}
+
+
+def _attach(shared):
+    _worker["obj"] = shared_arrays.attach_arrays(shared)
+
+
+def _inspect(key):
+    array = _worker["obj"]["Data"][key]
+    return float(array.sum()), array.flags.writeable
+
+
+def test_round_trip():
+    """Large arrays are replaced by references, small arrays and other values are kept."""
+
+    obj = {
+        "Data": {"Large": np.arange(20000.0).reshape(2, 10000), "Small": np.ones(3)},
+        "List": [np.full(10000, 2.0), "text"],
+    }
+
+    with shared_arrays.Shared_Arrays(obj) as shared:
+        assert isinstance(shared["Data"]["Large"], shared_arrays.Shared_Array)
+        assert isinstance(shared["List"][0], shared_arrays.Shared_Array)
+        assert shared["Data"]["Small"] is obj["Data"]["Small"]
+        assert shared["List"][1] == "text"
+
+        attached = shared_arrays.attach_arrays(shared)
+        np.testing.assert_array_equal(attached["Data"]["Large"], obj["Data"]["Large"])
+        np.testing.assert_array_equal(attached["List"][0], obj["List"][0])
+        assert not attached["Data"]["Large"].flags.writeable
+
+        name = shared["Data"]["Large"].name
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_workers_attach_views():
+    """Worker processes see the shared data as read-only arrays."""
+
+    obj = {"Data": {"Large": np.arange(50000.0)}}
+
+    with shared_arrays.Shared_Arrays(obj) as shared:
+        with ProcessPoolExecutor(
+            max_workers=2, initializer=_attach, initargs=(shared,)
+        ) as executor:
+            results = list(executor.map(_inspect, ["Large"] * 4))
+
+    assert results == [(float(obj["Data"]["Large"].sum()), False)] * 4
+
+
+def test_copy_input_references_read_only_arrays():
+    """Read-only arrays are shared by copies, writeable arrays are copied."""
+
+    read_only = np.arange(5.0)
+    read_only.setflags(write=False)
+    inp = {"A": {"B": {"Value": read_only}, "C": {"Value": np.arange(5.0)}}}
+
+    copied = copy_input(inp)
+
+    assert copied["A"]["B"]["Value"] is read_only
+    assert copied["A"]["C"]["Value"] is not inp["A"]["C"]["Value"]
+
+    set_by_path(copied, ["A", "B", "Value"], 2.0, value_type="factor")
+    np.testing.assert_array_equal(read_only, np.arange(5.0))
+    np.testing.assert_array_equal(copied["A"]["B"]["Value"], 2 * np.arange(5.0))
+
+
+def test_chunks_with_shared_input():
+    """Chunked evaluation with large arrays in the input matches sequential evaluation."""
+
+    inp = convert_input_to_dictionary(INPUT_FILE)
+    inp["Shared Data"] = {"Profile": {"Value": np.random.default_rng(0).random(87600)}}
+
+    chunks = [np.linspace(300, 600, 3), np.linspace(700, 900, 3)]
+    results = list(
+        discounted_cash_flow_chunks(inp, iter(chunks), PARAMETERS, processes=2)
+    )
+
+    for chunk, result in zip(chunks, results):
+        np.testing.assert_allclose(
+            result, discounted_cash_flow_function(inp, chunk, PARAMETERS)
+        )
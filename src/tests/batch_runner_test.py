@@ -0,0 +1,105 @@
+import csv
+from pathlib import Path
+from click.testing import CliRunner
+from pyH2A.cli_pyH2A import cli
+from pyH2A.run_pyH2A import batch_output_directories, collect_input_files, run_batch
+from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+
+END_TO_END = Path(__file__).parent / "end_to_end"
+
+
+def read_table(path):
+    with open(path, newline="") as file_read:
+        return list(csv.DictReader(file_read, delimiter="\t"))
+
+
+def test_collect_input_files(tmp_path):
+    """Glob patterns and manifests are expanded in order without duplicates."""
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(f"# comment\n\n{END_TO_END / 'PEC_Base.md'}\n")
+
+    files = collect_input_files([str(END_TO_END / "P*_Base.md"), str(manifest)])
+
+    assert [Path(f).name for f in files] == [
+        "PEC_Base.md",
+        "PV_E_Base.md",
+        "Photocatalytic_Base.md",
+    ]
+
+
+def test_collect_missing_input_files(tmp_path):
+    """Explicitly named input files which do not exist are kept."""
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("Missing_Manifest.md\n")
+
+    files = collect_input_files(
+        [str(tmp_path / "Missing.md"), str(tmp_path / "Missing_*.md"), str(manifest)]
+    )
+
+    assert files == [str(tmp_path / "Missing.md"), str(tmp_path / "Missing_Manifest.md")]
+
+
+def test_batch_output_directories(tmp_path):
+    """Input files with the same name get separate output directories."""
+
+    files = ["a/Base.md", "b/Base.md", "Other.md", "c/Base.md"]
+
+    assert batch_output_directories(files, str(tmp_path)) == [
+        str(tmp_path / name) for name in ("Base", "Base_2", "Other", "Base_3")
+    ]
+
+    files = ["a/Base.md", "b/Base.md", "Base_2.md"]
+
+    assert batch_output_directories(files, str(tmp_path)) == [
+        str(tmp_path / name) for name in ("Base", "Base_3", "Base_2")
+    ]
+
+
+def test_batch_run_reports_failures(tmp_path):
+    """Failed input files are listed and do not stop the remaining runs."""
+
+    broken = tmp_path / "Broken.md"
+    broken.write_text("# Workflow\n\nName | Type | Position\n--- | --- | ---\n")
+    sources = [str(END_TO_END / "PEC_Base.md"), str(END_TO_END / "PV_E_Base.md")]
+
+    missing = tmp_path / "Missing.md"
+
+    results = run_batch(
+        sources + [str(broken), str(missing)], str(tmp_path), processes=2
+    )
+
+    assert [r["Error"] is None for r in results] == [True, True, False, False]
+    assert all((tmp_path / name).is_dir() for name in ("PEC_Base", "PV_E_Base"))
+
+    rows = read_table(tmp_path / "Batch_Results.csv")
+    assert [row["Status"] for row in rows] == ["OK", "OK", "Failed", "Failed"]
+    assert rows[3]["File"] == str(missing)
+
+    for row, source in zip(rows, sources):
+        expected = Discounted_Cash_Flow(source, print_info=False)
+        assert float(row["LCOH ($/kg)"]) == expected.h2_cost
+        for name, value in expected.contributions["Data"].items():
+            assert float(row[name]) == value
+
+
+def test_batch_command(tmp_path):
+    table = tmp_path / "table.csv"
+    result = CliRunner().invoke(
+        cli,
+        [
+            "batch",
+            "-i",
+            str(END_TO_END / "PEC_Base.md"),
+            "-o",
+            str(tmp_path),
+            "-t",
+            str(table),
+            "-p",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert len(read_table(table)) == 1
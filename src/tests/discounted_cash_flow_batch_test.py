@@ -0,0 +1,75 @@
+import copy
+from pathlib import Path
+import numpy as np
+import pytest
+from pyH2A.Discounted_Cash_Flow import (
+    discounted_cash_flow_batch,
+    discounted_cash_flow_function,
+)
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary, read_textfile
+
+INPUT_FILE = str(Path(__file__).parent / "end_to_end" / "PV_E_Base.md")
+PARAMETERS = [
+    ["Direct Capital Costs - PV", "PV CAPEX ($/kW)", "Value"],
+    ["Electrolyzer", "Conversion efficiency (kg H2/kWh)", "Value"],
+]
+
+
+@pytest.mark.parametrize("processes, chunk_size", [(1, None), (2, None), (3, 2)])
+def test_batch_matches_sequential(processes, chunk_size):
+    """Batch evaluation returns results in the order of the provided values."""
+
+    values = np.c_[np.linspace(300, 900, 7), np.linspace(0.015, 0.025, 7)]
+
+    expected = discounted_cash_flow_function(INPUT_FILE, values, PARAMETERS)
+    results = discounted_cash_flow_batch(
+        INPUT_FILE, values, PARAMETERS, processes=processes, chunk_size=chunk_size
+    )
+
+    np.testing.assert_allclose(results, expected)
+
+
+def test_batch_value_types():
+    """Factor and value types can be mixed."""
+
+    values = np.array([[818.0, 1.0], [409.0, 2.0]])
+    results = discounted_cash_flow_batch(
+        INPUT_FILE, values, PARAMETERS, value_types=["value", "factor"], processes=2
+    )
+    expected = discounted_cash_flow_function(
+        INPUT_FILE, np.array([[818.0, 0.0185], [409.0, 0.037]]), PARAMETERS
+    )
+
+    np.testing.assert_allclose(results, expected)
+
+
+def test_thread_backend_matches_sequential():
+    """Threads evaluate value sets concurrently without modifying the shared input."""
+
+    inp = convert_input_to_dictionary(INPUT_FILE)
+    reference = copy.deepcopy(inp)
+    values = np.c_[np.linspace(300, 900, 12), np.linspace(0.015, 0.025, 12)]
+
+    expected = discounted_cash_flow_function(inp, values, PARAMETERS)
+    results = discounted_cash_flow_batch(
+        inp, values, PARAMETERS, processes=4, chunk_size=1, backend="thread"
+    )
+
+    np.testing.assert_allclose(results, expected)
+    assert inp == reference
+
+
+def test_cached_arrays_are_read_only():
+    """Arrays returned by cached file reads cannot be modified by callers."""
+
+    data = read_textfile("pyH2A.Lookup_Tables~MACRS.csv", delimiter="	")
+
+    with pytest.raises(ValueError):
+        data[0, 0] = 1.0
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        discounted_cash_flow_batch(
+            INPUT_FILE, np.ones((4, 2)), PARAMETERS, processes=2, backend="gpu"
+        )
@@ -83,3 +83,70 @@ def test_battery_plugin(case):
             rtol=1e-5,
             atol=1e-9,
         )
+
+
+def test_battery_dispatch_hand_calculation():
+    """Charging precedes discharging within an hour, capacity and power limit dispatch."""
+
+    from pyH2A.Plugins.Battery_Plugin import battery_dispatch
+
+    surplus = np.array([5.0, 5.0, 0.0, 0.0, 2.0, 0.0])
+    deficit = np.array([0.0, 0.0, 3.0, 3.0, 1.0, 3.0])
+
+    charged, discharged = battery_dispatch(
+        surplus, deficit, capacity=6.0, power=4.0, efficiency=0.5
+    )
+
+    np.testing.assert_allclose(charged, [4.0, 4.0, 0.0, 0.0, 2.0, 0.0])
+    np.testing.assert_allclose(discharged, [0.0, 0.0, 3.0, 1.0, 1.0, 0.0])
+
+
+def test_battery_dispatch_batched_rows():
+    """Rows (years, scenarios) are simulated independently and match a loop."""
+
+    from pyH2A.Plugins.Battery_Plugin import _dispatch_loop, _dispatch_numpy
+
+    rng = np.random.default_rng(0)
+    surplus = np.clip(rng.normal(0, 5, (3, 4, 48)), 0, None)
+    deficit = np.clip(rng.normal(0, 5, (3, 4, 48)), 0, None)
+    capacity = rng.uniform(5, 20, (3, 4)).ravel()
+    power = np.full(12, 6.0)
+    efficiency = np.full(12, 0.9)
+
+    expected = _dispatch_loop(
+        surplus.reshape(12, 48), deficit.reshape(12, 48), capacity, power, efficiency
+    )
+    result = _dispatch_numpy(
+        surplus.reshape(12, 48), deficit.reshape(12, 48), capacity, power, efficiency
+    )
+
+    for value, reference in zip(result, expected):
+        np.testing.assert_allclose(value, reference)
+
+
+def test_hourly_dispatch_end_to_end():
+    """Hourly dispatch in a full workflow delivers at most the stored energy."""
+
+    from pathlib import Path
+    from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+    from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+
+    input_file = Path(__file__).parents[1] / "end_to_end" / "PV_E_Base.md"
+    results = {}
+
+    for dispatch in ("daily", "hourly"):
+        inp = convert_input_to_dictionary(str(input_file))
+        inp["Battery"]["Design Capacity (kWh)"]["Value"] = 5000
+        inp["Battery"]["Dispatch"] = {"Value": dispatch}
+        results[dispatch] = Discounted_Cash_Flow(inp, print_info=False)
+
+    hourly = results["hourly"]
+    assert np.isfinite(hourly.h2_cost)
+    assert hourly.h2_cost != pytest.approx(results["daily"].h2_cost, rel=1e-6)
+
+    stored = hourly.inp["Power Consumption"]["Stored Power Electrolysis (kWh, yearly)"][
+        "Value"
+    ]
+    unstored = hourly.inp["Power Generation"]["Available Power (yearly, kWh)"]["Value"]
+    assert np.all(stored > 0)
+    assert np.all(unstored >= 0)
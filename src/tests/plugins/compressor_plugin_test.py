@@ -0,0 +1,217 @@
+import numpy as np
+import pytest
+from pyH2A.Plugins.Compressor_Plugin import (
+    Compressor_Plugin,
+    compression_sweep,
+    compression_work,
+)
+
+
+class DummyDCF:
+    """DCF object for Compressor_Plugin with configurable compressor inputs."""
+
+    def __init__(self, compressor, h2_production):
+        self.inp = {
+            "Compressor": {key: {"Value": value} for key, value in compressor.items()},
+            "Electrolyzer": {"H2 Production (yearly, kg)": {"Value": h2_production}},
+        }
+        self.operation_years = np.arange(len(h2_production))
+
+
+H2_PRODUCTION = np.array([0.0, 1.0e6, 1.2e6, 0.9e6])
+
+
+def plugin_results(outlet_pressure, efficiency, stages=None):
+    compressor = {
+        "Inlet Pressure (bar)": 30.0,
+        "Outlet Pressure (bar)": outlet_pressure,
+        "Isentropic Efficiency (%)": efficiency,
+    }
+    if stages is not None:
+        compressor["Number of Stages"] = stages
+
+    dcf = DummyDCF(compressor, H2_PRODUCTION)
+    plugin = Compressor_Plugin(dcf, print_info=False)
+
+    return plugin
+
+
+@pytest.mark.parametrize("stages", [None, np.array([1, 2, 4])])
+def test_sweep_matches_plugin(stages):
+    """Broadcast sweep over outlet pressures, efficiencies and stages matches
+    single plugin evaluations."""
+
+    outlet = np.array([350.0, 700.0, 900.0])[:, None, None]
+    efficiency = np.array([0.6, 0.8])[None, :, None]
+    stage_axis = None if stages is None else stages[None, None, :]
+
+    results = compression_sweep(
+        30.0, outlet, efficiency, stage_axis, h2_production_yearly=H2_PRODUCTION
+    )
+    shape = (3, 2, 1) if stages is None else (3, 2, 3)
+
+    assert results["Power Consumption per kg H2 (kWh/kg)"].shape == shape
+    assert results["Power Consumption (kW)"].shape == shape + (4,)
+
+    for index in np.ndindex(*shape):
+        i, j, k = index
+        plugin = plugin_results(
+            outlet[i, 0, 0],
+            efficiency[0, j, 0],
+            None if stages is None else stages[k],
+        )
+        assert results["Number of Stages"][index] == plugin.number_of_stages
+        assert results["Stage Compression Ratio"][index] == pytest.approx(
+            plugin.stage_compression_ratio
+        )
+        assert results["Power Consumption per kg H2 (kWh/kg)"][
+            index
+        ] == pytest.approx(plugin.power_per_kg_h2)
+        assert results["CAPEX ($)"][index] == pytest.approx(plugin.compressor_capex)
+
+
+def test_stage_estimate():
+    """Stage count keeps per-stage ratio <= 3 and is at least one."""
+
+    _, stage_ratio, stages, _ = compression_work(
+        30.0, np.array([20.0, 30.0, 90.0, 91.0, 900.0]), 0.7
+    )
+
+    np.testing.assert_array_equal(stages, [1, 1, 1, 2, 4])
+    assert np.all(stage_ratio <= 3.0 + 1e-12)
+
+
+def test_real_gas_properties_on_grid():
+    """Interpolation reproduces tabulated values on grid points."""
+
+    from pyH2A.Plugins.Compressor_Plugin import real_gas_properties, real_gas_table
+
+    temperatures, pressures, properties = real_gas_table()
+    Z, cp = real_gas_properties(temperatures[[9, 8]], pressures[[70, 100]])
+
+    np.testing.assert_allclose(Z, properties[0, [9, 8], [70, 100]])
+    np.testing.assert_allclose(cp, properties[1, [9, 8], [70, 100]])
+    assert Z[0] == pytest.approx(1.46, abs=0.02)
+
+
+def test_real_gas_work():
+    """Real gas work approaches ideal gas work at low pressure and exceeds it at
+    high pressure, stage temperatures are applied per stage."""
+
+    outlet = np.array([3.0, 700.0])
+    ideal, *_ = compression_work(1.0, outlet, 0.7, number_of_stages=[1, 5])
+    real, *_ = compression_work(
+        1.0, outlet, 0.7, number_of_stages=[1, 5], gas_model="real"
+    )
+
+    assert real[0] == pytest.approx(ideal[0], rel=0.02)
+    assert real[1] > 1.05 * ideal[1]
+
+    uniform, *_ = compression_work(
+        30.0, 700.0, 0.7, gas_model="ideal", stage_temperatures=[288.15, 288.15]
+    )
+    warmer, *_ = compression_work(
+        30.0, 700.0, 0.7, gas_model="ideal", stage_temperatures=[288.15, 320.0]
+    )
+    assert uniform == pytest.approx(compression_work(30.0, 700.0, 0.7)[0])
+    assert warmer > uniform
+
+    compressor = {
+        "Inlet Pressure (bar)": 30.0,
+        "Outlet Pressure (bar)": 700.0,
+        "Isentropic Efficiency (%)": 0.7,
+        "Gas Model": "real",
+        "Stage Inlet Temperature (K)": "288.15; 300",
+    }
+    plugin = Compressor_Plugin(DummyDCF(compressor, H2_PRODUCTION), print_info=False)
+    expected, *_ = compression_work(
+        30.0, 700.0, 0.7, gas_model="real", stage_temperatures=[288.15, 300.0]
+    )
+    assert plugin.power_per_kg_h2 == pytest.approx(expected)
+
+
+def test_hourly_load_profile():
+    """Hourly load sizes CAPEX on the peak draw and registers a power consumer."""
+
+    rng = np.random.default_rng(2)
+    hourly = rng.uniform(0, 20, (3, 8760))
+    yearly = np.r_[0.0, hourly.sum(axis=1)]
+
+    compressor = {
+        "Inlet Pressure (bar)": 30.0,
+        "Outlet Pressure (bar)": 350.0,
+        "Isentropic Efficiency (%)": 0.7,
+        "Load Profile": "hourly",
+        "Power Consumer Type": "flexible",
+    }
+    dcf = DummyDCF(compressor, yearly)
+    dcf.operation_years = np.arange(3)
+    dcf.inp["Electrolyzer"]["H2 Production (hourly, kg)"] = {"Value": hourly}
+
+    plugin = Compressor_Plugin(dcf, print_info=False)
+    average = Compressor_Plugin(
+        DummyDCF({**compressor, "Load Profile": "average"}, yearly), print_info=False
+    )
+
+    np.testing.assert_allclose(
+        plugin.hourly_power_consumption.sum(axis=1),
+        plugin.yearly_power_consumption_kwh[1:],
+    )
+    assert plugin.peak_power == pytest.approx(20 * plugin.power_per_kg_h2, rel=1e-3)
+    assert plugin.compressor_capex == pytest.approx(2 * average.compressor_capex, rel=0.01)
+
+    sweep = compression_sweep(
+        30.0, np.array([350.0]), 0.7, h2_production_hourly=hourly
+    )
+    assert sweep["CAPEX ($)"][0] == pytest.approx(plugin.compressor_capex)
+
+    consumer = dcf.inp["Power Consumption"]["Compressor (kWh, yearly)"]
+    assert consumer["Type"] == "flexible"
+    np.testing.assert_allclose(
+        consumer["Value"], plugin.yearly_power_consumption_kwh[1:]
+    )
+
+
+def test_hourly_load_profile_requires_hourly_production():
+    """Hourly load profile without hourly H2 production raises an explanatory error."""
+
+    compressor = {
+        "Inlet Pressure (bar)": 30.0,
+        "Outlet Pressure (bar)": 350.0,
+        "Isentropic Efficiency (%)": 0.7,
+        "Load Profile": "hourly",
+    }
+
+    with pytest.raises(ValueError, match="H2 Production \\(hourly, kg\\)"):
+        Compressor_Plugin(DummyDCF(compressor, H2_PRODUCTION), print_info=False)
+
+
+@pytest.mark.parametrize("cost", ["table", "float"])
+def test_electricity_utility_single_pass(cost):
+    """Automatically added utility matches a manually wired utility row."""
+
+    from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+    from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+
+    input_file = "pyH2A.Example~190226_PEC_Type_1_Comp.md"
+    table = "pyH2A.Lookup_Tables.Utility_Cost~Industrial_Electricity_AEO_2017_Reference_Case.csv"
+
+    manual = convert_input_to_dictionary(input_file)
+    automatic = convert_input_to_dictionary(input_file)
+    del automatic["Utilities"]["Compression Electricity"]
+
+    if cost == "table":
+        automatic["Compressor"]["Electricity Cost"] = {"Value": table}
+    else:
+        manual["Utilities"]["Compression Electricity"]["Cost"] = 0.07
+        manual["Utilities"]["Compression Electricity"]["Price Conversion Factor"] = 1.0
+        automatic["Compressor"]["Electricity Cost"] = {"Value": 0.07}
+
+    reference = Discounted_Cash_Flow(manual, print_info=False)
+    result = Discounted_Cash_Flow(automatic, print_info=False)
+
+    utility = result.inp["Utilities"]["Compressor Electricity"]
+    assert utility["Usage per kg H2"] == pytest.approx(
+        result.inp["Compressor"]["Power Consumption per kg H2 (kWh/kg)"]["Value"]
+    )
+    assert result.h2_cost == pytest.approx(reference.h2_cost)
@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+from pyH2A.Plugins.Electrolyzer_Plugin import (
+    Electrolyzer_Plugin,
+    Load_Duration_Curve,
+    load_duration_curve,
+)
+
+
+class DummyDCF:
+    """DCF object with PV power generation for Electrolyzer_Plugin."""
+
+    def __init__(
+        self, profile, nominal_pv, nominal_electrolyzer, threshold, fast, hourly=True
+    ):
+        self.operation_years = np.arange(1, 6)
+        scaling = nominal_pv * 0.99 ** self.operation_years
+        generation = {
+            year: profile * scale for year, scale in zip(self.operation_years, scaling)
+        }
+
+        power_generation = {
+            "PV Hourly Power Generation (kWh)": {"Value": generation},
+            "Available Power (hourly, kWh)": {"Value": generation},
+        }
+        if fast:
+            power_generation["PV Profile (hourly, kWh per kW)"] = {"Value": profile}
+            power_generation["PV Profile Scaling (kW)"] = {"Value": scaling}
+            power_generation["Available Power from PV Profile"] = {"Value": True}
+        else:
+            power_generation["Available Power (hourly, kWh)"] = {
+                "Value": dict(generation)
+            }
+
+        for entry in power_generation.values():
+            entry["Processed"] = "Yes"
+
+        self.inp = {
+            "Power Generation": power_generation,
+            "CAPEX Multiplier": {"Multiplier": {"Value": 0.9}},
+            "Financial Input Values": {"construction time": {"Value": 2}},
+            "Electrolyzer": {
+                "Nominal Power (kW)": {"Value": nominal_electrolyzer},
+                "CAPEX Reference Power (kW)": {"Value": 1000.0},
+                "Power requirement increase per year": {"Value": 0.003},
+                "Minimum capacity": {"Value": threshold},
+                "Conversion efficiency (kg H2/kWh)": {"Value": 0.02},
+                "Replacement time (h)": {"Value": 40000.0},
+                "Hourly Outputs": {"Value": hourly},
+            },
+        }
+
+
+PROFILE = np.clip(
+    np.sin(np.linspace(0, 365 * 2 * np.pi, 8760)), 0, None
+) * np.random.default_rng(4).uniform(0.5, 1.0, 8760)
+
+
+@pytest.mark.parametrize("ratio", [0.3, 1.0, 2.5])
+@pytest.mark.parametrize("threshold", [0.0, 0.1, 0.5])
+def test_load_duration_fast_path(ratio, threshold):
+    """Fast path based on the load duration curve reproduces the hourly loop."""
+
+    results = {}
+    for fast in (True, False):
+        dcf = DummyDCF(PROFILE, 1000.0, 1000.0 * ratio, threshold, fast, hourly=False)
+        results[fast] = Electrolyzer_Plugin(dcf, print_info=False)
+
+    fast, reference = results[True], results[False]
+
+    np.testing.assert_allclose(fast.yearly_data, reference.yearly_data, rtol=1e-10)
+    for year in reference.yearly_data_unused_power_daily:
+        np.testing.assert_allclose(
+            fast.yearly_data_unused_power_daily[year],
+            reference.yearly_data_unused_power_daily[year],
+            atol=1e-9,
+        )
+    assert fast.replacement_frequency == reference.replacement_frequency
+    assert fast.yearly_data_unused_power == 0
+
+
+def test_fast_path_requires_flag():
+    """Fast path is only used if available power is flagged as unmodified PV output
+    and no hourly outputs are requested."""
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, True, hourly=False)
+    Electrolyzer_Plugin(dcf, print_info=False)
+    power_generation = dcf.inp["Power Generation"]
+    assert power_generation["Available Power (hourly, kWh)"]["Value"] == 0
+    assert power_generation["Available Power from PV Profile"]["Value"] is False
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, True, hourly=False)
+    dcf.inp["Power Generation"]["Available Power from PV Profile"]["Value"] = False
+    Electrolyzer_Plugin(dcf, print_info=False)
+    available_power = dcf.inp["Power Generation"]["Available Power (hourly, kWh)"]
+    assert sorted(available_power["Value"]) == list(dcf.operation_years)
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, True, hourly=True)
+    plugin = Electrolyzer_Plugin(dcf, print_info=False)
+    reference = Electrolyzer_Plugin(
+        DummyDCF(PROFILE, 1000.0, 800.0, 0.1, False, hourly=True), print_info=False
+    )
+    np.testing.assert_array_equal(plugin.h2_production_hourly, reference.h2_production_hourly)
+
+
+def test_load_duration_curve_broadcast():
+    """Curve queries broadcast over grids of scaling and demand."""
+
+    curve = Load_Duration_Curve(PROFILE)
+    scale = np.array([500.0, 1000.0, 2000.0])[:, None]
+    demand = np.array([100.0, 800.0])[None, :]
+
+    consumed, hours = curve.operation(scale, demand, 0.2)
+
+    for i, j in np.ndindex(3, 2):
+        generation = PROFILE * scale[i, 0]
+        consumption = np.minimum(generation, demand[0, j])
+        running = consumption / demand[0, j] > 0.2
+        assert hours[i, j] == np.sum(running)
+        assert consumed[i, j] == pytest.approx(np.sum(consumption[running]))
+
+
+def test_load_duration_curve_periods():
+    """Daily operation from the curve matches an hourly calculation."""
+
+    curve = Load_Duration_Curve(PROFILE)
+    scale = np.array([500.0, 1000.0, 2000.0])
+    demand = np.array([100.0, 800.0, 600.0])
+
+    consumed, hours = curve.period_operation(scale, demand, 0.2)
+
+    generation = PROFILE * scale[:, None]
+    consumption = np.minimum(generation, demand[:, None])
+    running = consumption / demand[:, None] > 0.2
+    consumption[~running] = 0
+
+    assert consumed.shape == hours.shape == (3, 365)
+    np.testing.assert_array_equal(hours, running.reshape(3, 365, 24).sum(axis=2))
+    np.testing.assert_allclose(
+        consumed, consumption.reshape(3, 365, 24).sum(axis=2), rtol=1e-9, atol=1e-9
+    )
+    np.testing.assert_allclose(consumed.sum(axis=1), curve.operation(scale, demand, 0.2)[0])
+
+    with pytest.raises(ValueError):
+        Load_Duration_Curve(PROFILE[:100]).period_operation(1.0, 0.5, 0.1)
+
+
+def test_load_duration_curve_cache():
+    """Profiles with the same data share one cached curve."""
+
+    curve = load_duration_curve(PROFILE)
+
+    assert load_duration_curve(PROFILE.copy()) is curve
+    assert load_duration_curve(PROFILE[:, None][:, 0]) is curve
+    assert load_duration_curve(PROFILE * 2) is not curve
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_hourly_outputs_only_when_requested(fast):
+    """Unused capacity is only published if a plugin using it is enabled."""
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, fast, hourly=False)
+    Electrolyzer_Plugin(dcf, print_info=False)
+    assert "Unused Capacity (hourly, kWh)" not in dcf.inp["Electrolyzer"]
+    assert "H2 Production (hourly, kg)" not in dcf.inp["Electrolyzer"]
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, fast, hourly=False)
+    dcf.inp["Battery"] = {"Dispatch": {"Value": "hourly"}}
+    Electrolyzer_Plugin(dcf, print_info=False)
+    unused_capacity = dcf.inp["Electrolyzer"]["Unused Capacity (hourly, kWh)"]["Value"]
+    assert sorted(unused_capacity) == list(dcf.operation_years)
+
+    dcf = DummyDCF(PROFILE, 1000.0, 800.0, 0.1, fast, hourly=False)
+    dcf.inp["Compressor"] = {"Load Profile": {"Value": "hourly"}}
+    plugin = Electrolyzer_Plugin(dcf, print_info=False)
+    h2_production = dcf.inp["Electrolyzer"]["H2 Production (hourly, kg)"]["Value"]
+    np.testing.assert_allclose(h2_production.sum(axis=1), plugin.yearly_data[:, 1])
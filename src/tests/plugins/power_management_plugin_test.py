@@ -0,0 +1,33 @@
+import numpy as np
+from pyH2A.Plugins.Power_Management_Plugin import allocate_power, calculate_fulfillment
+
+
+def test_calculate_fulfillment_does_not_modify_input():
+    """Remaining power is returned as a new array."""
+
+    remaining = np.array([5.0, 1.0, 0.0])
+    new_remaining, unfulfilled = calculate_fulfillment(np.array([2.0, 2.0, 2.0]), remaining)
+
+    np.testing.assert_array_equal(remaining, [5.0, 1.0, 0.0])
+    np.testing.assert_array_equal(new_remaining, [3.0, 0.0, 0.0])
+    np.testing.assert_array_equal(unfulfilled, [0.0, 1.0, 2.0])
+
+
+def test_allocate_power():
+    """On demand consumers use stored power, flexible consumers use flexible power first."""
+
+    consumption = {
+        "A": {"Type": "on_demand", "Value": np.array([1.0, 3.0])},
+        "B": {"Type": "flexible", "Value": np.array([2.0, 2.0])},
+    }
+    flexible = np.array([1.0, 1.0])
+    stored = np.array([4.0, 3.0])
+
+    unfulfilled, remaining_flexible, remaining_stored = allocate_power(
+        consumption, flexible, stored
+    )
+
+    np.testing.assert_array_equal(unfulfilled, [0.0, 1.0])
+    np.testing.assert_array_equal(remaining_flexible, [0.0, 0.0])
+    np.testing.assert_array_equal(remaining_stored, [2.0, 0.0])
+    np.testing.assert_array_equal(stored, [4.0, 3.0])
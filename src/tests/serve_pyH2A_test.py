@@ -0,0 +1,76 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+import pytest
+from pyH2A.Discounted_Cash_Flow import Discounted_Cash_Flow
+from pyH2A.serve_pyH2A import pyH2A_Server
+from pyH2A.Utilities.input_modification import convert_input_to_dictionary
+
+END_TO_END = Path(__file__).parent / "end_to_end"
+INPUT_FILES = [str(END_TO_END / "PEC_Base.md"), str(END_TO_END / "PV_E_Base.md")]
+
+
+def post(server, data):
+    url = f"http://127.0.0.1:{server.server_address[1]}/evaluate"
+    request = urllib.request.Request(url, data=json.dumps(data).encode("utf-8"))
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.fixture(params=[0, 2], scope="module")
+def server(request):
+    server = pyH2A_Server(INPUT_FILES, port=0, workers=request.param)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_base_case(server):
+    status, response = post(server, {"model": "PEC_Base"})
+    expected = Discounted_Cash_Flow(INPUT_FILES[0], print_info=False)
+
+    assert status == 200
+    assert response["h2_cost"] == pytest.approx(expected.h2_cost)
+    assert response["contributions"] == pytest.approx(expected.contributions["Data"])
+
+
+def test_overrides_and_outputs(server):
+    path = "Electrolyzer > Conversion efficiency (kg H2/kWh) > Value"
+    output = "Technical Operating Parameters and Specifications > Design Output per Day > Value"
+    data = {
+        "model": "PV_E_Base",
+        "overrides": {path: 0.02},
+        "outputs": [output],
+        "contributions": False,
+    }
+    status, response = post(server, data)
+
+    inp = convert_input_to_dictionary(INPUT_FILES[1])
+    inp["Electrolyzer"]["Conversion efficiency (kg H2/kWh)"]["Value"] = 0.02
+    expected = Discounted_Cash_Flow(inp, print_info=False)
+
+    assert status == 200
+    assert "contributions" not in response
+    assert response["h2_cost"] == pytest.approx(expected.h2_cost)
+    assert response["outputs"][output] == pytest.approx(
+        expected.inp["Technical Operating Parameters and Specifications"][
+            "Design Output per Day"
+        ]["Value"]
+    )
+
+
+def test_invalid_requests(server):
+    status, response = post(server, {"model": "Unknown"})
+    assert status == 400
+    assert "Unknown" in response["error"]
+
+    status, response = post(server, {})
+    assert status == 400